@@ -2,8 +2,17 @@ from pydantic import BaseModel
 
 class Plan(BaseModel):
     steps: list[str]
+    depends_on: dict[str, list[str]] = {}
 
 
-def plan_run(fix_version: str, project: str, repo: str, branch: str) -> Plan:
-    """Very small planner returning the sequence of tasks."""
-    return Plan(steps=['collect_jira', 'collect_commits', 'compare', 'write_report'])
+def plan_run(fix_version: str, project: str, repo: str, branch: str, write_llm_summary: bool = False) -> Plan:
+    """Very small planner returning the tasks and what each one waits for."""
+    steps = ['collect_jira', 'collect_commits', 'compare', 'write_report']
+    depends_on = {
+        'compare': ['collect_jira', 'collect_commits'],
+        'write_report': ['collect_jira', 'collect_commits'],
+    }
+    if write_llm_summary:
+        steps.append('write_llm_summary')
+        depends_on['write_llm_summary'] = ['compare']
+    return Plan(steps=steps, depends_on=depends_on)
@@ -1,8 +1,7 @@
 from pathlib import Path
 from pydantic import BaseModel
 
-from release_copilot.config.settings import settings
-from release_copilot.tools.confluence_tools import publish_confluence
+from release_copilot.config.settings import get_settings
 
 
 class PublishResult(BaseModel):
@@ -10,7 +9,9 @@ class PublishResult(BaseModel):
 
 
 def publish(summary_path: Path) -> PublishResult:
-    if not settings.confluence_enabled:
+    if not get_settings().confluence_enabled:
         return PublishResult(url=None)
+    from release_copilot.tools.confluence_tools import publish_confluence
+
     url = publish_confluence('Release Report', summary_path.read_text())
     return PublishResult(url=url)
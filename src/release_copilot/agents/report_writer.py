@@ -1,7 +1,10 @@
-from typing import List, Dict
+from datetime import datetime, timezone
+from typing import Callable, List, Dict, Optional
 from pathlib import Path
 from pydantic import BaseModel
 
+from release_copilot.kit.cancellation import check_cancelled
+from release_copilot.kit.progress import emit
 from release_copilot.tools import file_tools
 
 
@@ -13,6 +16,11 @@ class Report(BaseModel):
     artifacts: Dict[str, str]
 
 
+def _origin(commit: Dict) -> Dict:
+    """Repo/branch tags carried by commits collected for multi-target runs."""
+    return {k: commit[k] for k in ('project', 'repo', 'branch') if k in commit}
+
+
 def compare_jira_and_commits(jira_issues: List[Dict], commits: List[Dict]) -> tuple[List[Dict], List[Dict], List[Dict]]:
     jira_by_key = {j['key']: j for j in jira_issues}
     matches = []
@@ -22,11 +30,14 @@ def compare_jira_and_commits(jira_issues: List[Dict], commits: List[Dict]) -> tu
         if c['jira_keys']:
             for key in c['jira_keys']:
                 if key in jira_by_key:
-                    matches.append({'key': key, 'summary': jira_by_key[key]['summary'], 'commit': c['id'], 'author': c['author']})
+                    matches.append({'key': key, 'summary': jira_by_key[key]['summary'], 'commit': c['id'],
+                                    'author': c['author'], **_origin(c)})
                     seen_jira.add(key)
         else:
-            commits_without_story.append({'id': c['id'], 'author': c['author']})
+            commits_without_story.append({'id': c['id'], 'author': c['author'], **_origin(c)})
     missing_in_git = [j for k, j in jira_by_key.items() if k not in seen_jira]
+    emit("compare", "done", done=len(commits), message=f"{len(missing_in_git)} missing, "
+                                                       f"{len(commits_without_story)} without story")
     return matches, missing_in_git, commits_without_story
 
 
@@ -36,9 +47,63 @@ def write_report(jira_issues: List[Dict], commits: List[Dict], output_dir: Path)
                f"{len(commits_without_story)} commits without story")
     excel_path = output_dir / 'release_audit.xlsx'
     md_path = output_dir / 'release_report.md'
+    emit("report", done=0, total=2, message=excel_path.name)
+    check_cancelled()
     file_tools.write_excel_audit(jira_issues, commits, matches, missing_in_git, commits_without_story, excel_path)
+    emit("report", done=1, total=2, message=md_path.name)
+    check_cancelled()
     file_tools.write_markdown_report(summary, md_path)
+    emit("report", "done", done=2, total=2)
     return Report(matches=matches, missing_in_git=missing_in_git,
                   commits_without_story=commits_without_story,
                   summary=summary,
                   artifacts={'excel': str(excel_path), 'markdown': str(md_path)})
+
+
+def write_llm_narrative(jira_issues: List[Dict], commits: List[Dict], missing_in_git: List[Dict],
+                        targets: List[Dict], output_dir: Path, model: str,
+                        budget_cents: int = 10, fix_version: Optional[str] = None, since: Optional[str] = None,
+                        on_delta: Optional[Callable[[str], None]] = None, provider: Optional[str] = None) -> str:
+    """Write the optional LLM narrative for a graph run; returns the Markdown path.
+
+    ``targets`` are ``{'project', 'repo', 'branch'}`` dicts; commits tagged with a
+    repo/branch are attributed to the matching target, untagged ones to the first.
+    """
+    from release_copilot.reporting.llm_summary import build_llm_summary
+
+    # Day granularity keeps the narrative cache warm across reruns on the same day.
+    end = datetime.now(tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = datetime.fromisoformat(since).replace(tzinfo=timezone.utc) if since else end
+    first = targets[0]
+    # Keyed like app._counts_by_repo: the same repo name can exist in several projects.
+    def key(d: Dict) -> tuple:
+        return tuple(d.get(f, first[f]) for f in ('project', 'repo', 'branch'))
+
+    by_target: Dict[tuple, List[Dict]] = {key(t): [] for t in targets}
+    for c in commits:
+        by_target.setdefault(key(c), []).append(c)
+    orphans = [
+        {'repo': c.get('repo', first['repo']), 'displayId': (c.get('id') or '')[:10],
+         'line': ((c.get('message') or '').splitlines() or [''])[0][:160]}
+        for c in commits if not c.get('jira_keys')
+    ]
+    summary_rows = [
+        {**t, 'count': len(by_target[key(t)]), 'commits': by_target[key(t)]}
+        for t in targets
+    ]
+    path = build_llm_summary(
+        summary_rows=summary_rows,
+        output_dir=output_dir,
+        window=(start, end),
+        branches_label=', '.join(dict.fromkeys(t['branch'] for t in targets)),
+        repo_csv_map={},
+        model=model,
+        budget_cents=budget_cents,
+        base_name='release_report_llm',
+        fix_version=fix_version,
+        missing_preview=missing_in_git,
+        orphan_preview=orphans,
+        on_delta=on_delta,
+        provider=provider,
+    )
+    return str(path)
@@ -1,27 +1,94 @@
 import argparse
 import logging
 import os
+import sys
+from contextlib import nullcontext
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Union
 
 from rich.console import Console
 from rich.progress import Progress
 
-from release_copilot.config import env_wizard
-from release_copilot.graph.states import RunState
+from release_copilot.graph.states import RunState, Target
 from release_copilot.graph.graph import compile_graph
+from release_copilot.kit.cancellation import CancelToken, current_token
+from release_copilot.kit.checkpoint import Checkpoint
 from release_copilot.kit.cost_meter import CostSession
+from release_copilot.kit.errors import Cancelled
+from release_copilot.kit.profiling import Profiler
+from release_copilot.kit.tracing import Tracer, print_summary
 
 LOG_PATH = Path('logs/release-copilot.log')
-LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-logging.basicConfig(level=logging.INFO)
-handler = RotatingFileHandler(LOG_PATH, maxBytes=2_000_000, backupCount=5)
-logging.getLogger().addHandler(handler)
+_log_handler: Optional[RotatingFileHandler] = None
 
 console = Console()
 
 
+def _configure_logging() -> None:
+    """Set up console + rotating file logging once, when a run starts (not at import)."""
+    global _log_handler
+    if _log_handler is not None:
+        return
+    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(level=logging.INFO)
+    _log_handler = RotatingFileHandler(LOG_PATH, maxBytes=2_000_000, backupCount=5)
+    logging.getLogger().addHandler(_log_handler)
+
+# RunState inputs stored with a checkpoint so ``--resume`` needs nothing else.
+_STATE_PARAMS = {
+    'fix_version', 'project', 'repo', 'branch', 'since', 'jql',
+    'llm_model', 'llm_budget_cents', 'llm_provider', 'targets',
+}
+
+
+def _counts_by_repo(state: RunState) -> Dict[str, Dict[str, int]]:
+    """Per ``PROJECT/REPO@BRANCH`` commit, match and no-story counts."""
+    by_repo = {t.label: {"commits": 0, "matched_commits": 0, "commits_without_story": 0}
+               for t in state.all_targets()}
+    jira_keys = {i.get("key") for i in state.jira_issues}
+    first = state.all_targets()[0]
+    for c in state.commits:
+        label = Target(project=c.get("project", first.project), repo=c.get("repo", first.repo),
+                       branch=c.get("branch", first.branch)).label
+        row = by_repo.setdefault(label, {"commits": 0, "matched_commits": 0, "commits_without_story": 0})
+        row["commits"] += 1
+        keys = c.get("jira_keys") or []
+        if not keys:
+            row["commits_without_story"] += 1
+        elif jira_keys.intersection(keys):
+            row["matched_commits"] += 1
+    return by_repo
+
+
+def _record_history(run_id: str, state: RunState, by_repo: Dict[str, Dict[str, int]]) -> None:
+    """Ingest the graph run's comparison into the run-history database (best effort)."""
+    from release_copilot.kit import history
+
+    first = state.all_targets()[0]
+    jira_keys = {i.get('key') for i in state.jira_issues}
+    statuses = {i.get('key'): i.get('status', '') for i in state.jira_issues}
+
+    def tagged(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {**row, **{f: row.get(f, getattr(first, f)) for f in ('project', 'repo', 'branch')}}
+
+    orphans = [
+        {**tagged(c), 'author': c.get('author', ''), 'extracted_keys': ';'.join(c.get('jira_keys') or [])}
+        for c in state.commits if not jira_keys.intersection(c.get('jira_keys') or [])
+    ]
+    try:
+        history.record_run(
+            run_id, 'graph', [state.fix_version] if state.fix_version else [],
+            [{**t.model_dump(), 'count': by_repo.get(t.label, {}).get('commits', 0)} for t in state.all_targets()],
+            state.missing_in_git,
+            orphans,
+            [{**tagged(m), 'status': statuses.get(m['key'], '')} for m in state.matches],
+            since=state.since, params={'jql': state.jql},
+        )
+    except Exception as e:
+        logging.getLogger(__name__).warning('Run history not recorded: %s', e)
+
+
 def run_release_audit(
     fix_version: str,
     project: str,
@@ -32,37 +99,104 @@ def run_release_audit(
     enable_confluence: bool = False,
     enable_llamaindex: bool = False,
     dry_run: bool = False,
+    llm_model: Optional[str] = None,
+    llm_budget_cents: int = 10,
+    on_llm_delta: Optional[Callable[[str], None]] = None,
+    llm_provider: Optional[str] = None,
+    resume: Optional[str] = None,
+    targets: Optional[List[Union[str, Target]]] = None,
+    profile: bool = False,
+    profile_memory: bool = False,
+    deadline_s: Optional[float] = None,
 ) -> Dict[str, Any]:
-    """Run the pipeline and return a result dict."""
+    """Run the pipeline and return a result dict.
+
+    ``llm_model`` adds the LLM narrative step (skipped on ``dry_run``); its text is
+    streamed to ``on_llm_delta`` as it is generated. Every finished step is
+    checkpointed under ``data/runs/<run_id>``; ``resume=<run_id>`` reloads that
+    run's parameters and completed steps and only runs what is left.
+
+    Spans are traced to ``trace.json`` next to the checkpoint (``trace_path``), with
+    per-span totals under ``trace_summary``. ``profile`` (implied by
+    ``profile_memory``) adds cProfile/sampling output, listed under ``profile``.
+
+    ``targets`` (``PROJECT/REPO@BRANCH`` strings or :class:`Target`) audits several
+    repos at once: they are collected concurrently and compared against one Jira
+    query. ``project``/``repo``/``branch``, when given, are the first target.
+    Per-target counts are returned under ``counts["by_repo"]``.
+
+    The run stops at its next page, sheet or LLM chunk once ``deadline_s``
+    seconds pass, or once the caller's open :class:`CancelToken` is cancelled.
+    Steps that finished are kept, and the result is returned with ``ok`` false
+    and ``incomplete`` set to the reason.
+    """
     result: Dict[str, Any] = {
         "artifacts": {},
         "counts": {},
         "cost": {},
+        "timings": {},
+        "run_id": None,
+        "trace_path": None,
+        "trace_summary": [],
+        "profile": {},
         "log_path": str(LOG_PATH),
         "ok": False,
         "error": None,
     }
+    _configure_logging()
     try:
         os.environ["CONFLUENCE_ENABLED"] = str(enable_confluence).lower()
         os.environ["ENABLE_LLAMAINDEX"] = str(enable_llamaindex).lower()
         os.environ["DRY_RUN"] = str(dry_run).lower()
 
-        state = RunState(
-            fix_version=fix_version,
-            project=project,
-            repo=repo,
-            branch=branch,
-            since=since,
-            jql=jql,
-        )
+        if resume:
+            checkpoint = Checkpoint.resume(resume)
+            result["run_id"] = checkpoint.run_id
+            state = RunState(**checkpoint.params["state"])
+        else:
+            all_targets = [t if isinstance(t, Target) else Target.parse(t, default_branch=branch)
+                           for t in (targets or [])]
+            if project and repo and branch:
+                all_targets.insert(0, Target(project=project, repo=repo, branch=branch))
+            if not all_targets:
+                raise ValueError("Provide --project/--repo/--branch or at least one --target")
+            state = RunState(
+                fix_version=fix_version,
+                project=all_targets[0].project,
+                repo=all_targets[0].repo,
+                branch=all_targets[0].branch,
+                targets=all_targets if len(all_targets) > 1 else [],
+                since=since,
+                jql=jql,
+                llm_model=None if dry_run else llm_model,
+                llm_budget_cents=llm_budget_cents,
+                llm_provider=llm_provider,
+            )
+            # Dry runs are cheap; only real runs are worth resuming.
+            checkpoint = None if dry_run else Checkpoint()
+            if checkpoint is not None:
+                result["run_id"] = checkpoint.run_id
+                checkpoint.set_params({"state": state.model_dump(include=_STATE_PARAMS)})
 
-        graph = compile_graph()
+        graph = compile_graph(on_llm_delta=on_llm_delta)
 
-        with CostSession() as cost:
-            with Progress() as progress:
-                task = progress.add_task('Running', total=1)
-                graph(state)
-                progress.update(task, advance=1)
+        run_dir = checkpoint.dir if checkpoint is not None else Path('data/outputs')
+        profiler = Profiler(run_dir / 'profile', memory=profile_memory) if profile or profile_memory else None
+        tracer = Tracer(track_memory=profile_memory)
+        incomplete: Optional[str] = None
+        try:
+            with profiler or nullcontext(), CostSession() as cost, tracer, CancelToken(deadline_s, parent=current_token()):
+                with Progress() as progress:
+                    task = progress.add_task('Running', total=1)
+                    graph(state, checkpoint=checkpoint)
+                    progress.update(task, advance=1)
+        except Cancelled as e:
+            incomplete = str(e)
+        finally:
+            result["trace_path"] = str(tracer.write(run_dir / 'trace.json'))
+            result["trace_summary"] = tracer.summary()
+            if profiler is not None:
+                result["profile"] = {name: str(path) for name, path in profiler.outputs.items()}
 
         artifacts = state.artifacts
         counts = {
@@ -70,25 +204,37 @@ def run_release_audit(
             "commits_total": len(state.commits),
             "missing_in_git": len(state.missing_in_git),
             "commits_without_story": len(state.commits_without_story),
+            "by_repo": _counts_by_repo(state),
         }
         tokens = {
             s.name: {
                 "prompt": s.prompt_tokens,
                 "completion": s.completion_tokens,
                 "model": s.model,
+                "latency_s": round(s.latency_s, 3),
+                "retries": s.retries,
             }
             for s in cost.steps
         }
         cost_total = sum(s.cost for s in cost.steps)
+        if result["run_id"] and not dry_run and incomplete is None:
+            _record_history(result["run_id"], state, counts["by_repo"])
+        if checkpoint is not None:
+            checkpoint.mark_incomplete(incomplete)
 
         result.update(
             {
                 "artifacts": artifacts,
                 "counts": counts,
                 "cost": {"tokens_by_step": tokens, "estimated_usd": cost_total},
-                "ok": True,
+                "timings": state.step_timings,
+                "ok": incomplete is None,
             }
         )
+        if incomplete is not None:
+            result["incomplete"] = incomplete
+            result["error"] = f"stopped early ({incomplete}); results are partial"
+
     except Exception as exc:  # pragma: no cover - defensive
         result["error"] = str(exc)
 
@@ -96,6 +242,19 @@ def run_release_audit(
 
 
 def main() -> None:
+    if sys.argv[1:2] == ['serve']:
+        from release_copilot.commands.serve import main as serve_main
+
+        return serve_main(sys.argv[2:])
+    if sys.argv[1:2] == ['history']:
+        from release_copilot.commands.history import main as history_main
+
+        return history_main(sys.argv[2:])
+    if sys.argv[1:2] == ['check']:
+        from release_copilot.commands.check import main as check_main
+
+        raise SystemExit(check_main(sys.argv[2:]))
+
     parser = argparse.ArgumentParser()
     parser.add_argument('--wizard', action='store_true')
     parser.add_argument('--fix-version')
@@ -103,14 +262,26 @@ def main() -> None:
     parser.add_argument('--repo')
     parser.add_argument('--branch')
     parser.add_argument('--since')
+    parser.add_argument('--target', action='append', default=[], metavar='PROJECT/REPO@BRANCH',
+                        help='Extra repo/branch to audit in the same run (repeatable; @BRANCH defaults to --branch)')
     parser.add_argument('--enable-confluence', action='store_true')
     parser.add_argument('--enable-llamaindex', action='store_true')
     parser.add_argument('--dry-run', action='store_true')
     parser.add_argument('--jql', type=str, default=None, help='Custom JQL to run (overrides defaults).')
     parser.add_argument('--jql-preset', type=str, default=None, help='Name of a JQL preset from config/queries.yml')
+    parser.add_argument('--llm-model', type=str, default=None, help='Write an LLM narrative with this model')
+    parser.add_argument('--llm-budget-cents', type=int, default=10, help='Hard cap on estimated LLM spend (cents)')
+    parser.add_argument('--llm-stream', action='store_true', help='Print the narrative as it streams in')
+    parser.add_argument('--llm-provider', type=str, default=None, help='LLM provider: openai or stub (default LLM_PROVIDER from .env)')
+    parser.add_argument('--profile', action='store_true', help='Profile the run (pstats + collapsed stacks next to the trace)')
+    parser.add_argument('--profile-memory', action='store_true', help='Also trace allocations: per-stage peak memory and top allocation sites')
+    parser.add_argument('--resume', type=str, default=None, metavar='RUN_ID', help='Resume a failed run from its checkpoint (skips finished steps)')
+    parser.add_argument('--deadline', type=float, default=None, metavar='SECONDS', help='Stop after this many seconds and return the partial results, marked incomplete')
     args = parser.parse_args()
 
     if args.wizard:
+        from release_copilot.config import env_wizard
+
         env_wizard.run_wizard()
         return
 
@@ -136,17 +307,48 @@ def main() -> None:
         enable_confluence=args.enable_confluence,
         enable_llamaindex=args.enable_llamaindex,
         dry_run=args.dry_run,
+        llm_model=args.llm_model,
+        llm_budget_cents=args.llm_budget_cents,
+        on_llm_delta=(lambda t: print(t, end='', flush=True)) if args.llm_stream else None,
+        llm_provider=args.llm_provider,
+        resume=args.resume,
+        targets=args.target,
+        profile=args.profile,
+        profile_memory=args.profile_memory,
+        deadline_s=args.deadline,
     )
 
+    print_summary(res.get("trace_summary", []))
+    if res.get("trace_path"):
+        console.print(f"Trace: {res['trace_path']}")
+    for name, path in res.get("profile", {}).items():
+        console.print(f"Profile {name}: {path}")
+
+    if res.get("incomplete"):
+        console.print(f"[yellow]Stopped early ({res['incomplete']}); partial results:[/yellow]")
+        for name, path in res["artifacts"].items():
+            console.print(f" - {name}: {path}")
     if not res.get("ok"):
-        console.print(f"[red]Run failed: {res.get('error')}[/red]")
+        if not res.get("incomplete"):
+            console.print(f"[red]Run failed: {res.get('error')}[/red]")
+        if res.get("run_id"):
+            console.print(f"Resume with: --resume {res['run_id']}")
         raise SystemExit(1)
 
+    by_repo = res["counts"].get("by_repo", {})
+    if len(by_repo) > 1:
+        console.print('Per repo:')
+        for label, c in by_repo.items():
+            console.print(f" - {label}: {c['commits']} commits, {c['matched_commits']} matched, "
+                          f"{c['commits_without_story']} without story")
+
     console.print('Artifacts:')
     for name, path in res["artifacts"].items():
         console.print(f" - {name}: {path}")
 
     console.print('Run complete.')
+    if res.get("run_id"):
+        console.print(f"Run id: {res['run_id']}")
 
 
 if __name__ == '__main__':
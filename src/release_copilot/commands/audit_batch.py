@@ -0,0 +1,266 @@
+"""Run several release audits in one process.
+
+Each audit is a config file plus a fix version (``--config a.json --config b.json``,
+or one config with ``--fix-version A --fix-version B``). Startup, OAuth and the
+repo commit walks are paid once: every distinct project/repo/branch is fetched a
+single time and shared by all audits that include it, the Jira searches run
+concurrently (several fix versions share one ``fixVersion in (...)`` search when
+the JQL template allows), and each audit writes its outputs to ``<output-dir>/<audit-name>/``.
+``--jobs N`` builds the Markdown/Excel reports in a process pool.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from release_copilot.commands.audit_from_config import (
+    _branch_loop,
+    _clean_fix_version,
+    _collect_commits,
+    _compare_with_jira,
+    _default_window,
+    _detect_equivalents,
+    _load_commits,
+    _parse_iso_date,
+    _record_history,
+    _search_jira,
+    _slug,
+    multi_fix_version_jql,
+    partition_by_fix_version,
+    resolve_jql,
+)
+from release_copilot.config.settings import get_settings
+from release_copilot.kit.checkpoint import new_run_id
+from release_copilot.kit.tracing import Tracer, print_summary, span
+from release_copilot.reporting.report_builder import build_reports
+from release_copilot.tools.config_loader import ConfigData, load_config
+
+logger = logging.getLogger(__name__)
+
+RepoBranch = Tuple[str, str, str]
+
+
+@dataclass
+class Audit:
+    """One audit of the batch: a config, its fix version and its own output folder."""
+
+    name: str
+    config_path: str
+    cfg: ConfigData
+    fix_version: Optional[str]
+    output_dir: Path
+    branches: List[str] = field(default_factory=list)
+    repo_pairs: List[Tuple[str, str]] = field(default_factory=list)
+    summary_rows: List[dict] = field(default_factory=list)
+    missing: Optional[int] = None
+    orphans: Optional[int] = None
+    error: str = ""
+
+    def args(self, batch_args: argparse.Namespace) -> argparse.Namespace:
+        """``audit_from_config``-style arguments for this audit."""
+        jql = batch_args.jql
+        if jql and "{fix_version}" in jql:
+            if not self.fix_version:
+                raise SystemExit(f"--jql needs {{fix_version}} but audit '{self.name}' has none")
+            jql = jql.replace("{fix_version}", self.fix_version)
+        return argparse.Namespace(**{**vars(batch_args), "fix_version": self.fix_version, "jql": jql})
+
+
+def plan_audits(config_paths: List[str], fix_versions: List[str], output_root: Path) -> List[Audit]:
+    """Every config crossed with every ``--fix-version`` (or the config's own fix version)."""
+    audits: List[Audit] = []
+    names: Dict[str, int] = {}
+    for path in config_paths:
+        cfg = load_config(path)
+        for fv in fix_versions or [cfg.fix_version]:
+            fv = _clean_fix_version(fv)
+            name = _slug(fv) if fv and len(config_paths) == 1 else _slug(f"{Path(path).stem}_{fv or 'default'}")
+            names[name] = names.get(name, 0) + 1
+            if names[name] > 1:
+                name = f"{name}_{names[name]}"
+            audits.append(Audit(name, path, cfg, fv, output_root / name))
+    return audits
+
+
+def fetch_shared_commits(
+    args, keys: List[RepoBranch], since_utc, until_utc, max_workers: int = 4
+) -> Dict[RepoBranch, Tuple[List[dict], str]]:
+    """Load each distinct repo/branch once (concurrently), keyed for ``_collect_commits``."""
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="commits") as pool:
+        futures = {
+            key: pool.submit(copy_context().run, _load_commits, args, *key, since_utc, until_utc)
+            for key in keys
+        }
+        return {key: f.result() for key, f in futures.items()}
+
+
+def search_all(audits: List[Audit], args, max_workers: int = 4) -> Dict[str, Any]:
+    """Run the audits' Jira searches concurrently, with as few round trips as possible.
+
+    Audits whose JQL differs only in the fix version share one ``fixVersion in (...)``
+    search, split locally by each issue's ``fixVersions``; identical JQL is searched
+    once. Returns audit name -> issue list, or the exception its search raised.
+    """
+    template = args.jql if args.jql and "{fix_version}" in args.jql else (None if args.jql else get_settings().DEFAULT_JQL)
+    versions = list(dict.fromkeys(a.fix_version for a in audits if a.fix_version))
+    widened = multi_fix_version_jql(template, versions) if template and len(versions) > 1 else None
+
+    by_jql: Dict[str, List[Audit]] = {}
+    results: Dict[str, Any] = {}
+    for a in audits:
+        if widened and a.fix_version:
+            by_jql.setdefault(widened, []).append(a)
+            continue
+        try:
+            by_jql.setdefault(resolve_jql(a.args(args), get_settings()), []).append(a)
+        except SystemExit as e:  # missing fix version / JQL
+            results[a.name] = RuntimeError(str(e))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jira") as pool:
+        futures = {
+            jql: pool.submit(copy_context().run, _search_jira, argparse.Namespace(**{**vars(args), "jql": jql}))
+            for jql in by_jql
+        }
+        for jql, future in futures.items():
+            try:
+                issues: Any = future.result()
+            except Exception as e:
+                issues = e
+            parts = partition_by_fix_version(issues, versions) if jql == widened and isinstance(issues, list) else None
+            for a in by_jql[jql]:
+                results[a.name] = parts[a.fix_version] if parts is not None else issues
+    return results
+
+
+def _write_batch_summary(audits: List[Audit], path: Path) -> Path:
+    fieldnames = ["audit", "config", "fix_version", "commits", "missing_in_repo", "orphan_commits", "output_dir", "error"]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for a in audits:
+            writer.writerow({
+                "audit": a.name,
+                "config": a.config_path,
+                "fix_version": a.fix_version or "",
+                "commits": sum(int(sr["count"]) for sr in a.summary_rows),
+                "missing_in_repo": "" if a.missing is None else a.missing,
+                "orphan_commits": "" if a.orphans is None else a.orphans,
+                "output_dir": str(a.output_dir),
+                "error": a.error,
+            })
+    return path
+
+
+def run_batch(args) -> List[Audit]:
+    output_root = Path(args.output_dir)
+    audits = plan_audits(args.config, args.fix_version, output_root)
+    since_utc, until_utc = (
+        (_parse_iso_date(args.since), _parse_iso_date(args.until))
+        if args.since and args.until
+        else _default_window()
+    )
+    print(f"Batch: {len(audits)} audit(s); commit window {since_utc.isoformat()} to {until_utc.isoformat()}")
+
+    shared: List[RepoBranch] = []
+    for a in audits:
+        a.branches = _branch_loop(args, a.cfg)
+        for key in a.cfg.repos:
+            if "/" not in key:
+                raise SystemExit(f"Invalid repo format '{key}' in {a.config_path}, expected PROJECT/REPO")
+            a.repo_pairs.append(tuple(key.split("/", 1)))
+        shared += [(p, r, b) for p, r in a.repo_pairs for b in a.branches]
+    shared = list(dict.fromkeys(shared))
+
+    with span("stage.collect", repo_branches=len(shared)):
+        commits = fetch_shared_commits(args, shared, since_utc, until_utc, max_workers=args.workers)
+    for a in audits:
+        a.summary_rows = _collect_commits(args, a.repo_pairs, a.branches, since_utc, until_utc, a.output_dir, prefetched=commits)
+        if args.patch_ids:
+            with span("stage.equivalence", audit=a.name):
+                _detect_equivalents(args, a.summary_rows, a.output_dir)
+
+    with span("stage.compare"):
+        issues = search_all(audits, args, max_workers=args.workers)
+        for a in audits:
+            found = issues.get(a.name)
+            if isinstance(found, Exception):
+                a.error = f"Jira comparison skipped: {found}"
+                logger.warning("%s: %s", a.name, a.error)
+                continue
+            missing_rows, orphan_rows, matched_rows = _compare_with_jira(
+                a.args(args), a.summary_rows, a.output_dir, jira_issues=found
+            )
+            a.missing, a.orphans = len(missing_rows), len(orphan_rows)
+            if not args.no_history:
+                _record_history(new_run_id(), "batch", a.args(args), a.summary_rows, missing_rows, orphan_rows,
+                                matched_rows, since_utc, until_utc)
+
+    if args.write_report:
+        with span("stage.report", audits=len(audits)):
+            jobs = [
+                (a.summary_rows, a.output_dir, {sr["repo"]: Path(sr["csv_path"]) for sr in a.summary_rows}, args.report_name)
+                for a in audits
+            ]
+            if args.jobs > 1:
+                with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                    for f in [pool.submit(build_reports, *job) for job in jobs]:
+                        f.result()
+            else:
+                for job in jobs:
+                    build_reports(*job)
+
+    path = _write_batch_summary(audits, output_root / "batch_summary.csv")
+    for a in audits:
+        status = a.error or f"{a.missing} missing, {a.orphans} orphan"
+        print(f"{a.name}: {sum(int(sr['count']) for sr in a.summary_rows)} commits; {status} -> {a.output_dir}")
+    print(f"Batch summary written to {path}")
+    return audits
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run several release audits sharing one commit fetch")
+    parser.add_argument("--config", action="append", required=True, help="Audit config JSON (repeatable)")
+    parser.add_argument("--fix-version", action="append", default=[], help="Fix version to audit (repeatable; default: each config's fix_version)")
+    parser.add_argument("--develop-branch")
+    parser.add_argument("--release-branch")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--develop-only", action="store_true")
+    group.add_argument("--release-only", action="store_true")
+    parser.add_argument("--since")
+    parser.add_argument("--until")
+    parser.add_argument("--cache-ttl-hours", type=int, default=12)
+    parser.add_argument("--force-refresh", action="store_true")
+    parser.add_argument("--output-dir", default="data/outputs/batch", help="Root folder; each audit writes to a subfolder")
+    parser.add_argument("--write-report", action="store_true", help="Write Markdown and Excel reports per audit")
+    parser.add_argument("--report-name", type=str, default="release_audit")
+    parser.add_argument("--jql", type=str, default=None, help="Custom JQL for every audit ({fix_version} is substituted)")
+    parser.add_argument("--jql-ttl-hours", type=int, default=12)
+    parser.add_argument("--jql-force-refresh", action="store_true")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent Bitbucket fetches and Jira searches")
+    parser.add_argument("--suggest-issues", action="store_true", help="Suggest likely Jira issues for keyless orphan commits (local TF-IDF; needs numpy and scipy)")
+    parser.add_argument("--suggest-top-k", type=int, default=3, help="Suggestions per orphan commit")
+    parser.add_argument("--patch-ids", action="store_true", help="Group cherry-picked/rebased commits across branches by patch-id")
+    parser.add_argument("--patch-id-workers", type=int, default=8, help="Concurrent diff fetches for --patch-ids")
+    parser.add_argument("--no-resolve-orphans", action="store_true", help="Do not look up orphan commit keys in Jira to classify them")
+    parser.add_argument("--no-history", action="store_true", help="Do not record the audits in data/history.sqlite")
+    parser.add_argument("--jobs", type=int, default=1, help="Processes for report generation (1 = in-process)")
+    args = parser.parse_args(argv)
+
+    tracer = Tracer()
+    try:
+        with tracer:
+            run_batch(args)
+    finally:
+        trace_path = tracer.write(Path(args.output_dir) / "trace.json")
+        print_summary(tracer.summary())
+        print(f"Trace written to {trace_path} (open in https://ui.perfetto.dev)")
+
+
+if __name__ == "__main__":
+    main()
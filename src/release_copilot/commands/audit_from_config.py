@@ -2,19 +2,29 @@ from __future__ import annotations
 
 import argparse
 import csv
+from contextlib import nullcontext
 from datetime import datetime, timedelta, timezone
 import logging
+import re
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-from release_copilot.config.settings import settings
+from release_copilot.config.settings import get_settings
+from release_copilot.kit import key_index
 from release_copilot.kit.caching import CacheKey, load_cache_or_call
+from release_copilot.kit.cancellation import CancelToken, current_token
+from release_copilot.kit.checkpoint import Checkpoint
+from release_copilot.kit.cost_meter import CostSession
+from release_copilot.kit.errors import Cancelled
 from release_copilot.kit.jira_key import extract_keys
-from release_copilot.reporting.llm_summary import build_llm_summary
+from release_copilot.kit.profiling import Profiler
+from release_copilot.kit.progress import emit
+from release_copilot.kit.tracing import Tracer, print_summary, span
 from release_copilot.reporting.report_builder import build_reports
 from release_copilot.tools.bitbucket_tools import fetch_commits_window
 from release_copilot.tools.config_loader import ConfigData, load_config
-from release_copilot.tools.jira_tools import search_issues_cached, validate_jql_or_raise
+from release_copilot.tools.jira_tools import fetch_issues_by_keys, search_issues_cached, validate_jql_or_raise
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +84,8 @@ def _write_commits_csv(path: Path, commits: Iterable[dict], project: str, repo:
         "message",
         "jira_keys",
         "link",
+        "patch_id",
+        "equivalent_to",
     ]
     with path.open("w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -126,11 +138,50 @@ def _clean_fix_version(raw: Optional[str]) -> Optional[str]:
     return v
 
 
+def _fix_versions(args) -> List[str]:
+    """Cleaned ``--fix-version`` values (a list, or a single string from older run params)."""
+    raw = getattr(args, "fix_version", None)
+    values = raw if isinstance(raw, list) else [raw]
+    return list(dict.fromkeys(v for v in map(_clean_fix_version, values) if v))
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("_") or "audit"
+
+
+_FIX_VERSION_CLAUSE = re.compile(r"""fixVersion\s*=\s*(["']?)\{fix_version\}\1""", re.IGNORECASE)
+
+
+def multi_fix_version_jql(template: str, fix_versions: List[str]) -> Optional[str]:
+    """``template`` with its ``fixVersion = "{fix_version}"`` clause widened to ``fixVersion in (...)``.
+
+    Returns ``None`` when the template has no such clause, or uses ``{fix_version}`` elsewhere.
+    """
+    if not _FIX_VERSION_CLAUSE.search(template):
+        return None
+    quoted = ", ".join('"' + v.replace('"', '\\"') + '"' for v in fix_versions)
+    jql = _FIX_VERSION_CLAUSE.sub(lambda m: f"fixVersion in ({quoted})", template, count=1)
+    return None if "{fix_version}" in jql else jql
+
+
+def partition_by_fix_version(issues: List[dict], fix_versions: List[str]) -> Dict[str, List[dict]]:
+    """Split one search result by each issue's ``fixVersions`` (an issue may land in several)."""
+    parts: Dict[str, List[dict]] = {v: [] for v in fix_versions}
+    lookup = {v.casefold(): v for v in fix_versions}  # JQL matches names case-insensitively
+    for issue in issues:
+        for name in dict.fromkeys(n.casefold() for n in issue.get("fixVersions") or [] if n):
+            if name in lookup:
+                parts[lookup[name]].append(issue)
+    return parts
+
+
 def resolve_jql(args, settings) -> str:
     """
     Resolve the final JQL string:
     - If --jql is provided, return it trimmed.
     - Else use settings.DEFAULT_JQL verbatim (no edits), substituting {fix_version} if present.
+    - With several fix versions, its ``fixVersion = "{fix_version}"`` clause becomes
+      ``fixVersion in (...)`` so one search covers them all.
     - If template needs {fix_version} but it's missing, exit with a clear message.
     """
     if getattr(args, "jql", None):
@@ -141,14 +192,542 @@ def resolve_jql(args, settings) -> str:
         raise SystemExit("No JQL provided and DEFAULT_JQL is empty. Provide --jql or set DEFAULT_JQL in .env")
 
     if "{fix_version}" in tmpl:
-        fv = _clean_fix_version(getattr(args, "fix_version", None))
-        if not fv:
+        fvs = _fix_versions(args)
+        if not fvs:
             raise SystemExit("DEFAULT_JQL requires {fix_version}. Provide --fix-version.")
-        return tmpl.format(fix_version=fv)
+        if len(fvs) == 1:
+            return tmpl.format(fix_version=fvs[0])
+        jql = multi_fix_version_jql(tmpl, fvs)
+        if jql is None:
+            raise SystemExit(
+                'Several --fix-version values need a `fixVersion = "{fix_version}"` clause in DEFAULT_JQL; '
+                "pass a --jql that covers all of them instead."
+            )
+        return jql
 
     return tmpl
 
-def main() -> None:
+def _load_commits(
+    args, project: str, repo: str, branch: str, since_utc: datetime, until_utc: datetime
+) -> Tuple[List[dict], str]:
+    """Commits of one repo/branch in the window, from the cache when fresh."""
+    key = str(
+        CacheKey(
+            "bb:commits",
+            {
+                "project": project,
+                "repo": repo,
+                "branch": branch,
+                "since": since_utc.isoformat(),
+                "until": until_utc.isoformat(),
+            },
+        )
+    )
+
+    def fetch() -> List[dict]:
+        return fetch_commits_window(project, repo, branch, since_utc, until_utc)
+
+    commits, source = load_cache_or_call(
+        key,
+        ttl_hours=args.cache_ttl_hours,
+        fetch_fn=fetch,
+        force_refresh=args.force_refresh,
+    )
+    key_index.record(project, repo, branch, commits)
+    return commits, source
+
+
+def _collect_commits(
+    args,
+    repo_pairs: List[Tuple[str, str]],
+    branches: List[str],
+    since_utc: datetime,
+    until_utc: datetime,
+    output_dir: Path,
+    prefetched: Optional[Dict[Tuple[str, str, str], Tuple[List[dict], str]]] = None,
+) -> List[dict]:
+    """Fetch (or load cached) commits per repo/branch, write their CSVs and ``summary.csv``.
+
+    ``prefetched`` maps ``(project, repo, branch)`` to ``(commits, source)`` already
+    loaded by the caller (``audit_batch`` shares one fetch across audits). If the
+    run is cancelled, ``summary.csv`` still lists the repo/branches finished so far.
+    """
+    summary_rows: List[dict] = []
+    try:
+        for project, repo in repo_pairs:
+            for branch in branches:
+                if prefetched and (project, repo, branch) in prefetched:
+                    commits, source = prefetched[(project, repo, branch)]
+                else:
+                    commits, source = _load_commits(args, project, repo, branch, since_utc, until_utc)
+
+                print(f"{project}/{repo} {branch}: {source} ({len(commits)} commits)")
+
+                branch_safe = branch.replace("/", "_")
+                csv_name = f"commits_{project}_{repo}_{branch_safe}_{since_utc:%Y%m%d}_{until_utc:%Y%m%d}.csv"
+                csv_path = output_dir / csv_name
+                _write_commits_csv(csv_path, commits, project, repo, branch)
+
+                summary_rows.append(
+                    {
+                        "project": project,
+                        "repo": repo,
+                        "branch": branch,
+                        "count": len(commits),
+                        "since_iso": since_utc.isoformat(),
+                        "until_iso": until_utc.isoformat(),
+                        "csv_path": str(csv_path),
+                        "source": source,
+                    }
+                )
+                emit("collect", done=len(summary_rows), total=len(repo_pairs) * len(branches), message=f"{repo}@{branch}")
+    except Cancelled:
+        # Keep what finished: the summary lists the repo/branch CSVs already written.
+        _write_summary(output_dir, summary_rows)
+        raise
+
+    _write_summary(output_dir, summary_rows)
+    return summary_rows
+
+
+def _write_summary(output_dir: Path, summary_rows: List[dict]) -> None:
+    summary_path = output_dir / "summary.csv"
+    with summary_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(
+            f,
+            fieldnames=[
+                "project",
+                "repo",
+                "branch",
+                "count",
+                "since_iso",
+                "until_iso",
+                "csv_path",
+                "source",
+            ],
+        )
+        writer.writeheader()
+        writer.writerows(summary_rows)
+
+    print(f"Summary written to {summary_path}")
+
+
+def _detect_equivalents(args, summary_rows: List[dict], output_dir: Path) -> Path:
+    """Group commits carrying the same change (patch-id) across the branches of each repo.
+
+    Fills the ``patch_id``/``equivalent_to`` columns of the commit CSVs (so the
+    comparison carries them into ``orphan_commits.csv``) and writes
+    ``equivalent_commits.csv`` with every group that spans more than one branch.
+    """
+    from release_copilot.kit import patch_id
+    from release_copilot.tools.bitbucket_tools import fetch_commit_patch
+
+    rows_by_repo: Dict[Tuple[str, str], List[Tuple[dict, List[dict], List[str]]]] = {}
+    for sr in summary_rows:
+        with Path(sr["csv_path"]).open("r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            rows_by_repo.setdefault((sr["project"], sr["repo"]), []).append((sr, list(reader), reader.fieldnames or []))
+
+    groups: List[dict] = []
+    for (project, repo), entries in rows_by_repo.items():
+        mirror = patch_id.mirror_path(project, repo, get_settings().git_mirror_root)
+        fetch = (lambda sha: patch_id.mirror_diff(mirror, sha)) if mirror else (
+            lambda sha: fetch_commit_patch(project, repo, sha))
+        ids = patch_id.patch_ids((r["id"] for _, rows, _ in entries for r in rows), fetch,
+                                 max_workers=args.patch_id_workers)
+        members: Dict[str, List[dict]] = {}
+        for _, rows, _ in entries:
+            for r in rows:
+                r["patch_id"] = ids.get(r["id"]) or ""
+                if r["patch_id"]:
+                    members.setdefault(r["patch_id"], []).append(r)
+        for sr, rows, fieldnames in entries:
+            for r in rows:
+                others = [m for m in members.get(r["patch_id"], []) if m["branch"] != r["branch"]]
+                r["equivalent_to"] = ";".join(f"{m['branch']}@{m['displayId']}" for m in others)
+            fieldnames = fieldnames + [c for c in ("patch_id", "equivalent_to") if c not in fieldnames]
+            _write_csv(Path(sr["csv_path"]), fieldnames, rows)
+        for pid, group in members.items():
+            if len({m["branch"] for m in group}) > 1:
+                groups += [{
+                    "patch_id": pid,
+                    "project": project,
+                    "repo": repo,
+                    "branch": m["branch"],
+                    "id": m["id"],
+                    "displayId": m["displayId"],
+                    "authorTimestamp": m["authorTimestamp"],
+                    "cherry_pick": "yes" if len({g["id"] for g in group}) > 1 else "no",
+                    "message": (m.get("message", "") or "").split("\n", 1)[0],
+                } for m in group]
+    path = _write_csv(output_dir / "equivalent_commits.csv",
+                      ["patch_id", "project", "repo", "branch", "id", "displayId", "authorTimestamp", "cherry_pick",
+                       "message"], groups)
+    print(f"Equivalent commits: {len({g['patch_id'] for g in groups})} change(s) on several branches -> {path}")
+    return path
+
+
+def _distinct(orphan_rows: List[dict]) -> str:
+    """`` (N distinct changes)`` when patch-ids show duplicates among ``orphan_rows``."""
+    if not any(r.get("patch_id") for r in orphan_rows):
+        return ""
+    distinct = len({r.get("patch_id") or f"sha:{r.get('id')}" for r in orphan_rows})
+    return f" ({distinct} distinct changes)" if distinct != len(orphan_rows) else ""
+
+
+def _search_jira(args) -> List[dict]:
+    jql = resolve_jql(args, get_settings())
+    logger.info("Resolved JQL: %s", jql)
+    validate_jql_or_raise(jql)
+    return search_issues_cached(jql, ttl_hours=args.jql_ttl_hours, force_refresh=args.jql_force_refresh)
+
+
+def _compare_with_jira(
+    args, summary_rows: List[dict], output_dir: Path, jira_issues: Optional[List[dict]] = None
+) -> Tuple[List[dict], List[dict], List[dict]]:
+    """Compare Jira issues with commit keys; writes the missing/orphan CSVs.
+
+    Returns ``(missing_rows, orphan_rows, matched_rows)``.
+
+    Searches Jira with the resolved JQL unless ``jira_issues`` is given.
+    """
+    if jira_issues is None:
+        jira_issues = _search_jira(args)
+    commit_rows, commit_keys = _commit_key_index(summary_rows)
+    key_classes = _resolve_orphan_keys(args, commit_keys, jira_issues)
+    missing_rows, orphan_commit_rows, matched_rows = _compare(commit_rows, commit_keys, jira_issues, output_dir,
+                                                              key_classes)
+    print(f"Missing-in-repo: {len(missing_rows)} | Orphan commits: {len(orphan_commit_rows)}{_distinct(orphan_commit_rows)}")
+    _print_orphan_classes(orphan_commit_rows)
+    _suggest_issues(args, orphan_commit_rows, jira_issues, missing_rows, output_dir)
+    return missing_rows, orphan_commit_rows, matched_rows
+
+
+def _compare_fix_versions(
+    args, summary_rows: List[dict], output_dir: Path, fix_versions: List[str]
+) -> Tuple[List[dict], List[dict], List[dict]]:
+    """One Jira search and one commit pass for several fix versions.
+
+    The search result is split by each issue's ``fixVersions``; every version is
+    compared against the same commit key index and written to
+    ``fix_version_<name>/``. The combined comparison (all versions) goes to
+    ``output_dir`` as usual and ``fix_versions.csv`` lists the per-version counts.
+    """
+    jira_issues = _search_jira(args)
+    commit_rows, commit_keys = _commit_key_index(summary_rows)
+    key_classes = _resolve_orphan_keys(args, commit_keys, jira_issues)
+    missing_rows, orphan_commit_rows, matched_rows = _compare(commit_rows, commit_keys, jira_issues, output_dir,
+                                                              key_classes)
+    per_version = []
+    for fv, issues in partition_by_fix_version(jira_issues, fix_versions).items():
+        fv_dir = output_dir / f"fix_version_{_slug(fv)}"
+        # Keys of the other audited versions are orphans here, for a known reason.
+        in_version = {i["key"] for i in issues}
+        fv_classes = None if key_classes is None else {
+            **key_classes,
+            **{i["key"]: ("different fixVersion", ", ".join(i.get("fixVersions") or []))
+               for i in jira_issues if i["key"] not in in_version},
+        }
+        missing, orphans, _ = _compare(commit_rows, commit_keys, issues, fv_dir, fv_classes)
+        per_version.append({
+            "fix_version": fv,
+            "issues": len(issues),
+            "missing_in_repo": len(missing),
+            "orphan_commits": len(orphans),
+            "output_dir": str(fv_dir),
+        })
+        print(f"{fv}: {len(issues)} issues | Missing-in-repo: {len(missing)} | Orphan commits: {len(orphans)}")
+    _write_csv(output_dir / "fix_versions.csv",
+               ["fix_version", "issues", "missing_in_repo", "orphan_commits", "output_dir"], per_version)
+    print(f"All fix versions: Missing-in-repo: {len(missing_rows)} | Orphan commits: {len(orphan_commit_rows)}"
+          f"{_distinct(orphan_commit_rows)}")
+    _print_orphan_classes(orphan_commit_rows)
+    _suggest_issues(args, orphan_commit_rows, jira_issues, missing_rows, output_dir)
+    return missing_rows, orphan_commit_rows, matched_rows
+
+
+def _commit_key_index(summary_rows: List[dict]) -> Tuple[List[dict], set]:
+    """Read the commit CSVs once: rows tagged with their extracted keys, plus the union of keys."""
+    commit_rows: List[dict] = []
+    for sr in summary_rows:
+        csv_path = Path(sr["csv_path"])
+        with csv_path.open("r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            for r in reader:
+                msg = r.get("message", "")
+                keys = extract_keys(msg)
+                r["_extracted_keys"] = ";".join(keys)
+                r["_keys_set"] = set(keys)
+                commit_rows.append(r)
+    commit_keys = set().union(*(r["_keys_set"] for r in commit_rows)) if commit_rows else set()
+    return commit_rows, commit_keys
+
+
+def _compare(
+    commit_rows: List[dict],
+    commit_keys: set,
+    jira_issues: List[dict],
+    output_dir: Path,
+    key_classes: Optional[Dict[str, Tuple[str, str]]] = None,
+) -> Tuple[List[dict], List[dict], List[dict]]:
+    """Missing-in-repo, orphan and matched (key, commit) rows for one issue set.
+
+    Writes the missing/orphan CSVs to ``output_dir``. With ``key_classes`` (see
+    :func:`classify_orphan_keys`) each orphan gets ``orphan_class``/``orphan_detail``.
+    """
+    jira_keys = {i["key"] for i in jira_issues}
+    missing_keys = sorted(list(jira_keys - commit_keys))
+    issue_by_key = {i["key"]: i for i in jira_issues}
+    missing_rows: List[dict] = []
+    for k in missing_keys:
+        i = issue_by_key.get(k, {})
+        missing_rows.append({
+            "key": k,
+            "summary": i.get("summary", ""),
+            "status": i.get("status", ""),
+            "assignee": i.get("assignee", ""),
+            "fixVersions": ", ".join(i.get("fixVersions", []) or []),
+            "updated": i.get("updated", ""),
+        })
+
+    orphan_commit_rows = [
+        {k: v for k, v in r.items() if k != "_keys_set"}
+        for r in commit_rows
+        if len(r["_keys_set"]) == 0 or not (r["_keys_set"] & jira_keys)
+    ]
+    if key_classes is not None:
+        for r in orphan_commit_rows:
+            r["orphan_class"], r["orphan_detail"] = _orphan_class(r["_extracted_keys"], key_classes)
+    matched_rows = [
+        {
+            "key": k,
+            "status": issue_by_key[k].get("status", ""),
+            "project": r.get("project", ""),
+            "repo": r.get("repo", ""),
+            "branch": r.get("branch", ""),
+            "commit": r.get("id", ""),
+            "authorTimestamp": r.get("authorTimestamp", ""),
+        }
+        for r in commit_rows
+        for k in sorted(r["_keys_set"] & jira_keys)
+    ]
+
+    missing_csv = output_dir / "missing_in_repo.csv"
+    orphan_csv = output_dir / "orphan_commits.csv"
+    _write_csv(missing_csv, ["key", "summary", "status", "assignee", "fixVersions", "updated"], missing_rows)
+    _write_csv(
+        orphan_csv,
+        [
+            "project",
+            "repo",
+            "branch",
+            "displayId",
+            "author",
+            "authorEmail",
+            "authorTimestamp",
+            "message",
+            "link",
+            "extracted_keys",
+            "orphan_class",
+            "orphan_detail",
+            "patch_id",
+            "equivalent_to",
+        ],
+        [
+            {
+                "project": r.get("project", ""),
+                "repo": r.get("repo", ""),
+                "branch": r.get("branch", ""),
+                "displayId": r.get("displayId") or (r.get("id", "")[:10]),
+                "author": r.get("author", ""),
+                "authorEmail": r.get("authorEmail", ""),
+                "authorTimestamp": r.get("authorTimestamp", ""),
+                "message": r.get("message", ""),
+                "link": r.get("link", ""),
+                "extracted_keys": r.get("_extracted_keys", ""),
+                "orphan_class": r.get("orphan_class", ""),
+                "orphan_detail": r.get("orphan_detail", ""),
+                "patch_id": r.get("patch_id", ""),
+                "equivalent_to": r.get("equivalent_to", ""),
+            }
+            for r in orphan_commit_rows
+        ],
+    )
+    return missing_rows, orphan_commit_rows, matched_rows
+
+
+# Most to least benign; a commit with several keys takes its most benign class.
+ORPHAN_CLASSES = (
+    "sub-task of in-scope story",
+    "different fixVersion",
+    "excluded by JQL",
+    "nonexistent",
+    "unresolved",
+    "no key",
+)
+
+
+def classify_orphan_keys(
+    keys: Iterable[str],
+    jira_issues: List[dict],
+    fix_versions: List[str],
+    resolve: Callable[[List[str]], Dict[str, Optional[dict]]],
+) -> Dict[str, Tuple[str, str]]:
+    """Why each commit key outside the Jira result is not in it: key -> (class, detail).
+
+    ``resolve`` looks up issues by key in batches (``fetch_issues_by_keys``); it is
+    called once for the keys and once more for parents outside the result, so the
+    round trips do not grow with the number of orphans. A sub-task without its
+    own fix version is judged by its parent's.
+    """
+    keys = sorted(set(keys))
+    in_scope = {i["key"] for i in jira_issues}
+    issues = resolve(keys) if keys else {}
+    parents = sorted({i["parent"] for i in issues.values() if i and i.get("parent")} - in_scope - issues.keys())
+    if parents:
+        issues = {**resolve(parents), **issues}
+    audited = {v.casefold() for v in fix_versions}
+    classes: Dict[str, Tuple[str, str]] = {}
+    for k in keys:
+        issue = issues.get(k)
+        if issue is None:
+            classes[k] = ("nonexistent", "")
+            continue
+        parent = issue.get("parent") or ""
+        if parent in in_scope:
+            classes[k] = ("sub-task of in-scope story", parent)
+            continue
+        versions = issue.get("fixVersions") or (issues.get(parent) or {}).get("fixVersions") or []
+        if audited and not any(v.casefold() in audited for v in versions):
+            classes[k] = ("different fixVersion", ", ".join(versions) or "none")
+        else:
+            classes[k] = ("excluded by JQL", f"{issue.get('issuetype') or ''}, {issue.get('status') or ''}".strip(", "))
+    return classes
+
+
+def _orphan_class(extracted_keys: str, key_classes: Dict[str, Tuple[str, str]]) -> Tuple[str, str]:
+    keys = [k for k in extracted_keys.split(";") if k]
+    if not keys:
+        return "no key", ""
+    found = [(k, key_classes.get(k, ("unresolved", ""))) for k in keys]
+    k, (cls, detail) = min(found, key=lambda f: ORPHAN_CLASSES.index(f[1][0]))
+    return cls, f"{k}: {detail}" if detail else k
+
+
+def _resolve_orphan_keys(args, commit_keys: set, jira_issues: List[dict]) -> Optional[Dict[str, Tuple[str, str]]]:
+    """Classify the commit keys Jira's result does not contain; ``None`` if skipped or failed."""
+    if getattr(args, "no_resolve_orphans", False):
+        return None
+    unresolved = commit_keys - {i["key"] for i in jira_issues}
+    try:
+        with span("stage.resolve_orphans", keys=len(unresolved)):
+            return classify_orphan_keys(
+                unresolved, jira_issues, _fix_versions(args),
+                lambda keys: fetch_issues_by_keys(keys, ttl_hours=args.jql_ttl_hours,
+                                                  force_refresh=args.jql_force_refresh),
+            )
+    except Exception as e:
+        logger.warning("Orphan keys not resolved: %s", e)
+        return None
+
+
+def _print_orphan_classes(orphan_rows: List[dict]) -> None:
+    counts: Dict[str, int] = {}
+    for r in orphan_rows:
+        if r.get("orphan_class"):
+            counts[r["orphan_class"]] = counts.get(r["orphan_class"], 0) + 1
+    if counts:
+        print("Orphan commits by cause: " + ", ".join(f"{c} {n}" for c, n in sorted(
+            counts.items(), key=lambda item: ORPHAN_CLASSES.index(item[0]))))
+
+
+SUGGESTION_FIELDS = ["project", "repo", "branch", "displayId", "message", "rank", "key", "score",
+                     "summary", "missing_in_repo"]
+
+
+def _suggest_issues(args, orphan_rows: List[dict], jira_issues: List[dict], missing_rows: List[dict],
+                    output_dir: Path) -> Optional[Path]:
+    """Top-k likely Jira issues for each orphan commit without a key (``orphan_suggestions.csv``)."""
+    if not getattr(args, "suggest_issues", False):
+        return None
+    from release_copilot.kit.tfidf import IssueIndex
+
+    keyless = [r for r in orphan_rows if not r.get("_extracted_keys")]
+    try:
+        with span("stage.suggest", orphans=len(keyless), issues=len(jira_issues)):
+            index = IssueIndex.cached(sorted((i["key"], i.get("summary") or "") for i in jira_issues))
+            ranked = index.top_k([(r.get("message", "") or "").split("\n", 1)[0] for r in keyless],
+                                 k=args.suggest_top_k)
+    except RuntimeError as e:
+        logger.warning("Issue suggestions skipped: %s", e)
+        return None
+    summaries = {i["key"]: i.get("summary") or "" for i in jira_issues}
+    missing = {m["key"] for m in missing_rows}
+    rows = [
+        {
+            "project": r.get("project", ""),
+            "repo": r.get("repo", ""),
+            "branch": r.get("branch", ""),
+            "displayId": r.get("displayId", ""),
+            "message": (r.get("message", "") or "").split("\n", 1)[0],
+            "rank": rank,
+            "key": key,
+            "score": score,
+            "summary": summaries.get(key, ""),
+            "missing_in_repo": "yes" if key in missing else "no",
+        }
+        for r, hits in zip(keyless, ranked)
+        for rank, (key, score) in enumerate(hits, 1)
+    ]
+    path = _write_csv(output_dir / "orphan_suggestions.csv", SUGGESTION_FIELDS, rows)
+    print(f"Issue suggestions: {sum(1 for hits in ranked if hits)} of {len(keyless)} keyless orphan(s) -> {path}")
+    return path
+
+
+def _write_delta(against: str, run_id: str, summary_rows: List[dict], missing_rows: List[dict],
+                 orphan_rows: List[dict], matched_rows: List[dict], output_dir: Path) -> Dict[str, str]:
+    """Diff this run's comparison against the run id ``against``; best-effort."""
+    from release_copilot.reporting import delta
+
+    try:
+        with span("stage.delta", against=against):
+            before = delta.load_snapshot(against)
+            after = delta.Snapshot.from_rows(run_id, summary_rows, missing_rows, orphan_rows, matched_rows)
+            rows = delta.diff_snapshots(before, after)
+            paths = delta.write_delta(rows, output_dir, before=against, after=run_id)
+    except FileNotFoundError as e:
+        print(f"Delta skipped: {e}")
+        return {}
+    counts: Dict[str, int] = {}
+    for r in rows:
+        counts[r["change"]] = counts.get(r["change"], 0) + 1
+    print(f"Delta vs {against}: " + (", ".join(f"{n} {c.replace('_', ' ')}" for c, n in counts.items()) or "no changes"))
+    return {name: str(path) for name, path in paths.items()}
+
+
+def _record_history(run_id: str, kind: str, args, summary_rows: List[dict], missing_rows: List[dict],
+                    orphan_rows: List[dict], matched_rows: List[dict], since_utc: datetime, until_utc: datetime) -> None:
+    """Ingest the comparison into the run-history database; never fails the audit."""
+    from release_copilot.kit import history
+
+    try:
+        with span("history.record", "io"):
+            history.record_run(
+                run_id, kind, _fix_versions(args), summary_rows, missing_rows, orphan_rows, matched_rows,
+                since=since_utc.isoformat(), until=until_utc.isoformat(),
+                params={"config": getattr(args, "config", None), "jql": getattr(args, "jql", None)},
+            )
+    except Exception as e:
+        logger.warning("Run history not recorded: %s", e)
+
+
+def main(argv: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Run the audit (or hand it to a running ``release-copilot serve`` daemon).
+
+    Returns ``{"run_id", "artifacts"}`` with absolute artifact paths. A run that
+    was cancelled or hit ``--deadline`` returns what it finished plus
+    ``"incomplete": <reason>``; ``--resume`` picks it up from there.
+    """
     parser = argparse.ArgumentParser()
     parser.add_argument("--config")
     parser.add_argument("--develop-branch")
@@ -165,25 +744,70 @@ def main() -> None:
     parser.add_argument("--report-name", type=str, default="release_audit", help="Base name for Markdown/Excel reports")
     parser.add_argument("--write-llm-summary", action="store_true", default=False, help="Generate optional LLM-written narrative")
     parser.add_argument("--llm-model", type=str, default=None, help="LLM model for narrative (default from config or gpt-4o-mini)")
+    parser.add_argument("--llm-provider", type=str, default=None, help="LLM provider: openai or stub (default LLM_PROVIDER from .env)")
     parser.add_argument("--llm-max-tokens", type=int, default=1200, help="Max tokens for LLM completion")
     parser.add_argument("--llm-budget-cents", type=int, default=10, help="Hard cap on estimated LLM spend (cents)")
-    parser.add_argument("--llm-top-n", type=int, default=15, help="Highlights per repo to include in LLM context")
+    parser.add_argument("--llm-top-n", type=int, default=15, help="Highlight candidates per repo for the LLM context")
+    parser.add_argument("--llm-context-tokens", type=int, default=16_000, help="Cap on LLM prompt tokens; the budget and the model's context window may lower it further (default 16000)")
+    parser.add_argument("--llm-mode", choices=["single", "map-reduce"], default="single", help="single prompt, or per-repo sections (cached per repo) combined by a reduce prompt")
+    parser.add_argument("--llm-workers", type=int, default=4, help="Concurrent per-repo LLM calls in map-reduce mode")
+    parser.add_argument("--llm-stream", action="store_true", help="Stream the narrative to the console (and Markdown file) as it is written")
     parser.add_argument("--llm-report-name", type=str, default="release_audit_llm", help="Base name for LLM markdown")
-    parser.add_argument("--fix-version", type=str, default=None, help='Fix Version label or date (e.g. "Mobilitas 2025.08.22") for JQL substitution')
+    parser.add_argument("--fix-version", action="append", default=[], help='Fix Version label or date (e.g. "Mobilitas 2025.08.22") for JQL substitution; repeat to audit several with one Jira search')
     parser.add_argument("--jql", type=str, default=None, help="Custom JQL (overrides default)")
     parser.add_argument("--jql-ttl-hours", type=int, default=12, help="Cache TTL for Jira search")
     parser.add_argument("--jql-force-refresh", action="store_true", help="Bypass Jira cache")
     parser.add_argument("--connectivity-only", action="store_true", help="Check Jira/Bitbucket connectivity and exit")
-    args = parser.parse_args()
+    parser.add_argument("--profile", action="store_true", help="Profile the run (pstats + collapsed stacks under data/runs/<run-id>/profile)")
+    parser.add_argument("--profile-memory", action="store_true", help="Also trace allocations: per-stage peak memory and top allocation sites")
+    parser.add_argument("--resume", metavar="RUN_ID", default=None, help="Resume a failed run: reuse its arguments and skip completed stages")
+    parser.add_argument("--no-resolve-orphans", action="store_true", help="Do not look up orphan commit keys in Jira to classify them")
+    parser.add_argument("--suggest-issues", action="store_true", help="Suggest likely Jira issues for keyless orphan commits (local TF-IDF; needs numpy and scipy)")
+    parser.add_argument("--suggest-top-k", type=int, default=3, help="Suggestions per orphan commit")
+    parser.add_argument("--patch-ids", action="store_true", help="Group cherry-picked/rebased commits across branches by patch-id")
+    parser.add_argument("--patch-id-workers", type=int, default=8, help="Concurrent diff fetches for --patch-ids")
+    parser.add_argument("--diff-against", metavar="RUN_ID", default=None, help='Report only what changed since an earlier run ("last" = the previous run of the same config, fix versions and JQL); writes delta.csv/delta.md')
+    parser.add_argument("--no-history", action="store_true", help="Do not record this run in data/history.sqlite")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS", default=None, help="Stop after this many seconds (within one page) and keep the partial results, marked incomplete; resume later with --resume")
+    parser.add_argument("--daemon", action="store_true", help="Hand the run to a release-copilot daemon serving this directory, if one is running")
+    parser.add_argument("--no-daemon", action="store_true", help="Always run in this process (overrides --daemon)")
+    parser.add_argument("--daemon-url", default=None, help="Daemon to delegate to (default RELEASE_COPILOT_DAEMON or http://127.0.0.1:8765)")
+    args = parser.parse_args(argv)
+
+    if args.daemon and not args.no_daemon and not args.profile and not args.profile_memory:
+        from release_copilot.kit.daemon_client import DaemonClient
+
+        # A daemon elsewhere would use its own .env and data stores, not this directory's.
+        client = DaemonClient.discover(args.daemon_url, cwd=Path.cwd())
+        if client is not None:
+            return _delegate(client, sys.argv[1:] if argv is None else list(argv))
+        print("No release-copilot daemon serving this directory; running locally")
+
+    checkpoint: Optional[Checkpoint] = None
+    if args.resume:
+        try:
+            checkpoint = Checkpoint.resume(args.resume)
+        except FileNotFoundError as e:
+            raise SystemExit(str(e))
+        # The original arguments win so every restored stage matches the rest of the run.
+        args = argparse.Namespace(**{
+            **checkpoint.params["args"],
+            "resume": args.resume,
+            # Profiling and the deadline are about this invocation, not the original one.
+            "profile": args.profile,
+            "profile_memory": args.profile_memory,
+            "deadline": args.deadline,
+        })
+        print(f"Resuming run {checkpoint.run_id}; completed stages: {', '.join(checkpoint.completed) or '(none)'}")
 
     if not args.connectivity_only and not args.config:
-        parser.error("--config is required unless --connectivity-only")
+        parser.error("--config is required unless --connectivity-only or --resume")
 
     if args.connectivity_only:
         from release_copilot.tools.bitbucket_ping import bitbucket_ping
         from release_copilot.tools.jira_tools import _self_test as jira_self_test
 
-        project_key = settings.bitbucket_project
+        project_key = get_settings().bitbucket_project
         if project_key:
             bb_ok, bb_msg = bitbucket_ping(project_key)
         else:
@@ -199,8 +823,7 @@ def main() -> None:
 
     cfg = load_config(args.config)
 
-    if not args.fix_version and cfg.fix_version:
-        args.fix_version = cfg.fix_version
+    args.fix_version = _fix_versions(args) or ([cfg.fix_version] if cfg.fix_version else [])
     if not args.llm_model:
         args.llm_model = cfg.llm_model or "gpt-4o-mini"
 
@@ -210,6 +833,91 @@ def main() -> None:
         else _default_window()
     )
 
+    if getattr(args, "diff_against", None) == "last":
+        from release_copilot.reporting import delta
+
+        # Resolved once and pinned with the params, so a resumed run diffs against the same run.
+        args.diff_against = delta.previous_run_id({"args": vars(args)},
+                                                  current=checkpoint.run_id if checkpoint else None)
+        if args.diff_against is None:
+            raise SystemExit(
+                "--diff-against last: no earlier run of this config with the same fix versions and JQL "
+                "finished its Jira comparison. Run once without --diff-against, or pass a run id."
+            )
+
+    if checkpoint is None:
+        checkpoint = Checkpoint()
+        # Pin the resolved window; a resumed default window would otherwise move.
+        args.since, args.until = since_utc.isoformat(), until_utc.isoformat()
+        checkpoint.set_params({"args": vars(args)})
+    print(f"Run id: {checkpoint.run_id} (resume with --resume {checkpoint.run_id})")
+
+    profiler = (
+        Profiler(checkpoint.dir / "profile", memory=args.profile_memory)
+        if args.profile or args.profile_memory
+        else None
+    )
+    tracer = Tracer(track_memory=args.profile_memory)
+    artifacts: Dict[str, str] = {}
+    incomplete: Optional[str] = None
+    try:
+        # A daemon job's token is the parent, so its cancel endpoint stops this run too.
+        with profiler or nullcontext(), tracer, CancelToken(args.deadline, parent=current_token()):
+            _run_stages(args, cfg, checkpoint, since_utc, until_utc, artifacts)
+    except Cancelled as e:
+        incomplete = str(e)
+        print(f"Stopped early ({incomplete}); results are partial. Resume with --resume {checkpoint.run_id}")
+    finally:
+        trace_path = tracer.write(checkpoint.dir / "trace.json")
+        print_summary(tracer.summary())
+        print(f"Trace written to {trace_path} (open in https://ui.perfetto.dev)")
+        if profiler is not None:
+            for name, path in profiler.outputs.items():
+                print(f"Profile {name}: {path}")
+    checkpoint.mark_incomplete(incomplete)
+    artifacts["trace"] = str(trace_path)
+    result: Dict[str, Any] = {
+        "run_id": checkpoint.run_id,
+        "artifacts": {name: str(Path(path).resolve()) for name, path in artifacts.items()},
+    }
+    if incomplete:
+        result["incomplete"] = incomplete
+    return result
+
+
+def _delegate(client, argv: List[str]) -> Dict[str, Any]:
+    """Run ``argv`` on the daemon, echoing its console output as it arrives."""
+    # The daemon has its own working directory: pin relative paths to ours.
+    argv = list(argv)
+    for flag in ("--config", "--output-dir"):
+        if flag in argv and argv.index(flag) + 1 < len(argv):
+            i = argv.index(flag) + 1
+            argv[i] = str(Path(argv[i]).resolve())
+    if "--output-dir" not in argv:
+        argv += ["--output-dir", str(Path("data/outputs").resolve())]
+    print(f"Delegating to release-copilot daemon at {client.base_url} (omit --daemon to run locally)")
+    job_id = client.submit("config", argv=argv)
+    echo = lambda text: print(text, end="", flush=True)  # noqa: E731
+    try:
+        status = client.wait(job_id, on_output=echo)
+    except KeyboardInterrupt:
+        # Ctrl+C stops the daemon's run too; wait for its partial result.
+        print("\nCancelling the daemon run…")
+        status = client.wait(job_id, on_output=echo, cancelled=lambda: True)
+    if status["status"] == "failed":
+        raise SystemExit(status.get("error") or 1)
+    return status.get("result") or {}
+
+
+def _run_stages(args, cfg: ConfigData, checkpoint: Checkpoint, since_utc: datetime, until_utc: datetime,
+                artifacts: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Collect, compare, report and narrate, skipping stages ``checkpoint`` already holds.
+
+    Returns artifact name -> path for everything this run has produced. They are
+    added to ``artifacts`` as stages finish, so a caller's dict keeps them when a
+    later stage is cancelled.
+    """
+    artifacts = {} if artifacts is None else artifacts
     branches = _branch_loop(args, cfg)
     print(f"Commit window: {since_utc.isoformat()} to {until_utc.isoformat()}")
 
@@ -222,188 +930,126 @@ def main() -> None:
 
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
-    summary_rows: List[dict] = []
-    repo_csv_map: Dict[str, Path] = {}
 
-    for project, repo in repo_pairs:
-        for branch in branches:
-            key = str(
-                CacheKey(
-                    "bb:commits",
-                    {
-                        "project": project,
-                        "repo": repo,
-                        "branch": branch,
-                        "since": since_utc.isoformat(),
-                        "until": until_utc.isoformat(),
-                    },
-                )
-            )
-
-            def fetch() -> List[dict]:
-                return fetch_commits_window(project, repo, branch, since_utc, until_utc)
-
-            commits, source = load_cache_or_call(
-                key,
-                ttl_hours=args.cache_ttl_hours,
-                fetch_fn=fetch,
-                force_refresh=args.force_refresh,
-            )
-
-            print(f"{project}/{repo} {branch}: {source} ({len(commits)} commits)")
-
-            branch_safe = branch.replace("/", "_")
-            csv_name = f"commits_{project}_{repo}_{branch_safe}_{since_utc:%Y%m%d}_{until_utc:%Y%m%d}.csv"
-            csv_path = output_dir / csv_name
-            _write_commits_csv(csv_path, commits, project, repo, branch)
-            repo_csv_map[repo] = csv_path
-
-            summary_rows.append(
-                {
-                    "project": project,
-                    "repo": repo,
-                    "branch": branch,
-                    "count": len(commits),
-                    "since_iso": since_utc.isoformat(),
-                    "until_iso": until_utc.isoformat(),
-                    "csv_path": str(csv_path),
-                    "source": source,
-                }
-            )
-
-    summary_path = output_dir / "summary.csv"
-    with summary_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=[
-                "project",
-                "repo",
-                "branch",
-                "count",
-                "since_iso",
-                "until_iso",
-                "csv_path",
-                "source",
-            ],
-        )
-        writer.writeheader()
-        writer.writerows(summary_rows)
+    # Stage 1: commits per repo/branch (CSV files are the stage output).
+    artifacts["summary"] = str(output_dir / "summary.csv")
+    summary_rows: Optional[List[dict]] = None
+    if checkpoint.done("collect"):
+        summary_rows = checkpoint.load("collect")["summary_rows"]
+        if all(Path(sr["csv_path"]).exists() for sr in summary_rows):
+            print(f"Commits: restored {len(summary_rows)} repo/branch CSVs from checkpoint")
+        else:
+            summary_rows = None
+    if summary_rows is None:
+        with span("stage.collect"):
+            summary_rows = _collect_commits(args, repo_pairs, branches, since_utc, until_utc, output_dir)
+        checkpoint.save("collect", {"summary_rows": summary_rows})
+    repo_csv_map: Dict[str, Path] = {sr["repo"]: Path(sr["csv_path"]) for sr in summary_rows}
 
-    print(f"Summary written to {summary_path}")
+    # Stage 1b: cherry-pick equivalence; patch-ids are cached per SHA, so this is cheap on reruns.
+    if getattr(args, "patch_ids", False):
+        with span("stage.equivalence"):
+            artifacts["equivalent_commits"] = str(_detect_equivalents(args, summary_rows, output_dir))
 
-    # Jira comparison
-    missing_rows: List[dict] = []
-    orphan_commit_rows: List[dict] = []
-    try:
-        jql = resolve_jql(args, settings)
-        logger.info("Resolved JQL: %s", jql)
-        validate_jql_or_raise(jql)
-        jira_issues = search_issues_cached(jql, ttl_hours=args.jql_ttl_hours, force_refresh=args.jql_force_refresh)
-        jira_keys = {i["key"] for i in jira_issues}
-
-        commit_rows: List[dict] = []
-        for sr in summary_rows:
-            csv_path = Path(sr["csv_path"])
-            with csv_path.open("r", encoding="utf-8", newline="") as f:
-                reader = csv.DictReader(f)
-                for r in reader:
-                    msg = r.get("message", "")
-                    keys = extract_keys(msg)
-                    r["_extracted_keys"] = ";".join(keys)
-                    r["_keys_set"] = set(keys)
-                    commit_rows.append(r)
-
-        commit_keys = set().union(*(r["_keys_set"] for r in commit_rows)) if commit_rows else set()
-        missing_keys = sorted(list(jira_keys - commit_keys))
-        issue_by_key = {i["key"]: i for i in jira_issues}
-        for k in missing_keys:
-            i = issue_by_key.get(k, {})
-            missing_rows.append({
-                "key": k,
-                "summary": i.get("summary", ""),
-                "status": i.get("status", ""),
-                "assignee": i.get("assignee", ""),
-                "fixVersions": ", ".join(i.get("fixVersions", []) or []),
-                "updated": i.get("updated", ""),
-            })
-
-        orphan_commit_rows = [r for r in commit_rows if len(r["_keys_set"]) == 0 or not (r["_keys_set"] & jira_keys)]
-
-        missing_csv = output_dir / "missing_in_repo.csv"
-        orphan_csv = output_dir / "orphan_commits.csv"
-        _write_csv(missing_csv, ["key", "summary", "status", "assignee", "fixVersions", "updated"], missing_rows)
-        _write_csv(
-            orphan_csv,
-            [
-                "project",
-                "repo",
-                "branch",
-                "displayId",
-                "author",
-                "authorEmail",
-                "authorTimestamp",
-                "message",
-                "link",
-                "extracted_keys",
-            ],
-            [
-                {
-                    "project": r.get("project", ""),
-                    "repo": r.get("repo", ""),
-                    "branch": r.get("branch", ""),
-                    "displayId": r.get("displayId") or (r.get("id", "")[:10]),
-                    "author": r.get("author", ""),
-                    "authorEmail": r.get("authorEmail", ""),
-                    "authorTimestamp": r.get("authorTimestamp", ""),
-                    "message": r.get("message", ""),
-                    "link": r.get("link", ""),
-                    "extracted_keys": r.get("_extracted_keys", ""),
-                }
-                for r in orphan_commit_rows
-            ],
-        )
-        print(f"Missing-in-repo: {len(missing_rows)} | Orphan commits: {len(orphan_commit_rows)}")
-    except Exception as e:
-        logger.warning("Jira comparison skipped: %s", e)
-        missing_rows = []
-        orphan_commit_rows = []
+    # Stage 2: Jira comparison. A skipped comparison is not checkpointed, so resume retries it.
+    if checkpoint.done("compare"):
+        compared = checkpoint.load("compare")
+        missing_rows, orphan_commit_rows = compared["missing_rows"], compared["orphan_commit_rows"]
+        matched_rows = compared.get("matched_rows", [])
+        print(f"Jira comparison: restored from checkpoint ({len(missing_rows)} missing, {len(orphan_commit_rows)} orphan)")
+    else:
+        try:
+            fix_versions = _fix_versions(args)
+            with span("stage.compare", fix_versions=len(fix_versions)):
+                if len(fix_versions) > 1:
+                    compared = _compare_fix_versions(args, summary_rows, output_dir, fix_versions)
+                else:
+                    compared = _compare_with_jira(args, summary_rows, output_dir)
+            missing_rows, orphan_commit_rows, matched_rows = compared
+            emit("compare", "done", done=len(matched_rows),
+                 message=f"{len(missing_rows)} missing, {len(orphan_commit_rows)} orphan")
+            checkpoint.save("compare", {"missing_rows": missing_rows, "orphan_commit_rows": orphan_commit_rows,
+                                        "matched_rows": matched_rows})
+            if not getattr(args, "no_history", False):
+                _record_history(checkpoint.run_id, "config", args, summary_rows, missing_rows, orphan_commit_rows,
+                                matched_rows, since_utc, until_utc)
+        except Exception as e:
+            logger.warning("Jira comparison skipped: %s", e)
+            missing_rows = []
+            orphan_commit_rows = []
+            matched_rows = []
+    if checkpoint.done("compare"):
+        artifacts["missing_in_repo"] = str(output_dir / "missing_in_repo.csv")
+        artifacts["orphan_commits"] = str(output_dir / "orphan_commits.csv")
+        if len(_fix_versions(args)) > 1:
+            artifacts["fix_versions"] = str(output_dir / "fix_versions.csv")
+        if getattr(args, "suggest_issues", False) and (output_dir / "orphan_suggestions.csv").exists():
+            artifacts["orphan_suggestions"] = str(output_dir / "orphan_suggestions.csv")
+        if getattr(args, "diff_against", None):
+            artifacts.update(_write_delta(args.diff_against, checkpoint.run_id, summary_rows, missing_rows,
+                                          orphan_commit_rows, matched_rows, output_dir))
 
     branches_label = ", ".join(branches)
     if args.write_report:
-        build_reports(summary_rows, output_dir, repo_csv_map, base_name=args.report_name)
+        if checkpoint.done("report"):
+            print("Reports: already written for this run")
+        else:
+            with span("stage.report"):
+                build_reports(summary_rows, output_dir, repo_csv_map, base_name=args.report_name)
+            checkpoint.save("report", {"base_name": args.report_name, "output_dir": str(output_dir)})
+        artifacts["markdown"] = str(output_dir / f"{args.report_name}.md")
+        artifacts["excel"] = str(output_dir / f"{args.report_name}.xlsx")
 
     if args.write_llm_summary:
-        missing_preview = missing_rows[:20]
+        if checkpoint.done("llm_summary"):
+            artifacts["llm_markdown"] = checkpoint.load("llm_summary")["path"]
+            print(f"LLM summary already written: {artifacts['llm_markdown']}")
+            return artifacts
+        # Candidate lists; build_context keeps the best few hundred, the packer what fits.
+        missing_preview = missing_rows
         orphan_preview = [
             {
                 "repo": r.get("repo", ""),
                 "displayId": r.get("displayId", ""),
-                "line": (r.get("message", "") or "").splitlines()[0][:160],
+                "line": ((r.get("message", "") or "").splitlines() or [""])[0][:160],
             }
-            for r in orphan_commit_rows[:20]
+            for r in orphan_commit_rows
         ]
         try:
-            llm_md = build_llm_summary(
-                summary_rows=summary_rows,
-                output_dir=output_dir,
-                window=(since_utc, until_utc),
-                branches_label=branches_label,
-                repo_csv_map=repo_csv_map,
-                model=args.llm_model,
-                max_tokens=args.llm_max_tokens,
-                budget_cents=args.llm_budget_cents,
-                top_n_per_repo=args.llm_top_n,
-                base_name=args.llm_report_name,
-                fix_version=_clean_fix_version(getattr(args, "fix_version", None)) if hasattr(args, "fix_version") else None,
-                missing_preview=missing_preview,
-                orphan_preview=orphan_preview,
-            )
+            from release_copilot.reporting.llm_summary import build_llm_summary
+
+            with CostSession(), span("stage.llm"):
+                llm_md = build_llm_summary(
+                    summary_rows=summary_rows,
+                    output_dir=output_dir,
+                    window=(since_utc, until_utc),
+                    branches_label=branches_label,
+                    repo_csv_map=repo_csv_map,
+                    model=args.llm_model,
+                    max_tokens=args.llm_max_tokens,
+                    budget_cents=args.llm_budget_cents,
+                    top_n_per_repo=args.llm_top_n,
+                    base_name=args.llm_report_name,
+                    fix_version=", ".join(_fix_versions(args)) or None,
+                    missing_preview=missing_preview,
+                    orphan_preview=orphan_preview,
+                    max_context_tokens=args.llm_context_tokens,
+                    mode=args.llm_mode,
+                    max_workers=args.llm_workers,
+                    stream=args.llm_stream,
+                    on_delta=(lambda t: print(t, end="", flush=True)) if args.llm_stream else None,
+                    provider=args.llm_provider,
+                )
+            if args.llm_stream:
+                print()
+            checkpoint.save("llm_summary", {"path": str(llm_md)})
+            artifacts["llm_markdown"] = str(llm_md)
             print(f"LLM summary written: {llm_md}")
         except Exception as e:
             print(f"LLM summary skipped: {e}")
     else:
         print("LLM summary not requested (use --write-llm-summary to enable).")
-
+    return artifacts
 
 if __name__ == "__main__":
     main()
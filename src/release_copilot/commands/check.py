@@ -0,0 +1,83 @@
+"""Is a Jira key in a branch? Answered from the key index, no audit run needed.
+
+    release-copilot check MOBI-1234 MOBI-1240
+    release-copilot check MOBI-1234 --branch release/r-55.1
+    release-copilot check MOBI-1234 --repo MOB/claimcenter --branch release/r-55.1 --refresh
+
+The index (``data/key_index.sqlite``) is filled by every commit fetch. ``--refresh``
+first fetches only the affected branches, and only commits newer than what the
+index already holds. Exits 1 when a key is not found.
+"""
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from release_copilot.kit import key_index
+from release_copilot.kit.key_index import Branch
+
+
+def affected_branches(repos: List[str], branches: List[str], indexed: Dict[Branch, Optional[int]]) -> List[Branch]:
+    """Indexed branches matching the filters, plus explicit repo x branch pairs not indexed yet."""
+    pairs = [tuple(r.split("/", 1)) for r in repos]
+    chosen = [
+        b for b in indexed
+        if (not pairs or (b[0], b[1]) in pairs) and (not branches or b[2] in branches)
+    ]
+    chosen += [(p, r, b) for p, r in pairs for b in branches if (p, r, b) not in indexed]
+    return chosen
+
+
+def refresh(targets: List[Branch], indexed: Dict[Branch, Optional[int]], days: int, workers: int = 4) -> None:
+    """Fetch each target's commits newer than its indexed head (or the last ``days``) and index them."""
+    from release_copilot.tools.bitbucket_tools import fetch_commits_window
+
+    until = datetime.now(tz=timezone.utc)
+
+    def one(target: Branch) -> int:
+        newest = indexed.get(target)
+        since = (datetime.fromtimestamp(newest / 1000, tz=timezone.utc) if newest
+                 else until - timedelta(days=days))
+        return key_index.index_commits(*target, fetch_commits_window(*target, since, until))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="refresh") as pool:
+        for target, n in zip(targets, pool.map(one, targets)):
+            print(f"Refreshed {target[0]}/{target[1]}@{target[2]}: {n} keyed commit(s)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="check", description="Look up Jira keys in the commit key index")
+    parser.add_argument("keys", nargs="+", metavar="KEY")
+    parser.add_argument("--repo", action="append", default=[], metavar="PROJECT/REPO", help="Limit to a repo (repeatable)")
+    parser.add_argument("--branch", action="append", default=[], help="Limit to a branch (repeatable)")
+    parser.add_argument("--refresh", action="store_true", help="Fetch new commits of the affected branches first")
+    parser.add_argument("--days", type=int, default=90, help="History to fetch for branches not indexed yet")
+    args = parser.parse_args(argv)
+    if any("/" not in r for r in args.repo):
+        parser.error("--repo expects PROJECT/REPO")
+
+    keys = [k.strip().upper() for k in args.keys]
+    indexed = key_index.indexed_branches()
+    if args.refresh:
+        targets = affected_branches(args.repo, args.branch, indexed)
+        if not targets:
+            parser.error("--refresh needs --repo and --branch when nothing is indexed yet")
+        refresh(targets, indexed, args.days)
+    pairs = {tuple(r.split("/", 1)) for r in args.repo}
+    found = key_index.lookup(keys, branches=args.branch or None)
+    missing = 0
+    for key in keys:
+        hits = [h for h in found[key] if not pairs or (h["project"], h["repo"]) in pairs]
+        if not hits:
+            missing += 1
+            print(f"{key}: not found ({len(indexed)} branch(es) indexed)")
+        for h in hits:
+            when = datetime.fromtimestamp(h["ts"] / 1000, tz=timezone.utc).date() if h["ts"] else ""
+            print(f"{key}: {h['project']}/{h['repo']}@{h['branch']} {h['sha'][:10]} {when}")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+"""Query the run-history database (``data/history.sqlite``).
+
+    python -m release_copilot.commands.history runs
+    python -m release_copilot.commands.history missing --last 3
+    python -m release_copilot.commands.history orphan-rate --repo claimcenter
+    python -m release_copilot.commands.history key MOBI-1234
+
+Every audit that reaches the Jira comparison is recorded automatically (see
+:mod:`release_copilot.kit.history`); ``--json`` prints raw rows for scripts.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from release_copilot.kit import history
+
+
+def _print_rows(rows: List[Dict[str, Any]], title: str, as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(rows, indent=2, default=str))
+        return
+    if not rows:
+        print(f"{title}: no rows")
+        return
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title=title)
+    for col in rows[0]:
+        table.add_column(col, justify="right" if isinstance(rows[0][col], (int, float)) else "left")
+    for r in rows:
+        table.add_row(*("" if v is None else str(v) for v in r.values()))
+    Console().print(table)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="history", description="Trend queries over recorded audit runs")
+    parser.add_argument("--db", type=Path, default=None, help="History database (default data/history.sqlite)")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_runs = sub.add_parser("runs", help="Most recent runs with totals")
+    p_runs.add_argument("--limit", type=int, default=20)
+    p_missing = sub.add_parser("missing", help="Issues missing across the last N releases")
+    p_missing.add_argument("--last", type=int, default=3)
+    p_missing.add_argument("--min-releases", type=int, default=None, help="Missing in at least this many (default: all N)")
+    p_rate = sub.add_parser("orphan-rate", help="Orphan commits / commits per repo over time")
+    p_rate.add_argument("--repo", default=None)
+    p_rate.add_argument("--limit", type=int, default=200)
+    p_key = sub.add_parser("key", help="Every recorded run that saw a Jira key")
+    p_key.add_argument("key")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "runs":
+        rows, title = history.list_runs(args.limit, db=args.db), "Recent runs"
+    elif args.cmd == "missing":
+        releases = history.latest_releases(args.last, db=args.db)
+        rows = history.missing_across(args.last, args.min_releases, db=args.db)
+        title = f"Missing across {', '.join(r['fix_version'] for r in releases) or 'no recorded releases'}"
+    elif args.cmd == "orphan-rate":
+        rows, title = history.orphan_rate(args.repo, args.limit, db=args.db), "Orphan rate per repo"
+    else:
+        rows, title = history.key_history(args.key, db=args.db), f"History of {args.key}"
+    _print_rows(rows, title, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""``release-copilot serve``: a warm local daemon that runs audits over HTTP/JSON.
+
+The process keeps settings, the Jira OAuth client, pooled HTTP sessions, parsed
+cache entries and heavy modules (openpyxl, the LLM stack) loaded, so repeated
+audits only pay for their incremental work. Endpoints (bound to 127.0.0.1):
+
+* ``GET  /health`` – liveness, queue size and the daemon's working directory
+* ``POST /audits`` – ``{"kind": "config", "argv": [...]}`` runs ``audit_from_config``;
+  ``{"kind": "graph", "kwargs": {...}}`` runs ``app.run_release_audit``; returns ``{"id"}``
+* ``GET  /audits/<id>?output_from=N&narrative_from=M&progress_from=P`` – status, new
+  console output, streamed narrative text and progress events since the given
+  offsets, and the result once done
+* ``GET  /audits/<id>/artifacts/<name>`` – download an artifact of a finished audit
+* ``POST /audits/<id>/cancel`` – stop the audit at its next page; a running audit
+  finishes with its partial result marked ``incomplete``, a queued one never starts
+
+Every endpoint but ``/health`` needs ``Authorization: Bearer <token>``; the token
+is generated per daemon and written to a 0600 file that ``DaemonClient`` reads.
+Requests carrying an ``Origin`` header (i.e. from a web page) are refused, and
+POSTs must be ``application/json``.
+
+Audits run one at a time on a single worker thread. While the daemon runs,
+``sys.stdout`` is a router that sends a job's console output (including output
+from pools that submit through ``contextvars.copy_context().run``) to that
+job's buffer; every other thread keeps writing to the real stream.
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import hmac
+import io
+import json
+import logging
+import mimetypes
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from release_copilot.kit.cancellation import CancelToken
+from release_copilot.kit.daemon_client import write_token
+from release_copilot.kit.errors import Cancelled
+from release_copilot.kit.progress import ProgressBus
+
+logger = logging.getLogger(__name__)
+
+Runner = Callable[["Job"], Dict[str, Any]]
+
+
+class _Buffer(io.TextIOBase):
+    """Append-only text sink readable from other threads by offset.
+
+    Chunks are kept with their running end offsets, so a poll only joins the
+    chunks past its offset instead of the whole output so far.
+    """
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._ends: List[int] = []
+        self._lock = threading.Lock()
+
+    def write(self, s: str) -> int:
+        if s:
+            with self._lock:
+                self._parts.append(s)
+                self._ends.append((self._ends[-1] if self._ends else 0) + len(s))
+        return len(s)
+
+    def read_from(self, offset: int) -> tuple[str, int]:
+        with self._lock:
+            end = self._ends[-1] if self._ends else 0
+            i = bisect.bisect_right(self._ends, offset)
+            parts = self._parts[i:]
+            start = self._ends[i - 1] if i else 0
+        if parts and offset > start:
+            parts[0] = parts[0][offset - start:]
+        return "".join(parts), end
+
+
+class _EventLog:
+    """A job's progress bus plus every event drained from it, readable by offset."""
+
+    def __init__(self) -> None:
+        self.bus = ProgressBus()
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def read_from(self, offset: int) -> tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            self._events += [e.to_dict() for e in self.bus.drain()]
+            return self._events[offset:], len(self._events)
+
+
+_job_output: ContextVar[Optional[_Buffer]] = ContextVar("job_output", default=None)
+
+
+class _RoutedStdout(io.TextIOBase):
+    """``sys.stdout`` stand-in writing to the current job's buffer, else to the real stream."""
+
+    def __init__(self, fallback) -> None:
+        self.fallback = fallback
+
+    def write(self, s: str) -> int:
+        buf = _job_output.get()
+        return buf.write(s) if buf is not None else self.fallback.write(s)
+
+    def flush(self) -> None:
+        if _job_output.get() is None:
+            self.fallback.flush()
+
+    def isatty(self) -> bool:
+        return _job_output.get() is None and self.fallback.isatty()
+
+    @property
+    def encoding(self) -> str:  # type: ignore[override]
+        return getattr(self.fallback, "encoding", "utf-8")
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: str = "queued"
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    output: _Buffer = field(default_factory=_Buffer)
+    narrative: _Buffer = field(default_factory=_Buffer)
+    progress: _EventLog = field(default_factory=_EventLog)
+    cancel: CancelToken = field(default_factory=CancelToken)
+
+    def view(self, output_from: int = 0, narrative_from: int = 0, progress_from: int = 0) -> Dict[str, Any]:
+        output, output_end = self.output.read_from(output_from)
+        narrative, narrative_end = self.narrative.read_from(narrative_from)
+        progress, progress_end = self.progress.read_from(progress_from)
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "result": self.result,
+            "error": self.error,
+            "output": output,
+            "output_end": output_end,
+            "narrative": narrative,
+            "narrative_end": narrative_end,
+            "progress": progress,
+            "progress_end": progress_end,
+        }
+
+
+def run_config_job(job: Job) -> Dict[str, Any]:
+    from release_copilot.commands import audit_from_config
+
+    argv = [str(a) for a in job.payload.get("argv", [])]
+    # The daemon never delegates to itself.
+    return audit_from_config.main(argv + ["--no-daemon"]) or {}
+
+
+def run_graph_job(job: Job) -> Dict[str, Any]:
+    from release_copilot.app import run_release_audit
+
+    kwargs = dict(job.payload.get("kwargs") or {})
+    kwargs["on_llm_delta"] = job.narrative.write
+    result = run_release_audit(**kwargs)
+    if not result.get("ok") and not result.get("incomplete"):
+        raise RuntimeError(result.get("error") or "audit failed")
+    return result
+
+
+RUNNERS: Dict[str, Runner] = {"config": run_config_job, "graph": run_graph_job}
+
+
+class AuditServer:
+    """Job queue plus HTTP front end; ``port=0`` picks a free port (see ``url``)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, runners: Optional[Dict[str, Runner]] = None) -> None:
+        self.runners = dict(runners or RUNNERS)
+        self.jobs: Dict[str, Job] = {}
+        self.started = time.time()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit")
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._serving = threading.Event()
+        self._stdout: Optional[_RoutedStdout] = None
+        self.token = secrets.token_urlsafe(32)
+        self.token_file = write_token(self.url, self.token)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        if kind not in self.runners:
+            raise ValueError(f"Unknown audit kind '{kind}'. Available: {', '.join(sorted(self.runners))}")
+        job = Job(id=uuid.uuid4().hex[:12], kind=kind, payload=payload)
+        self.jobs[job.id] = job
+        self._pool.submit(self._run, job)
+        return job
+
+    def cancel(self, job: Job) -> None:
+        job.cancel.cancel("cancelled by client")
+
+    def _run(self, job: Job) -> None:
+        if job.cancel.cancelled:
+            job.status, job.error, job.finished = "cancelled", job.cancel.reason, time.time()
+            return
+        job.status, job.started = "running", time.time()
+        self._route_stdout()
+        token = _job_output.set(job.output)
+        try:
+            with job.progress.bus, job.cancel:
+                result = self.runners[job.kind](job)
+            job.result = json.loads(json.dumps(result, default=str))
+            job.status = "done"
+        except SystemExit as e:  # argparse errors and CLI exits
+            if e.code in (0, None):
+                job.result, job.status = {}, "done"
+            else:
+                job.error, job.status = str(e.code), "failed"
+        except Cancelled as e:  # a runner that does not keep partial results
+            job.error, job.status = str(e), "cancelled"
+        except Exception as e:
+            logger.exception("Audit %s failed", job.id)
+            job.error, job.status = str(e), "failed"
+        finally:
+            _job_output.reset(token)
+            job.finished = time.time()
+
+    def _route_stdout(self) -> None:
+        # Checked per job: something else (a test runner, a library) may have swapped sys.stdout.
+        if not isinstance(sys.stdout, _RoutedStdout):
+            self._stdout = sys.stdout = _RoutedStdout(sys.stdout)
+
+    def serve_forever(self) -> None:
+        self._serving.set()
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self._serving.clear()
+
+    def shutdown(self) -> None:
+        # httpd.shutdown() waits for serve_forever() to exit, so only call it while serving.
+        if self._serving.is_set():
+            self.httpd.shutdown()
+        self.httpd.server_close()
+        self._pool.shutdown(wait=False)
+        # Leave the file alone if another daemon has since taken the port.
+        try:
+            if self.token_file.read_text(encoding="utf-8") == self.token:
+                self.token_file.unlink()
+        except OSError:
+            pass
+        if self._stdout is not None and sys.stdout is self._stdout:
+            sys.stdout = self._stdout.fallback
+        self._stdout = None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):  # route access logs through logging
+                logger.debug("%s - " + fmt, self.address_string(), *args)
+
+            def _json(self, code: int, obj: Any) -> None:
+                body = json.dumps(obj, default=str).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _refused(self, public: bool = False) -> bool:
+                """Answer and return True unless the request comes from a client holding the token.
+
+                Browsers add ``Origin`` to cross-site requests, so any page the user
+                visits could otherwise reach 127.0.0.1; such requests never pass.
+                """
+                if self.headers.get("Origin") is not None:
+                    self._json(403, {"error": "cross-origin requests are not accepted"})
+                    return True
+                if public:
+                    return False
+                if not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {server.token}"):
+                    self._json(401, {"error": f"missing or wrong daemon token (see {server.token_file})"})
+                    return True
+                if self.command == "POST" and self.headers.get_content_type() != "application/json":
+                    self._json(415, {"error": "expected Content-Type: application/json"})
+                    return True
+                return False
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                if self._refused(public=url.path == "/health"):
+                    return None
+                if url.path == "/health":
+                    return self._json(200, {
+                        "ok": True,
+                        "uptime_s": round(time.time() - server.started, 1),
+                        "jobs": len(server.jobs),
+                        "running": sum(j.status in ("queued", "running") for j in server.jobs.values()),
+                        "cwd": os.getcwd(),
+                    })
+                m = re.fullmatch(r"/audits/(\w+)(?:/artifacts/([\w.-]+))?", url.path)
+                job = server.jobs.get(m.group(1)) if m else None
+                if job is None:
+                    return self._json(404, {"error": "not found"})
+                if m.group(2) is None:
+                    q = parse_qs(url.query)
+                    return self._json(200, job.view(int(q.get("output_from", ["0"])[0]),
+                                                    int(q.get("narrative_from", ["0"])[0]),
+                                                    int(q.get("progress_from", ["0"])[0])))
+                # Only files named in the job's own result are served.
+                path = ((job.result or {}).get("artifacts") or {}).get(m.group(2))
+                if not path or not Path(path).is_file():
+                    return self._json(404, {"error": f"no artifact '{m.group(2)}'"})
+                data = Path(path).read_bytes()
+                self.send_response(200)
+                self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+                self.send_header("Content-Disposition", f'attachment; filename="{Path(path).name}"')
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self) -> None:
+                if self._refused():
+                    return None
+                m = re.fullmatch(r"/audits/(\w+)/cancel", urlparse(self.path).path)
+                if m:
+                    job = server.jobs.get(m.group(1))
+                    if job is None:
+                        return self._json(404, {"error": "not found"})
+                    server.cancel(job)
+                    return self._json(202, {"id": job.id, "status": job.status})
+                if urlparse(self.path).path != "/audits":
+                    return self._json(404, {"error": "not found"})
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    job = server.submit(body.pop("kind", "config"), body)
+                except (ValueError, json.JSONDecodeError) as e:
+                    return self._json(400, {"error": str(e)})
+                self._json(202, {"id": job.id, "status": job.status})
+
+        return Handler
+
+
+def warm_up() -> None:
+    """Load what every audit needs so the first request is as fast as the rest."""
+    from release_copilot.config.settings import get_settings
+    from release_copilot.kit import caching
+    from release_copilot.tools import jira_tools
+
+    get_settings()
+    caching.enable_memory_cache()
+    if jira_tools._get_oauth() is None:
+        logger.warning("Jira OAuth not configured; Jira comparison will be skipped")
+    import openpyxl  # noqa: F401  (report writing)
+    import release_copilot.app  # noqa: F401  (graph path)
+    import release_copilot.reporting.llm_summary  # noqa: F401
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="release-copilot serve", description="Warm local audit daemon")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (keep it local)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    warm_up()
+    server = AuditServer(args.host, args.port)
+    print(f"Release Copilot daemon on {server.url}, serving {os.getcwd()} (Ctrl+C to stop)")
+    print(f"Access token: {server.token_file}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
+from functools import lru_cache
 from pathlib import Path
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
-import yaml
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -17,6 +17,7 @@ class Settings(BaseSettings):
     max_tokens_planner: int = Field(1500, env='MAX_TOKENS_PLANNER')
     max_tokens_worker: int = Field(2000, env='MAX_TOKENS_WORKER')
     max_tokens_writer: int = Field(4000, env='MAX_TOKENS_WRITER')
+    llm_provider: str = Field('openai', env='LLM_PROVIDER')
 
     # Atlassian OAuth 2.0 (3LO)
     ATLASSIAN_OAUTH_CLIENT_ID: str = Field('', env='ATLASSIAN_OAUTH_CLIENT_ID')
@@ -31,6 +32,8 @@ class Settings(BaseSettings):
     bitbucket_email: str = Field('', env='BITBUCKET_EMAIL')
     bitbucket_app_password: str = Field('', env='BITBUCKET_APP_PASSWORD')
     bitbucket_project: str = Field('', env='BITBUCKET_PROJECT')
+    # Optional local mirrors (<root>/<PROJECT>/<repo>.git or <root>/<repo>) for patch-ids
+    git_mirror_root: str = Field('', env='GIT_MIRROR_ROOT')
 
     # Confluence
     confluence_enabled: bool = Field(False, env='CONFLUENCE_ENABLED')
@@ -46,6 +49,9 @@ class Settings(BaseSettings):
     DEFAULT_JQL: str | None = Field(None, env='DEFAULT_JQL')
     queries_yaml_path: str = Field('config/queries.yml', env='QUERIES_YAML_PATH')
 
+    # Local daemon (release-copilot serve) that --daemon runs are handed to
+    daemon_url: str = Field('http://127.0.0.1:8765', validation_alias='RELEASE_COPILOT_DAEMON')
+
     @field_validator('confluence_enabled', 'enable_llamaindex', mode='before')
     def _boolify(cls, v):  # type: ignore
         if isinstance(v, bool):
@@ -53,13 +59,25 @@ class Settings(BaseSettings):
         return str(v).lower() in {'1', 'true', 'yes', 'on'}
 
 
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Process-wide settings; ``.env`` is read on first use, not at import."""
+    return Settings()
+
+
 def load_query_presets(path: str | None = None) -> dict[str, str]:
-    p = Path(path or settings.queries_yaml_path)
+    p = Path(path or get_settings().queries_yaml_path)
     if not p.exists():
         return {}
+    import yaml
+
     with p.open('r', encoding='utf-8') as f:
         data = yaml.safe_load(f) or {}
     return (data.get('queries') or {}) if isinstance(data, dict) else {}
 
 
-settings = Settings()
+def __getattr__(name: str):
+    # ``from release_copilot.config.settings import settings`` keeps working, lazily.
+    if name == 'settings':
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
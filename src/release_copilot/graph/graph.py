@@ -1,23 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from pathlib import Path
 from release_copilot.graph.states import RunState
+from release_copilot.graph.scheduler import run_dag
 from release_copilot.agents import planner, jira_analyst, git_historian, report_writer, publisher
 
 
-def compile_graph():
-    def run(state: RunState) -> RunState:
-        plan = planner.plan_run(state.fix_version, state.project, state.repo, state.branch)
-        if 'collect_jira' in plan.steps:
-            state.jira_issues = jira_analyst.collect_jira(state.jql, state.fix_version).issues
-        if 'collect_commits' in plan.steps:
-            state.commits = git_historian.collect_commits(state.project, state.repo, state.branch, state.since).commits
-        if 'compare' in plan.steps:
-            matches, missing, orphan_commits = report_writer.compare_jira_and_commits(state.jira_issues, state.commits)
-            state.matches = matches
-            state.missing_in_git = missing
-            state.commits_without_story = orphan_commits
-        if 'write_report' in plan.steps:
-            report = report_writer.write_report(state.jira_issues, state.commits, Path('data/outputs'))
-            state.artifacts = report.artifacts
+def compile_graph(on_llm_delta=None, max_workers: int = 4):
+    def collect_jira(state: RunState):
+        return {'jira_issues': jira_analyst.collect_jira(state.jql, state.fix_version).issues}
+
+    def collect_commits(state: RunState):
+        def one(target):
+            commits = git_historian.collect_commits(target.project, target.repo, target.branch, state.since).commits
+            return [{**c, 'project': target.project, 'repo': target.repo, 'branch': target.branch} for c in commits]
+
+        targets = state.all_targets()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets)))) as pool:
+            futures = [pool.submit(copy_context().run, one, t) for t in targets]
+            return {'commits': [c for f in futures for c in f.result()]}
+
+    def compare(state: RunState):
+        matches, missing, orphan_commits = report_writer.compare_jira_and_commits(state.jira_issues, state.commits)
+        return {'matches': matches, 'missing_in_git': missing, 'commits_without_story': orphan_commits}
+
+    def write_report(state: RunState):
+        report = report_writer.write_report(state.jira_issues, state.commits, Path('data/outputs'))
+        return {'artifacts': report.artifacts}
+
+    def write_llm_summary(state: RunState):
+        path = report_writer.write_llm_narrative(
+            state.jira_issues, state.commits, state.missing_in_git,
+            [t.model_dump() for t in state.all_targets()], Path('data/outputs'),
+            model=state.llm_model, budget_cents=state.llm_budget_cents,
+            fix_version=state.fix_version, since=state.since, on_delta=on_llm_delta,
+            provider=state.llm_provider,
+        )
+        return {'artifacts': {'llm_markdown': path}}
+
+    handlers = {
+        'collect_jira': collect_jira,
+        'collect_commits': collect_commits,
+        'compare': compare,
+        'write_report': write_report,
+        'write_llm_summary': write_llm_summary,
+    }
+
+    def run(state: RunState, checkpoint=None) -> RunState:
+        plan = planner.plan_run(state.fix_version, state.project, state.repo, state.branch,
+                                write_llm_summary=bool(state.llm_model))
+        run_dag(state, plan.steps, plan.depends_on, handlers, max_workers=max_workers, checkpoint=checkpoint)
         if publisher and state.artifacts.get('markdown') and False:  # publishing disabled by default
             publisher.publish(Path(state.artifacts['markdown']))
         return state
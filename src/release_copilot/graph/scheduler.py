@@ -0,0 +1,105 @@
+"""Dependency-aware step execution for the audit graph."""
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional
+
+from release_copilot.graph.states import RunState
+from release_copilot.kit.progress import emit
+from release_copilot.kit.tracing import span
+
+if TYPE_CHECKING:  # pragma: no cover
+    from release_copilot.kit.checkpoint import Checkpoint
+
+logger = logging.getLogger(__name__)
+
+StepFn = Callable[[RunState], Optional[Dict[str, Any]]]
+
+
+def _apply(state: RunState, updates: Optional[Dict[str, Any]]) -> None:
+    for field, value in (updates or {}).items():
+        current = getattr(state, field, None)
+        if isinstance(value, dict) and isinstance(current, dict):
+            value = {**current, **value}
+        setattr(state, field, value)
+
+
+def run_dag(
+    state: RunState,
+    steps: List[str],
+    depends_on: Mapping[str, List[str]],
+    handlers: Mapping[str, StepFn],
+    max_workers: int = 4,
+    checkpoint: Optional["Checkpoint"] = None,
+) -> RunState:
+    """Run ``steps`` as soon as their dependencies finish, independent ones concurrently.
+
+    Each handler reads ``state`` and returns a dict of field updates; updates are
+    applied on the calling thread only, so handlers never race on writes, and dict
+    values are merged into dict fields (concurrent steps can each add artifacts). Start/end
+    times and durations land in ``state.step_timings``. Dependencies on steps that
+    are not in the plan are treated as satisfied. If a step fails, no new steps
+    start and the first error is re-raised once running steps finish.
+
+    With a ``checkpoint``, each finished step's updates are saved, and steps the
+    checkpoint already holds are replayed from disk instead of being run.
+    """
+    pending = [s for s in steps if s in handlers]
+    unknown = [s for s in steps if s not in handlers]
+    if unknown:
+        raise ValueError(f"No handler for step(s): {', '.join(unknown)}")
+    planned = set(pending)
+    done: set[str] = set()
+    if checkpoint is not None:
+        for name in list(pending):
+            if checkpoint.done(name):
+                _apply(state, checkpoint.load(name))
+                pending.remove(name)
+                done.add(name)
+                logger.info("Step %s restored from checkpoint %s", name, checkpoint.run_id)
+    running: Dict[Future, str] = {}
+    error: Optional[BaseException] = None
+
+    def _timed(name: str):
+        start = time.time()
+        emit(f"step.{name}", "start")
+        with span(f"step.{name}", "stage"):
+            updates = handlers[name](state)
+        return updates, start, time.time()
+
+    emit("pipeline", done=len(done), total=len(planned))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        while pending or running:
+            if error is None:
+                for name in list(pending):
+                    if all(d in done or d not in planned for d in depends_on.get(name, [])):
+                        pending.remove(name)
+                        # copy_context() keeps the caller's CostSession/tracing visible in workers.
+                        running[pool.submit(copy_context().run, _timed, name)] = name
+            if not running:
+                if pending and error is None:
+                    raise ValueError(f"Dependency cycle among steps: {', '.join(pending)}")
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                try:
+                    updates, start, end = fut.result()
+                except BaseException as exc:  # re-raised once running steps finish
+                    emit(f"step.{name}", "failed", message=str(exc))
+                    error = error or exc
+                    continue
+                _apply(state, updates)
+                if checkpoint is not None:
+                    checkpoint.save(name, updates or {})
+                state.step_timings[name] = {"start": start, "end": end, "duration_s": end - start}
+                done.add(name)
+                emit(f"step.{name}", "done")
+                emit("pipeline", done=len(done), total=len(planned))
+    if error is not None:
+        raise error
+    return state
@@ -2,6 +2,26 @@ from typing import List, Dict, Optional
 from pydantic import BaseModel
 
 
+class Target(BaseModel):
+    project: str
+    repo: str
+    branch: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.project}/{self.repo}@{self.branch}"
+
+    @classmethod
+    def parse(cls, spec: str, default_branch: Optional[str] = None) -> "Target":
+        """Parse ``PROJECT/REPO@BRANCH`` (``@BRANCH`` optional when ``default_branch`` is given)."""
+        head, _, branch = spec.strip().partition('@')
+        project, _, repo = head.partition('/')
+        branch = branch or default_branch or ''
+        if not (project and repo and branch):
+            raise ValueError(f"Invalid target '{spec}', expected PROJECT/REPO@BRANCH")
+        return cls(project=project, repo=repo, branch=branch)
+
+
 class RunState(BaseModel):
     fix_version: str
     project: str
@@ -9,10 +29,19 @@ class RunState(BaseModel):
     branch: str
     since: Optional[str] = None
     jql: Optional[str] = None
+    llm_model: Optional[str] = None
+    llm_budget_cents: int = 10
+    llm_provider: Optional[str] = None
+    # Extra repo/branch targets; empty means just project/repo/branch.
+    targets: List[Target] = []
     jira_issues: List[Dict] = []
     commits: List[Dict] = []
     matches: List[Dict] = []
     missing_in_git: List[Dict] = []
     commits_without_story: List[Dict] = []
     artifacts: Dict[str, str] = {}
+    step_timings: Dict[str, Dict[str, float]] = {}
     error: Optional[str] = None
+
+    def all_targets(self) -> List[Target]:
+        return self.targets or [Target(project=self.project, repo=self.repo, branch=self.branch)]
@@ -0,0 +1,268 @@
+"""On-disk BM25 index over runbooks and past run artifacts.
+
+Sources are Markdown/text/PDF files under ``data/knowledge`` plus the Markdown
+reports in ``data/outputs``. Each file is split into ~120-word chunks; a chunk
+is one BM25 document. Layout under ``data/index/knowledge/``::
+
+    manifest.json   per source file: mtime_ns, size, sha1 -> its analysis file
+    files/<sha1>.json   chunk texts and term frequencies of one file version
+    terms.json      term -> [offset, document frequency]
+    docs.json       chunk source, snippet and length; average length
+    doc_ids.u32     postings: chunk ids, grouped by term at ``offset``
+    tfs.u16         term frequency for each posting
+
+Builds are incremental: a file is re-read only when its mtime or size moved and
+re-analyzed only when its SHA-1 changed; changed files are analyzed in a process
+pool. The postings arrays are memory-mapped at query time, so a query touches
+only the postings of its own terms and answers in milliseconds.
+"""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from release_copilot.kit.tracing import span
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = Path("data/index/knowledge")
+SOURCES = (Path("data/knowledge"), Path("data/outputs"))
+SUFFIXES = {".md", ".markdown", ".txt", ".pdf"}
+CHUNK_WORDS = 120
+SNIPPET_CHARS = 500
+K1, B = 1.2, 0.75
+
+_TOKEN_RX = re.compile(r"[a-z0-9][a-z0-9_\-]*[a-z0-9]|[a-z0-9]")
+_BLOCK_RX = re.compile(r"\n\s*\n|\n(?=#)")
+_STOP = frozenset(
+    "a an and are as at be but by for from has have in into is it its of on or that the their then there "
+    "these this to was were will with".split()
+)
+
+
+def tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN_RX.findall((text or "").lower()) if t not in _STOP]
+
+
+def chunk_text(text: str, words: int = CHUNK_WORDS) -> List[str]:
+    """Paragraph-aligned chunks of about ``words`` words (long paragraphs are split)."""
+    chunks: List[str] = []
+    current: List[str] = []
+    for block in _BLOCK_RX.split(text or ""):
+        block_words = block.split()
+        if not block_words:
+            continue
+        if current and len(current) + len(block_words) > words:
+            chunks.append(" ".join(current))
+            current = []
+        current += block_words
+        while len(current) > words:
+            chunks.append(" ".join(current[:words]))
+            current = current[words:]
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _read_text(path: Path) -> str:
+    if path.suffix.lower() != ".pdf":
+        return path.read_text(encoding="utf-8", errors="replace")
+    # Optional dependency – PDFs are skipped without it.
+    try:
+        from pypdf import PdfReader
+    except Exception as e:
+        raise RuntimeError("pypdf is not installed; cannot index PDF files") from e
+    return "\n\n".join(page.extract_text() or "" for page in PdfReader(str(path)).pages)
+
+
+def _analyze(path: str) -> Dict[str, Any]:
+    """Chunks of one file with their term frequencies (runs in a worker process)."""
+    out = []
+    for text in chunk_text(_read_text(Path(path))):
+        terms = tokens(text)
+        tf: Dict[str, int] = {}
+        for t in terms:
+            tf[t] = tf.get(t, 0) + 1
+        out.append({"text": text[:SNIPPET_CHARS], "len": len(terms), "tf": tf})
+    return {"chunks": out}
+
+
+def _sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _source_files(sources: Iterable[Path]) -> List[Path]:
+    files = []
+    for root in sources:
+        if Path(root).exists():
+            files += [p for p in Path(root).rglob("*") if p.is_file() and p.suffix.lower() in SUFFIXES]
+    return sorted(set(files))
+
+
+def build(sources: Sequence[Path] = SOURCES, index_dir: Optional[Path] = None,
+          workers: Optional[int] = None) -> Dict[str, int]:
+    """Bring the index up to date with ``sources``; returns file/chunk/term counts."""
+    index_dir = Path(index_dir or INDEX_DIR)
+    (index_dir / "files").mkdir(parents=True, exist_ok=True)
+    manifest_path = index_dir / "manifest.json"
+    old = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+    files: Dict[str, Dict[str, Any]] = {}
+    todo: Dict[str, Path] = {}
+    for path in _source_files(sources):
+        key = path.as_posix()
+        st = path.stat()
+        entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        prev = old.get(key)
+        if prev and prev.get("sha1") and (prev["mtime_ns"], prev["size"]) == (entry["mtime_ns"], entry["size"]):
+            files[key] = prev
+            continue
+        entry["sha1"] = _sha1(path)
+        files[key] = entry
+        if not (index_dir / "files" / f"{entry['sha1']}.json").exists():
+            todo[entry["sha1"]] = path
+
+    if todo:
+        with span("knowledge.analyze", "cpu", files=len(todo)):
+            paths = [str(p) for p in todo.values()]
+            if len(paths) > 4 and (workers or 0) != 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_try_analyze, paths))
+            else:
+                results = [_try_analyze(p) for p in paths]
+        for sha1, result in zip(todo, results):
+            if result is not None:
+                _write(index_dir / "files" / f"{sha1}.json", json.dumps(result).encode("utf-8"))
+        for key, entry in files.items():
+            if entry.get("sha1") in todo and not (index_dir / "files" / f"{entry['sha1']}.json").exists():
+                entry["sha1"] = None  # failed: retried on the next build
+
+    # A file can change to content whose analysis already exists (e.g. a copy of
+    # another file): nothing is analyzed, but its postings must still move.
+    changed = (
+        bool(todo)
+        or files.keys() != old.keys()
+        or any(entry.get("sha1") != old[key].get("sha1") for key, entry in files.items())
+        or not (index_dir / "terms.json").exists()
+    )
+    stats = {"files": len(files), "analyzed": len(todo)}
+    if changed:
+        with span("knowledge.postings", "cpu", files=len(files)):
+            stats.update(_write_postings(index_dir, files))
+    _write(manifest_path, json.dumps(files).encode("utf-8"))
+    live = {f"{e['sha1']}.json" for e in files.values() if e.get("sha1")}
+    for stale in (index_dir / "files").glob("*.json"):
+        if stale.name not in live:
+            stale.unlink()
+    return stats
+
+
+def _try_analyze(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        return _analyze(path)
+    except Exception as e:
+        logger.warning("Not indexed: %s (%s)", path, e)
+        return None
+
+
+def _write_postings(index_dir: Path, files: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    docs: List[Dict[str, Any]] = []
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    for key, entry in files.items():
+        if not entry.get("sha1"):
+            continue
+        analysis = json.loads((index_dir / "files" / f"{entry['sha1']}.json").read_text(encoding="utf-8"))
+        for chunk in analysis["chunks"]:
+            doc = len(docs)
+            docs.append({"source": key, "text": chunk["text"], "len": chunk["len"]})
+            for term, tf in chunk["tf"].items():
+                postings.setdefault(term, []).append((doc, tf))
+    doc_ids, tfs = array("I"), array("H")
+    terms: Dict[str, List[int]] = {}
+    for term, plist in postings.items():
+        terms[term] = [len(doc_ids), len(plist)]
+        doc_ids.extend(d for d, _ in plist)
+        tfs.extend(min(tf, 0xFFFF) for _, tf in plist)
+    avgdl = sum(d["len"] for d in docs) / len(docs) if docs else 0.0
+    _write(index_dir / "doc_ids.u32", doc_ids.tobytes())
+    _write(index_dir / "tfs.u16", tfs.tobytes())
+    _write(index_dir / "docs.json", json.dumps({"avgdl": avgdl, "docs": docs}).encode("utf-8"))
+    _write(index_dir / "terms.json", json.dumps(terms).encode("utf-8"))  # last: readers key on it
+    return {"chunks": len(docs), "terms": len(terms)}
+
+
+class _Reader:
+    """Loaded term table and memory-mapped postings of one index version."""
+
+    def __init__(self, index_dir: Path) -> None:
+        self.version = (index_dir / "terms.json").stat().st_mtime_ns
+        self.terms: Dict[str, List[int]] = json.loads((index_dir / "terms.json").read_text(encoding="utf-8"))
+        meta = json.loads((index_dir / "docs.json").read_text(encoding="utf-8"))
+        self.docs: List[Dict[str, Any]] = meta["docs"]
+        self.avgdl: float = meta["avgdl"] or 1.0
+        self.doc_ids = self._map(index_dir / "doc_ids.u32", "I")
+        self.tfs = self._map(index_dir / "tfs.u16", "H")
+
+    @staticmethod
+    def _map(path: Path, fmt: str):
+        with path.open("rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b"").cast(fmt)
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast(fmt)
+
+
+_readers: Dict[Path, _Reader] = {}
+_readers_lock = threading.Lock()
+
+
+def _reader(index_dir: Path) -> Optional[_Reader]:
+    terms = index_dir / "terms.json"
+    if not terms.exists():
+        return None
+    with _readers_lock:
+        r = _readers.get(index_dir)
+        if r is None or r.version != terms.stat().st_mtime_ns:
+            r = _readers[index_dir] = _Reader(index_dir)
+        return r
+
+
+def search(query: str, k: int = 3, index_dir: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Top ``k`` chunks for ``query`` by BM25: ``{"source", "text", "score"}``, best first."""
+    r = _reader(Path(index_dir or INDEX_DIR))
+    if r is None:
+        return []
+    n = len(r.docs)
+    scores: Dict[int, float] = {}
+    with span("knowledge.search", "cpu", terms=len(r.terms)):
+        for term in set(tokens(query)):
+            hit = r.terms.get(term)
+            if hit is None:
+                continue
+            offset, df = hit
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for i in range(offset, offset + df):
+                doc, tf = r.doc_ids[i], r.tfs[i]
+                norm = tf + K1 * (1 - B + B * r.docs[doc]["len"] / r.avgdl)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / norm
+    best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+    return [{"source": r.docs[d]["source"], "text": r.docs[d]["text"], "score": round(s, 3)} for d, s in best]
@@ -1,6 +1,31 @@
+import argparse
 from pathlib import Path
+from typing import Dict, List, Optional
 
-def build_index(data_dir: Path = Path('data/knowledge')) -> None:
-    """Stub for building a local knowledge index."""
+from release_copilot.indexes import bm25
+
+
+def build_index(data_dir: Path = Path('data/knowledge'), include_outputs: bool = True,
+                index_dir: Optional[Path] = None, workers: Optional[int] = None) -> Dict[str, int]:
+    """Update the local BM25 knowledge index (see :mod:`release_copilot.indexes.bm25`).
+
+    Indexes ``data_dir`` and, with ``include_outputs``, the Markdown reports of
+    past runs in ``data/outputs``. Only new or changed files are re-analyzed.
+    """
     data_dir.mkdir(parents=True, exist_ok=True)
-    # Real implementation would scan PDFs/MD and build a LlamaIndex here.
+    sources: List[Path] = [data_dir] + ([Path('data/outputs')] if include_outputs else [])
+    return bm25.build(sources, index_dir=index_dir, workers=workers)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or update the local knowledge index")
+    parser.add_argument("--data-dir", type=Path, default=Path('data/knowledge'))
+    parser.add_argument("--no-outputs", action="store_true", help="Skip past run reports in data/outputs")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for analyzing changed files")
+    args = parser.parse_args(argv)
+    stats = build_index(args.data_dir, include_outputs=not args.no_outputs, workers=args.workers)
+    print(", ".join(f"{k}: {v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 from typing import List
 
-from release_copilot.config.settings import settings
+from release_copilot.config.settings import get_settings
+from release_copilot.indexes import bm25
 
 
-def query_knowledge(prompt: str) -> List[str]:
-    """Return up to 3 snippets relevant to the prompt."""
-    if not settings.enable_llamaindex:
+def query_knowledge(prompt: str, k: int = 3) -> List[str]:
+    """Return up to ``k`` snippets relevant to the prompt, each prefixed with its source file.
+
+    Empty when ``ENABLE_LLAMAINDEX`` is off or the index has not been built yet
+    (``python -m release_copilot.indexes.build_knowledge_index``).
+    """
+    if not get_settings().enable_llamaindex:
         return []
-    # A real implementation would query the index; here we return empty.
-    return []
+    return [f"[{hit['source']}] {hit['text']}" for hit in bm25.search(prompt, k=k)]
@@ -1,13 +1,67 @@
 import hashlib
 import json
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from functools import wraps
 from pathlib import Path
-from typing import Any, Callable, Tuple
+from typing import Any, Callable, Optional, Tuple
 
-CACHE_DIR = Path("data/.cache")
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
+from release_copilot.kit.tracing import span
+
+CACHE_DIR = Path("data/.cache")  # created on first write, not at import
+
+# Optional in-process memo of parsed cache files (see enable_memory_cache).
+_memo: Optional["OrderedDict[Path, Tuple[int, dict]]"] = None
+_memo_max = 0
+_memo_lock = threading.Lock()
+
+
+def enable_memory_cache(max_entries: int = 256) -> None:
+    """Keep up to ``max_entries`` parsed cache files in memory (LRU).
+
+    Meant for long-lived processes such as ``release-copilot serve``: repeated
+    audits skip re-reading and re-parsing the same JSON. Entries are keyed by
+    path and file mtime, so a file rewritten by another process is re-read.
+    """
+    global _memo, _memo_max
+    with _memo_lock:
+        _memo_max = max_entries
+        if _memo is None:
+            _memo = OrderedDict()
+
+
+def disable_memory_cache() -> None:
+    global _memo
+    with _memo_lock:
+        _memo = None
+
+
+def _read_payload(path: Path) -> dict:
+    if _memo is None:
+        with path.open() as f:
+            return json.load(f)
+    mtime = path.stat().st_mtime_ns
+    with _memo_lock:
+        hit = _memo.get(path) if _memo is not None else None
+        if hit is not None and hit[0] == mtime:
+            _memo.move_to_end(path)
+            return hit[1]
+    with path.open() as f:
+        payload = json.load(f)
+    _remember(path, mtime, payload)
+    return payload
+
+
+def _remember(path: Path, mtime: int, payload: dict) -> None:
+    with _memo_lock:
+        if _memo is None:
+            return
+        _memo[path] = (mtime, payload)
+        _memo.move_to_end(path)
+        while len(_memo) > _memo_max:
+            _memo.popitem(last=False)
 
 
 def _make_key(func: Callable, args: tuple[Any], kwargs: dict[str, Any]) -> str:
@@ -24,7 +78,6 @@ def cache_json(namespace: str, ttl_hours: int = 12):
 
     def decorator(func: Callable):
         ns_dir = CACHE_DIR / namespace
-        ns_dir.mkdir(parents=True, exist_ok=True)
 
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -36,6 +89,7 @@ def cache_json(namespace: str, ttl_hours: int = 12):
                 if time.time() - payload["ts"] < ttl_hours * 3600:
                     return payload["data"]
             data = func(*args, **kwargs)
+            ns_dir.mkdir(parents=True, exist_ok=True)
             with open(file_path, "w") as f:
                 json.dump({"ts": time.time(), "data": data}, f)
             return data
@@ -70,6 +124,28 @@ def _cache_path(key: str) -> Path:
     return CACHE_DIR / f"{h}.json"
 
 
+def read_cache(key: str, ttl_hours: int) -> Tuple[bool, Any]:
+    """``(True, data)`` if ``key`` has a fresh cache entry, else ``(False, None)``."""
+    path = _cache_path(key)
+    if not path.exists():
+        return False, None
+    with span("cache.read", "cache", key=key[:120]) as sp:
+        payload = _read_payload(path)
+        sp["hit"] = time.time() - payload.get("ts", 0) < ttl_hours * 3600
+    return (True, payload.get("data")) if sp["hit"] else (False, None)
+
+
+def write_cache(key: str, data: Any) -> None:
+    path = _cache_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"ts": time.time(), "data": data}
+    with span("cache.write", "cache", key=key[:120]):
+        with path.open("w") as f:
+            json.dump(payload, f)
+    if _memo is not None:
+        _remember(path, path.stat().st_mtime_ns, payload)
+
+
 def load_cache_or_call(
     key: str,
     ttl_hours: int,
@@ -82,15 +158,11 @@ def load_cache_or_call(
     or ``"api"`` to aid logging.
     """
 
-    path = _cache_path(key)
-    if not force_refresh and path.exists():
-        with path.open() as f:
-            payload = json.load(f)
-        if time.time() - payload.get("ts", 0) < ttl_hours * 3600:
-            return payload.get("data"), "cache"
+    if not force_refresh:
+        hit, data = read_cache(key, ttl_hours)
+        if hit:
+            return data, "cache"
 
     data = fetch_fn()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w") as f:
-        json.dump({"ts": time.time(), "data": data}, f)
+    write_cache(key, data)
     return data, "api"
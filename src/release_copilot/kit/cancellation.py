@@ -0,0 +1,96 @@
+"""Cooperative cancellation and per-run deadlines.
+
+Open a :class:`CancelToken` around a run (``with token:``); long loops call
+:func:`check_cancelled` between units of work (a Bitbucket or Jira page, a
+report sheet, a streamed LLM chunk), which raises
+:class:`~release_copilot.kit.errors.Cancelled` once the token was cancelled or
+its deadline passed. Nothing is interrupted mid-request, so a run stops within
+one page. Like the tracer, the open token lives in a ``ContextVar``: pools
+that submit through ``contextvars.copy_context().run`` see it too, and checks
+are no-ops outside a run that has a token.
+
+A token can have a ``parent`` (the UI's cancel button around a run with its own
+``--deadline``); it is cancelled when either is.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from release_copilot.kit.errors import Cancelled
+
+_active: ContextVar[Optional["CancelToken"]] = ContextVar("cancel_token", default=None)
+
+DEADLINE_REASON = "deadline exceeded"
+
+
+class CancelToken:
+    """Cancelled by :meth:`cancel`, by its parent, or ``deadline_s`` seconds after creation."""
+
+    def __init__(self, deadline_s: Optional[float] = None, parent: Optional["CancelToken"] = None) -> None:
+        self.deadline = time.monotonic() + deadline_s if deadline_s else None
+        self.parent = parent
+        self._reason: Optional[str] = None
+        self._event = threading.Event()
+        self._tokens: List[Any] = []
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Why the run must stop, or ``None`` while it may go on."""
+        if self._event.is_set():
+            return self._reason
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return DEADLINE_REASON
+        return self.parent.reason if self.parent is not None else None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the nearest deadline (own or parent's), or ``None`` without one."""
+        left = [t.deadline - time.monotonic() for t in self._chain() if t.deadline is not None]
+        return max(0.0, min(left)) if left else None
+
+    def check(self) -> None:
+        reason = self.reason
+        if reason is not None:
+            raise Cancelled(reason)
+
+    def _chain(self):
+        token: Optional[CancelToken] = self
+        while token is not None:
+            yield token
+            token = token.parent
+
+    def __enter__(self) -> "CancelToken":
+        self._tokens.append(_active.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _active.reset(self._tokens.pop())
+
+
+def current_token() -> Optional[CancelToken]:
+    return _active.get()
+
+
+def check_cancelled() -> None:
+    """Raise :class:`Cancelled` if the open token says stop; no-op without one."""
+    token = _active.get()
+    if token is not None:
+        token.check()
+
+
+def request_timeout(default: float) -> float:
+    """``default`` capped at the open token's remaining time, so one request cannot outlive the deadline."""
+    token = _active.get()
+    left = token.remaining() if token is not None else None
+    return default if left is None else max(0.1, min(default, left))
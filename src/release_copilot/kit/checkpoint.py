@@ -0,0 +1,93 @@
+"""Per-run checkpoints so a failed audit can resume from its last finished stage.
+
+Layout under ``data/runs/<run_id>/``::
+
+    manifest.json   run parameters, the ordered list of completed stages and, for
+                    a cancelled run, why it stopped (``incomplete``)
+    <stage>.json    whatever the stage produced (state updates, rows, paths)
+
+Files are written to a temp name and renamed, so a crash mid-write never
+leaves a half-written stage marked as complete.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RUNS_DIR = Path("data/runs")
+
+
+def new_run_id() -> str:
+    """Sortable, collision-resistant id such as ``20250822T101500Z-3fa2c1``."""
+    return f"{datetime.now(tz=timezone.utc):%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:6]}"
+
+
+def _write_json(path: Path, data: Any) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(data, f, default=str)
+    os.replace(tmp, path)
+
+
+class Checkpoint:
+    """Stage store for one run; see the module docstring for the on-disk layout."""
+
+    def __init__(self, run_id: Optional[str] = None, root: Optional[Path] = None) -> None:
+        self.run_id = run_id or new_run_id()
+        self.dir = Path(root or RUNS_DIR) / self.run_id
+        manifest = self.dir / "manifest.json"
+        if manifest.exists():
+            self.manifest: Dict[str, Any] = json.loads(manifest.read_text(encoding="utf-8"))
+        else:
+            self.manifest = {"run_id": self.run_id, "created": time.time(), "params": {}, "completed": []}
+
+    @classmethod
+    def resume(cls, run_id: str, root: Optional[Path] = None) -> "Checkpoint":
+        """Open an existing run; raises ``FileNotFoundError`` for unknown ids."""
+        cp = cls(run_id, root)
+        if not (cp.dir / "manifest.json").exists():
+            raise FileNotFoundError(f"No checkpoint for run '{run_id}' under {cp.dir.parent}")
+        return cp
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.manifest["params"]
+
+    @property
+    def completed(self) -> List[str]:
+        return list(self.manifest["completed"])
+
+    def set_params(self, params: Dict[str, Any]) -> None:
+        self.manifest["params"] = params
+        self._flush()
+
+    def done(self, stage: str) -> bool:
+        return stage in self.manifest["completed"]
+
+    def save(self, stage: str, data: Any) -> None:
+        """Persist ``data`` for ``stage`` and mark the stage complete."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        _write_json(self.dir / f"{stage}.json", data)
+        if stage not in self.manifest["completed"]:
+            self.manifest["completed"].append(stage)
+        self._flush()
+
+    def mark_incomplete(self, reason: Optional[str]) -> None:
+        """Record why the run stopped early (``None`` once a resume finishes it)."""
+        if self.manifest.get("incomplete") != reason:
+            self.manifest["incomplete"] = reason
+            self._flush()
+
+    def load(self, stage: str) -> Any:
+        with (self.dir / f"{stage}.json").open(encoding="utf-8") as f:
+            return json.load(f)
+
+    def _flush(self) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.manifest["updated"] = time.time()
+        _write_json(self.dir / "manifest.json", self.manifest)
@@ -1,6 +1,7 @@
 from __future__ import annotations
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 from rich.console import Console
 
 # Rough price mapping per 1K tokens
@@ -8,15 +9,39 @@ MODEL_PRICES = {
     'gpt-4o-mini': 0.00015,
     'gpt-4o': 0.01,
 }
+# Conservative ceiling for models missing from MODEL_PRICES (budget checks only).
+UNKNOWN_MODEL_PRICE = 0.15
+# Context window (prompt + completion tokens) per model
+MODEL_CONTEXT_TOKENS = {
+    'gpt-4o-mini': 128_000,
+    'gpt-4o': 128_000,
+}
+# Conservative window for models missing from MODEL_CONTEXT_TOKENS.
+UNKNOWN_MODEL_CONTEXT_TOKENS = 8_192
 
 console = Console()
 
+_active: ContextVar[Optional['CostSession']] = ContextVar('cost_session', default=None)
+
+
+def price_per_1k(model: str) -> float:
+    """USD per 1K tokens used for budget checks."""
+    return MODEL_PRICES.get(model, UNKNOWN_MODEL_PRICE)
+
+
+def context_window(model: str) -> int:
+    """Prompt plus completion tokens ``model`` accepts in one call."""
+    return MODEL_CONTEXT_TOKENS.get(model, UNKNOWN_MODEL_CONTEXT_TOKENS)
+
+
 @dataclass
 class StepCost:
     name: str
     prompt_tokens: int
     completion_tokens: int
     model: str
+    latency_s: float = 0.0
+    retries: int = 0
 
     @property
     def cost(self) -> float:
@@ -25,18 +50,30 @@ class StepCost:
 
 
 class CostSession:
+    """Collects per-call LLM usage; the innermost open session is :func:`current_session`."""
+
     def __init__(self) -> None:
         self.steps: List[StepCost] = []
+        self._token = None
 
-    def record(self, name: str, prompt_tokens: int, completion_tokens: int, model: str) -> None:
-        self.steps.append(StepCost(name, prompt_tokens, completion_tokens, model))
+    def record(self, name: str, prompt_tokens: int, completion_tokens: int, model: str,
+               latency_s: float = 0.0, retries: int = 0) -> None:
+        self.steps.append(StepCost(name, prompt_tokens, completion_tokens, model, latency_s, retries))
 
     def __enter__(self) -> 'CostSession':
+        self._token = _active.set(self)
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
+        _active.reset(self._token)
         total = sum(s.cost for s in self.steps)
         console.print('\n[bold]Cost summary[/bold]')
         for s in self.steps:
-            console.print(f"{s.name}: {s.prompt_tokens}/{s.completion_tokens} tokens -> ${s.cost:.4f}")
+            retries = f", {s.retries} retr{'y' if s.retries == 1 else 'ies'}" if s.retries else ''
+            console.print(f"{s.name}: {s.prompt_tokens}/{s.completion_tokens} tokens in {s.latency_s:.1f}s{retries} -> ${s.cost:.4f}")
         console.print(f"Total: ${total:.4f}")
+
+
+def current_session() -> Optional[CostSession]:
+    """The :class:`CostSession` open in this context, if any."""
+    return _active.get()
@@ -0,0 +1,143 @@
+"""Client for the local ``release-copilot serve`` daemon.
+
+Standard library only, so probing for a daemon costs the CLI nothing noticeable:
+when nothing listens on the port the connect is refused within a millisecond.
+
+Every request except ``/health`` carries the daemon's access token, which the
+daemon writes to a file only its user can read (see :func:`token_path`).
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+TOKEN_DIR = Path.home() / ".release-copilot"
+
+
+def token_path(base_url: str) -> Path:
+    """Token file of the daemon listening on ``base_url``'s port."""
+    return TOKEN_DIR / f"daemon-{urlparse(base_url).port or 80}.token"
+
+
+def write_token(base_url: str, token: str) -> Path:
+    """Write ``token`` for the daemon at ``base_url``, readable by this user only (0600)."""
+    path = token_path(base_url)
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    os.chmod(path, 0o600)  # O_CREAT's mode does not apply to an existing file
+    return path
+
+
+def read_token(base_url: str) -> Optional[str]:
+    try:
+        return token_path(base_url).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+class DaemonError(RuntimeError):
+    """The daemon rejected a request or an audit it ran failed."""
+
+
+class DaemonClient:
+    def __init__(self, base_url: str = DEFAULT_URL, timeout: float = 10.0, token: Optional[str] = None) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token = token or read_token(self.base_url)
+
+    @classmethod
+    def discover(cls, base_url: Optional[str] = None, probe_timeout: float = 0.3,
+                 cwd: Optional[Path] = None) -> Optional["DaemonClient"]:
+        """A client if a daemon answers ``/health`` at ``base_url`` and its token is readable, else ``None``.
+
+        With ``cwd``, a daemon running in another directory (and so with another
+        ``.env`` and other data stores) does not count either.
+        """
+        if base_url is None:
+            from release_copilot.config.settings import get_settings
+
+            base_url = get_settings().daemon_url or DEFAULT_URL
+        client = cls(base_url)
+        if client.token is None:
+            return None
+        try:
+            health = client._request("GET", "/health", timeout=probe_timeout)
+        except (OSError, DaemonError, ValueError):
+            return None
+        if cwd is not None and (not health.get("cwd") or Path(health["cwd"]).resolve() != Path(cwd).resolve()):
+            return None
+        return client if health.get("ok") else None
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    def _request(self, method: str, path: str, body: Optional[dict] = None, timeout: Optional[float] = None) -> Any:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json", **self._headers()})
+        try:
+            with urllib.request.urlopen(req, timeout=timeout or self.timeout) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", errors="replace")[:500]
+            raise DaemonError(f"Daemon {method} {path} failed ({e.code}): {detail}") from e
+
+    def submit(self, kind: str, **payload: Any) -> str:
+        """Queue an audit (``kind`` is ``"config"`` or ``"graph"``); returns the job id."""
+        return self._request("POST", "/audits", {"kind": kind, **payload})["id"]
+
+    def status(self, job_id: str, output_from: int = 0, narrative_from: int = 0, progress_from: int = 0) -> Dict[str, Any]:
+        return self._request("GET", f"/audits/{job_id}?output_from={output_from}&narrative_from={narrative_from}"
+                                    f"&progress_from={progress_from}")
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """Ask the daemon to stop a job at its next page (partial results are kept)."""
+        return self._request("POST", f"/audits/{job_id}/cancel", {})
+
+    def artifact(self, job_id: str, name: str) -> bytes:
+        req = urllib.request.Request(f"{self.base_url}/audits/{job_id}/artifacts/{name}", headers=self._headers())
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return resp.read()
+
+    def wait(
+        self,
+        job_id: str,
+        on_output: Optional[Callable[[str], None]] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        poll_s: float = 0.25,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Dict[str, Any]:
+        """Poll until the job finishes, forwarding new output/narrative text and progress events.
+
+        Once ``cancelled()`` turns true the job is cancelled on the daemon (and
+        still waited for, to collect its partial result). Returns the final status.
+        """
+        out_pos = narr_pos = prog_pos = 0
+        cancel_sent = False
+        while True:
+            if cancelled is not None and not cancel_sent and cancelled():
+                self.cancel(job_id)
+                cancel_sent = True
+            st = self.status(job_id, out_pos, narr_pos, prog_pos)
+            if st.get("output") and on_output:
+                on_output(st["output"])
+            if st.get("narrative") and on_narrative:
+                on_narrative(st["narrative"])
+            if on_progress:
+                for event in st.get("progress") or []:
+                    on_progress(event)
+            out_pos, narr_pos = st["output_end"], st["narrative_end"]
+            prog_pos = st.get("progress_end", prog_pos)
+            if st["status"] in ("done", "failed", "cancelled"):
+                return st
+            time.sleep(poll_s)
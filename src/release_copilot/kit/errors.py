@@ -8,3 +8,11 @@ class ApiError(Exception):
 
 class RecoverableError(Exception):
     """Raised for errors that may succeed on retry."""
+
+
+class Cancelled(BaseException):
+    """Raised at a cancellation check once a run is cancelled or past its deadline.
+
+    A ``BaseException`` like ``KeyboardInterrupt``, so best-effort ``except Exception``
+    handlers on the run path cannot turn a cancel into a skipped step.
+    """
@@ -0,0 +1,261 @@
+"""SQLite run-history store for cross-release trend queries.
+
+Every audit that reaches the Jira comparison is ingested into
+``data/history.sqlite``, keyed by run id, with one row per fix version it
+covered. Tables:
+
+``runs``              run id, kind (config/batch/graph), created (UTC ISO), window
+``run_fix_versions``  fix versions each run audited
+``repo_counts``       commits, matched and orphan commits per repo/branch
+``missing``           Jira issues without a commit, per fix version
+``orphans``           commits without a key from the Jira set
+``matched``           (Jira key, commit) pairs
+
+Indexes cover the trend queries below, so they answer from the database in
+milliseconds instead of re-parsing old CSVs. Re-ingesting a run id (for example
+after ``--resume``) replaces its rows.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+HISTORY_DB = Path("data/history.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    created TEXT NOT NULL,
+    fix_version TEXT,
+    since TEXT,
+    until TEXT,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS run_fix_versions (
+    run_id TEXT NOT NULL,
+    fix_version TEXT NOT NULL,
+    PRIMARY KEY (run_id, fix_version)
+);
+CREATE TABLE IF NOT EXISTS repo_counts (
+    run_id TEXT NOT NULL,
+    project TEXT, repo TEXT, branch TEXT,
+    commits INTEGER, matched INTEGER, orphans INTEGER
+);
+CREATE TABLE IF NOT EXISTS missing (
+    run_id TEXT NOT NULL,
+    fix_version TEXT,
+    key TEXT NOT NULL,
+    summary TEXT, status TEXT
+);
+CREATE TABLE IF NOT EXISTS orphans (
+    run_id TEXT NOT NULL,
+    project TEXT, repo TEXT, branch TEXT,
+    commit_id TEXT, author TEXT, ts TEXT, keys TEXT, message TEXT
+);
+CREATE TABLE IF NOT EXISTS matched (
+    run_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    status TEXT,
+    project TEXT, repo TEXT, branch TEXT,
+    commit_id TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+CREATE INDEX IF NOT EXISTS run_fix_versions_fv ON run_fix_versions (fix_version);
+CREATE INDEX IF NOT EXISTS repo_counts_run ON repo_counts (run_id);
+CREATE INDEX IF NOT EXISTS repo_counts_repo ON repo_counts (repo, run_id);
+CREATE INDEX IF NOT EXISTS missing_run ON missing (run_id, fix_version);
+CREATE INDEX IF NOT EXISTS missing_key ON missing (key);
+CREATE INDEX IF NOT EXISTS orphans_run ON orphans (run_id, repo);
+CREATE INDEX IF NOT EXISTS matched_run ON matched (run_id);
+CREATE INDEX IF NOT EXISTS matched_key ON matched (key);
+"""
+
+_RUN_TABLES = ("run_fix_versions", "repo_counts", "missing", "orphans", "matched", "runs")
+
+
+def connect(db: Optional[Path] = None) -> sqlite3.Connection:
+    """Open (creating if needed) the history database; rows come back as ``sqlite3.Row``."""
+    path = Path(db or HISTORY_DB)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")  # concurrent batch audits append safely
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _repo_counts(
+    summary_rows: Iterable[Mapping[str, Any]], matched: List[Mapping[str, Any]], orphans: List[Mapping[str, Any]]
+) -> List[tuple]:
+    def key(r: Mapping[str, Any]) -> tuple:
+        return (r.get("project", ""), r.get("repo", ""), r.get("branch", ""))
+
+    matched_commits: Dict[tuple, set] = {}
+    for m in matched:
+        matched_commits.setdefault(key(m), set()).add(m.get("commit"))
+    orphan_counts: Dict[tuple, int] = {}
+    for o in orphans:
+        orphan_counts[key(o)] = orphan_counts.get(key(o), 0) + 1
+    return [
+        (*key(sr), int(sr.get("count") or 0), len(matched_commits.get(key(sr), ())), orphan_counts.get(key(sr), 0))
+        for sr in summary_rows
+    ]
+
+
+def record_run(
+    run_id: str,
+    kind: str,
+    fix_versions: List[str],
+    summary_rows: Iterable[Mapping[str, Any]],
+    missing: List[Mapping[str, Any]],
+    orphans: List[Mapping[str, Any]],
+    matched: List[Mapping[str, Any]],
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    created: Optional[str] = None,
+    db: Optional[Path] = None,
+) -> None:
+    """Store one run's comparison, replacing anything recorded earlier under ``run_id``.
+
+    ``summary_rows`` carry ``project/repo/branch/count``; ``missing`` rows
+    ``key/summary/status/fixVersions``; ``orphans`` and ``matched`` rows the
+    ``audit_from_config`` CSV columns (``matched`` adds ``key``/``commit``).
+    A missing issue is filed under each audited fix version it belongs to.
+    """
+    created = created or datetime.now(tz=timezone.utc).isoformat(timespec="seconds")
+    audited = {v.casefold(): v for v in fix_versions}
+
+    def versions_of(row: Mapping[str, Any]) -> List[Optional[str]]:
+        raw = row.get("fixVersions") or ""
+        names = raw if isinstance(raw, list) else [v.strip() for v in str(raw).split(",")]
+        hits = [audited[n.casefold()] for n in names if n and n.casefold() in audited]
+        if hits:
+            return list(dict.fromkeys(hits))
+        return [fix_versions[0]] if len(fix_versions) == 1 else [None]
+
+    with closing(connect(db)) as conn, conn:
+        for table in _RUN_TABLES:
+            conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+        conn.execute(
+            "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run_id, kind, created, ", ".join(fix_versions), since, until, json.dumps(params or {}, default=str)),
+        )
+        conn.executemany("INSERT INTO run_fix_versions VALUES (?, ?)", [(run_id, v) for v in fix_versions])
+        conn.executemany(
+            "INSERT INTO repo_counts VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(run_id, *row) for row in _repo_counts(summary_rows, matched, orphans)],
+        )
+        conn.executemany(
+            "INSERT INTO missing VALUES (?, ?, ?, ?, ?)",
+            [(run_id, fv, m["key"], m.get("summary", ""), m.get("status", "")) for m in missing for fv in versions_of(m)],
+        )
+        conn.executemany(
+            "INSERT INTO orphans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (run_id, o.get("project", ""), o.get("repo", ""), o.get("branch", ""),
+                 o.get("id") or o.get("displayId", ""), o.get("author", ""), str(o.get("authorTimestamp", "")),
+                 o.get("_extracted_keys") or o.get("extracted_keys", ""), (o.get("message", "") or "").split("\n", 1)[0])
+                for o in orphans
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO matched VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(run_id, m["key"], m.get("status", ""), m.get("project", ""), m.get("repo", ""), m.get("branch", ""),
+              m.get("commit", "")) for m in matched],
+        )
+
+
+def _rows(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+    return [dict(r) for r in conn.execute(sql, params)]
+
+
+def list_runs(limit: int = 20, db: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Most recent runs with their totals."""
+    with closing(connect(db)) as conn:
+        return _rows(conn, """
+            SELECT r.run_id, r.kind, r.created, r.fix_version,
+                   (SELECT COALESCE(SUM(commits), 0) FROM repo_counts c WHERE c.run_id = r.run_id) AS commits,
+                   (SELECT COUNT(DISTINCT key) FROM missing m WHERE m.run_id = r.run_id) AS missing,
+                   (SELECT COUNT(*) FROM orphans o WHERE o.run_id = r.run_id) AS orphans
+            FROM runs r ORDER BY r.created DESC, r.run_id DESC LIMIT ?""", (limit,))
+
+
+def latest_releases(last: int = 3, db: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """The ``last`` most recently audited fix versions and the latest run covering each."""
+    with closing(connect(db)) as conn:
+        return _latest_releases(conn, last)
+
+
+def _latest_releases(conn: sqlite3.Connection, last: int) -> List[Dict[str, Any]]:
+    # SQLite returns the bare run_id of the row holding MAX(created).
+    return _rows(conn, """
+        SELECT f.fix_version, f.run_id, MAX(r.created) AS created
+        FROM run_fix_versions f JOIN runs r ON r.run_id = f.run_id
+        GROUP BY f.fix_version ORDER BY created DESC LIMIT ?""", (last,))
+
+
+def missing_across(last: int = 3, min_releases: Optional[int] = None, db: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Issues missing from the branches in at least ``min_releases`` (default: all) of the last ``last`` releases."""
+    with closing(connect(db)) as conn:
+        releases = _latest_releases(conn, last)
+        if not releases:
+            return []
+        pairs = " OR ".join("(m.run_id = ? AND m.fix_version = ?)" for _ in releases)
+        params = tuple(v for r in releases for v in (r["run_id"], r["fix_version"]))
+        need = min_releases or len(releases)
+        return _rows(conn, f"""
+            SELECT m.key, MAX(m.summary) AS summary, MAX(m.status) AS status,
+                   COUNT(DISTINCT m.fix_version) AS releases,
+                   GROUP_CONCAT(DISTINCT m.fix_version) AS fix_versions
+            FROM missing m WHERE {pairs}
+            GROUP BY m.key HAVING releases >= ?
+            ORDER BY releases DESC, m.key""", params + (need,))
+
+
+def orphan_rate(repo: Optional[str] = None, limit: int = 200, db: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Orphan commits / commits per repo/branch and run, oldest first."""
+    with closing(connect(db)) as conn:
+        return _rows(conn, """
+            SELECT * FROM (
+                SELECT r.created, r.run_id, r.fix_version, c.project, c.repo, c.branch, c.commits, c.orphans,
+                       ROUND(1.0 * c.orphans / NULLIF(c.commits, 0), 3) AS orphan_rate
+                FROM repo_counts c JOIN runs r ON r.run_id = c.run_id
+                WHERE ? IS NULL OR c.repo = ?
+                ORDER BY r.created DESC LIMIT ?
+            ) ORDER BY created, project, repo, branch""", (repo, repo, limit))
+
+
+def key_history(key: str, db: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Every run that saw ``key``, as missing or matched (with the commit)."""
+    with closing(connect(db)) as conn:
+        return _rows(conn, """
+            SELECT r.created, r.run_id, m.fix_version, 'missing' AS state, m.status, '' AS repo, '' AS branch, '' AS commit_id
+            FROM missing m JOIN runs r ON r.run_id = m.run_id WHERE m.key = ?
+            UNION ALL
+            SELECT r.created, r.run_id, r.fix_version, 'matched', x.status, x.repo, x.branch, x.commit_id
+            FROM matched x JOIN runs r ON r.run_id = x.run_id WHERE x.key = ?
+            ORDER BY 1, 2""", (key, key))
+
+
+def run_rows(run_id: str, db: Optional[Path] = None) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """One run's stored comparison in ``record_run``'s row shapes, or ``None`` if unknown."""
+    with closing(connect(db)) as conn:
+        if conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone() is None:
+            return None
+        return {
+            "summary_rows": _rows(conn, "SELECT project, repo, branch, commits AS count FROM repo_counts WHERE run_id = ?",
+                                  (run_id,)),
+            "missing": _rows(conn, "SELECT DISTINCT key, summary, status FROM missing WHERE run_id = ?", (run_id,)),
+            "orphans": _rows(conn, """
+                SELECT project, repo, branch, commit_id, author, ts AS authorTimestamp, message
+                FROM orphans WHERE run_id = ?""", (run_id,)),
+            "matched": _rows(conn, """
+                SELECT key, status, project, repo, branch, commit_id AS 'commit'
+                FROM matched WHERE run_id = ?""", (run_id,)),
+        }
@@ -0,0 +1,40 @@
+"""Shared ``requests`` sessions so repeated calls reuse TCP/TLS connections.
+
+A one-shot CLI run barely notices, but the warm daemon (``release-copilot serve``)
+and the per-repo fan-out issue many requests to the same hosts; a pooled
+session per service skips the connect and TLS handshake on each of them.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def new_session(pool_maxsize: int = 16, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """Session with a connection pool sized for the fan-out; ``headers`` are fixed at creation."""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    if headers:
+        s.headers.update(headers)
+    return s
+
+
+def get_session(name: str, pool_maxsize: int = 16) -> requests.Session:
+    """Process-wide session for ``name`` (e.g. ``"bitbucket"``), created on first use.
+
+    Shared across threads, so callers pass credentials per request rather than
+    mutating the session's headers.
+    """
+    with _lock:
+        s = _sessions.get(name)
+        if s is None:
+            s = _sessions[name] = new_session(pool_maxsize)
+        return s
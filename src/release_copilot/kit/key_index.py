@@ -0,0 +1,112 @@
+"""Persistent Jira key -> commit index (``data/key_index.sqlite``).
+
+Every commit fetch (audit collect stage, graph runs, cached or not) feeds the
+index, so "is MOBI-1234 in release/r-55.1?" is one indexed lookup instead of an
+audit run. Tables:
+
+``key_commits``  (key, project, repo, branch, sha) -> author timestamp (ms)
+``branches``     what has been indexed per project/repo/branch and the newest
+                 commit seen, so a refresh only fetches what is newer
+
+Inserts are idempotent; re-indexing the same commits is cheap.
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from release_copilot.kit.jira_key import extract_keys
+from release_copilot.kit.tracing import span
+
+logger = logging.getLogger(__name__)
+
+INDEX_DB = Path("data/key_index.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS key_commits (
+    key TEXT NOT NULL,
+    project TEXT NOT NULL, repo TEXT NOT NULL, branch TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    ts INTEGER,
+    PRIMARY KEY (key, project, repo, branch, sha)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS branches (
+    project TEXT NOT NULL, repo TEXT NOT NULL, branch TEXT NOT NULL,
+    newest_ts INTEGER,
+    indexed_at REAL,
+    PRIMARY KEY (project, repo, branch)
+);
+"""
+
+Branch = Tuple[str, str, str]
+
+
+def connect(db: Optional[Path] = None) -> sqlite3.Connection:
+    path = Path(db or INDEX_DB)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def index_commits(project: str, repo: str, branch: str, commits: Iterable[Mapping[str, Any]],
+                  db: Optional[Path] = None) -> int:
+    """Add the keyed commits of one branch; returns how many (key, commit) pairs were seen."""
+    rows = []
+    newest = 0
+    for c in commits:
+        ts = int(c.get("authorTimestamp") or 0)
+        newest = max(newest, ts)
+        keys = c.get("jira_keys")
+        if isinstance(keys, str):
+            keys = [k for k in keys.replace(";", ",").split(",") if k]
+        for key in keys or extract_keys(c.get("message", "") or ""):
+            rows.append((key, project, repo, branch, c.get("id") or c.get("displayId") or "", ts))
+    with closing(connect(db)) as conn, conn:
+        conn.executemany("INSERT OR IGNORE INTO key_commits VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.execute(
+            """INSERT INTO branches VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (project, repo, branch) DO UPDATE SET
+                   newest_ts = NULLIF(MAX(COALESCE(newest_ts, 0), COALESCE(excluded.newest_ts, 0)), 0),
+                   indexed_at = excluded.indexed_at""",
+            (project, repo, branch, newest or None, time.time()),
+        )
+    return len(rows)
+
+
+def record(project: str, repo: str, branch: str, commits: Iterable[Mapping[str, Any]]) -> None:
+    """``index_commits`` for fetch paths: never fails the caller."""
+    try:
+        with span("key_index.record", "io", repo=repo, branch=branch):
+            index_commits(project, repo, branch, commits)
+    except Exception as e:
+        logger.warning("Key index not updated for %s/%s@%s: %s", project, repo, branch, e)
+
+
+def lookup(keys: Sequence[str], branches: Optional[Sequence[str]] = None,
+           db: Optional[Path] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Key -> commits containing it (newest first), optionally limited to branch names."""
+    found: Dict[str, List[Dict[str, Any]]] = {k: [] for k in keys}
+    if not keys:
+        return found
+    sql = f"SELECT * FROM key_commits WHERE key IN ({', '.join('?' for _ in keys)})"
+    params: List[Any] = list(keys)
+    if branches:
+        sql += f" AND branch IN ({', '.join('?' for _ in branches)})"
+        params += list(branches)
+    with closing(connect(db)) as conn:
+        for row in conn.execute(sql + " ORDER BY ts DESC", params):
+            found[row["key"]].append(dict(row))
+    return found
+
+
+def indexed_branches(db: Optional[Path] = None) -> Dict[Branch, Optional[int]]:
+    """Indexed project/repo/branch -> newest commit timestamp (ms)."""
+    with closing(connect(db)) as conn:
+        return {(r["project"], r["repo"], r["branch"]): r["newest_ts"] for r in conn.execute("SELECT * FROM branches")}
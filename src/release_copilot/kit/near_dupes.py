@@ -0,0 +1,114 @@
+"""Near-duplicate clustering for short texts such as commit first lines.
+
+Uses one-permutation MinHash over character shingles with LSH banding, so each
+line costs a single pass over its shingles and candidate lookup is a handful of
+dict probes. Lines that normalize to the same text skip hashing entirely.
+"""
+from __future__ import annotations
+
+import re
+import zlib
+from itertools import repeat
+from operator import and_, eq, mul, rshift
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SHINGLE = 4
+BANDS = 8
+ROWS = 4
+BIN_BITS = 5
+NUM_BINS = 1 << BIN_BITS  # == BANDS * ROWS
+THRESHOLD = 0.7
+
+_MASK64 = (1 << 64) - 1
+_MIX = 0x9E3779B97F4A7C15
+_EMPTY = _MASK64
+
+_NUM_RX = re.compile(r"\d+")
+_HEX_RX = re.compile(r"\b[0-9a-f]{7,40}\b")
+_WS_RX = re.compile(r"\s+")
+
+
+def normalize_line(text: str) -> str:
+    """Lowercase, collapse SHAs, numbers and whitespace so trivial variants match."""
+    t = (text or "").lower()
+    t = _HEX_RX.sub("#", t)
+    t = _NUM_RX.sub("0", t)
+    return _WS_RX.sub(" ", t).strip()
+
+
+def _shingle_hashes(norm: str) -> Iterable[int]:
+    data = f" {norm} ".encode("utf-8")
+    grams = {data[i:i + SHINGLE] for i in range(max(1, len(data) - SHINGLE + 1))}
+    # Fibonacci-hash the CRCs to 64 bits; kept in C-level map() calls for speed.
+    return map(and_, map(mul, map(zlib.crc32, grams), repeat(_MIX)), repeat(_MASK64))
+
+
+def signature(norm: str) -> Tuple[int, ...]:
+    """One-permutation MinHash signature with rotation densification.
+
+    The top ``BIN_BITS`` of each shingle hash pick its bin; each bin keeps its
+    smallest hash (descending sort, so the last write per bin wins).
+    """
+    hs = sorted(_shingle_hashes(norm), reverse=True)
+    bins = dict(zip(map(rshift, hs, repeat(64 - BIN_BITS)), hs))
+    sig = list(map(bins.get, range(NUM_BINS), repeat(_EMPTY)))
+    # Densify: empty bins borrow the next non-empty bin so short lines still compare.
+    if len(bins) < NUM_BINS:
+        for b in range(NUM_BINS):
+            if sig[b] == _EMPTY:
+                j = (b + 1) % NUM_BINS
+                while j not in bins:
+                    j = (j + 1) % NUM_BINS
+                sig[b] = bins[j] + (j - b) % NUM_BINS
+    return tuple(sig)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(map(eq, a, b)) / NUM_BINS
+
+
+class NearDuplicateIndex:
+    """Online clusterer: :meth:`add` returns a stable cluster id for each text.
+
+    The first text of a cluster is its reference; later texts join it when their
+    estimated similarity reaches ``threshold``. Memory grows with the number of
+    distinct normalized lines, not the number of texts added.
+    """
+
+    def __init__(self, threshold: float = THRESHOLD) -> None:
+        self.threshold = threshold
+        self._exact: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], int] = {}
+        self._signatures: List[Tuple[int, ...]] = []
+        self.sizes: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def _match(self, sig: Tuple[int, ...]) -> Optional[int]:
+        seen = set()
+        for band in range(BANDS):
+            cid = self._buckets.get((band, sig[band * ROWS:(band + 1) * ROWS]))
+            if cid is None or cid in seen:
+                continue
+            seen.add(cid)
+            if similarity(sig, self._signatures[cid]) >= self.threshold:
+                return cid
+        return None
+
+    def add(self, text: str) -> int:
+        norm = normalize_line(text)
+        cid = self._exact.get(norm)
+        if cid is None:
+            sig = signature(norm)
+            cid = self._match(sig)
+            if cid is None:
+                cid = len(self._signatures)
+                self._signatures.append(sig)
+                self.sizes.append(0)
+                for band in range(BANDS):
+                    self._buckets.setdefault((band, sig[band * ROWS:(band + 1) * ROWS]), cid)
+            self._exact[norm] = cid
+        self.sizes[cid] += 1
+        return cid
@@ -0,0 +1,144 @@
+"""Patch-ids: the same change under different SHAs (cherry-picks, rebases).
+
+A patch-id hashes what a commit changes, not where it sits: per file, the path
+plus the added/removed lines with all whitespace stripped (hunk headers, line
+numbers and ``index`` lines are ignored). File hashes are summed, so file order
+does not matter, as with ``git patch-id --stable``. Two commits with the same
+patch-id carry the same change.
+
+Diffs come from a local mirror (``git show`` under ``GIT_MIRROR_ROOT``) when one
+exists, otherwise from the Bitbucket patch endpoint; either way the id is
+computed here so both sources agree. A SHA's patch never changes, so ids are
+cached without expiry in ``data/patch_ids.sqlite``. Empty diffs (merges) have
+no id.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import sqlite3
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from contextvars import copy_context
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from release_copilot.kit.cancellation import check_cancelled
+from release_copilot.kit.tracing import span
+
+logger = logging.getLogger(__name__)
+
+PATCH_ID_DB = Path("data/patch_ids.sqlite")
+
+_WS_RX = re.compile(rb"\s+")
+# Bumped whenever patch_id() changes, so cached ids are recomputed.
+_ALGORITHM_VERSION = 2
+
+
+def patch_id(diff: str | bytes) -> Optional[str]:
+    """Stable patch-id of a unified diff, or ``None`` if it changes nothing.
+
+    File headers (``index``, ``---``/``+++``, mode and rename lines) run from
+    ``diff --git`` to the first ``@@``; only lines after it are content, so a
+    removed ``-- comment`` line still counts.
+    """
+    data = diff.encode("utf-8", "replace") if isinstance(diff, str) else diff
+    total = 0
+    current = None
+    changed = in_header = False
+    for line in data.splitlines():
+        if line.startswith(b"diff --git "):
+            if current is not None and changed:
+                total += int.from_bytes(current.digest(), "big")
+            current, changed, in_header = hashlib.sha1(_WS_RX.sub(b"", line)), False, True
+        elif line.startswith(b"@@"):
+            in_header = False
+        elif current is None or in_header:
+            continue
+        elif line[:1] in (b"+", b"-"):
+            current.update(_WS_RX.sub(b"", line))
+            changed = True
+    if current is not None and changed:
+        total += int.from_bytes(current.digest(), "big")
+    return f"{total % (1 << 160):040x}" if total else None
+
+
+def mirror_path(project: str, repo: str, root: Optional[str]) -> Optional[Path]:
+    """Local mirror for ``project/repo`` under ``root``, if one exists."""
+    if not root:
+        return None
+    for candidate in (Path(root) / project / f"{repo}.git", Path(root) / project / repo,
+                      Path(root) / f"{repo}.git", Path(root) / repo):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def mirror_diff(mirror: Path, sha: str) -> bytes:
+    out = subprocess.run(
+        ["git", "--git-dir" if mirror.suffix == ".git" else "-C", str(mirror), "show", "--format=", "--no-color",
+         "--no-ext-diff", "--no-renames", sha],
+        capture_output=True, check=True,
+    )
+    return out.stdout
+
+
+def _connect(db: Optional[Path]) -> sqlite3.Connection:
+    path = Path(db or PATCH_ID_DB)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS patch_ids (sha TEXT PRIMARY KEY, patch_id TEXT) WITHOUT ROWID")
+    # Ids cached by an older patch_id() may differ from what it computes now.
+    if conn.execute("PRAGMA user_version").fetchone()[0] < _ALGORITHM_VERSION:
+        with conn:
+            conn.execute("DELETE FROM patch_ids")
+        conn.execute(f"PRAGMA user_version = {_ALGORITHM_VERSION}")
+    return conn
+
+
+def patch_ids(
+    shas: Iterable[str],
+    fetch_diff: Callable[[str], str | bytes],
+    max_workers: int = 8,
+    db: Optional[Path] = None,
+) -> Dict[str, Optional[str]]:
+    """SHA -> patch-id, from the cache or by fetching and hashing diffs in a thread pool.
+
+    A SHA whose diff cannot be fetched maps to ``None`` and is not cached.
+    """
+    shas = list(dict.fromkeys(s for s in shas if s))
+    out: Dict[str, Optional[str]] = {}
+    with closing(_connect(db)) as conn:
+        for start in range(0, len(shas), 500):  # SQLite parameter limit
+            chunk = shas[start:start + 500]
+            rows = conn.execute(f"SELECT sha, patch_id FROM patch_ids WHERE sha IN ({', '.join('?' for _ in chunk)})", chunk)
+            out.update(rows)
+    todo: List[str] = [s for s in shas if s not in out]
+    if not todo:
+        return out
+
+    failed: set = set()
+
+    def one(sha: str) -> Optional[str]:
+        check_cancelled()
+        try:
+            diff = fetch_diff(sha)
+        except Exception as e:
+            logger.warning("No diff for %s: %s", sha[:10], e)
+            failed.add(sha)
+            return None
+        with span("patch_id.compute", "cpu", sha=sha[:10]):
+            return patch_id(diff)
+
+    with span("patch_id.batch", commits=len(todo)):
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="patch-id") as pool:
+            futures = [pool.submit(copy_context().run, one, sha) for sha in todo]
+            computed = {sha: f.result() for sha, f in zip(todo, futures)}
+    with closing(_connect(db)) as conn, conn:
+        conn.executemany("INSERT OR REPLACE INTO patch_ids VALUES (?, ?)",
+                         [(sha, pid) for sha, pid in computed.items() if sha not in failed])
+    out.update(computed)
+    return out
@@ -0,0 +1,147 @@
+"""Opt-in profiling for audit runs (``--profile`` / ``--profile-memory``).
+
+:class:`Profiler` combines two views of the same run:
+
+* deterministic ``cProfile`` for every thread started while it is active (plus
+  the calling thread), merged into ``profile.pstats`` and a top-N text report;
+* a wall-clock sampler over all threads, written as collapsed stacks
+  (``profile.collapsed``) for flamegraph.pl, speedscope or Perfetto. Samples
+  blocked in socket/SSL reads show network time next to CPU hot spots.
+
+Both CLIs expose it as ``--profile``; ``--profile-memory`` implies it. With
+``memory=True`` allocations are traced with ``tracemalloc``; the top
+allocation sites go to ``memory_top.txt`` and per-stage peaks show up in the
+tracing table (see :class:`release_copilot.kit.tracing.Tracer`).
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Before 3.12 cProfile hooks one thread at a time; from 3.12 it uses sys.monitoring,
+# which already covers every thread (and allows a single active profiler).
+_PER_THREAD = sys.version_info < (3, 12)
+
+# Leaf frames that mean "parked, doing nothing" rather than work or network wait.
+_IDLE_LEAVES = {("threading.py", "wait"), ("queue.py", "get"), ("thread.py", "_worker")}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", Path(code.co_filename).stem)
+    return f"{module}:{code.co_name}"
+
+
+class Profiler:
+    """Context manager writing profiler output for the enclosed run to ``out_dir``."""
+
+    def __init__(self, out_dir: Path, interval_s: float = 0.005, memory: bool = False, top_n: int = 40) -> None:
+        self.out_dir = Path(out_dir)
+        self.interval_s = interval_s
+        self.memory = memory
+        self.top_n = top_n
+        self.outputs: Dict[str, Path] = {}
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    # -- deterministic -------------------------------------------------------
+    def _start_thread_profile(self, frame, event, arg) -> None:
+        # Installed via threading.setprofile: runs once per new thread, then hands
+        # the thread over to its own cProfile instance.
+        sys.setprofile(None)
+        prof = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(prof)
+        prof.enable()
+
+    # -- sampling ------------------------------------------------------------
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval_s):
+            for t in threading.enumerate():
+                names[t.ident] = t.name
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                leaf = (Path(frame.f_code.co_filename).name, frame.f_code.co_name)
+                if leaf in _IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(tid, f"thread-{tid}"))
+                self._samples[";".join(reversed(stack))] += 1
+
+    def __enter__(self) -> "Profiler":
+        if self.memory:
+            tracemalloc.start(10)
+        main = cProfile.Profile()
+        self._profiles.append(main)
+        if _PER_THREAD:
+            threading.setprofile(self._start_thread_profile)
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+        main.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._profiles[0].disable()
+        if _PER_THREAD:
+            threading.setprofile(None)
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._write_pstats()
+        self._write_collapsed()
+        if self.memory:
+            self._write_memory()
+            tracemalloc.stop()
+
+    def _write_pstats(self) -> None:
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0])
+        for prof in profiles[1:]:
+            prof.disable()
+            try:
+                stats.add(prof)
+            except TypeError:  # a thread that never ran any Python code
+                continue
+        path = self.out_dir / "profile.pstats"
+        stats.dump_stats(str(path))
+        self.outputs["pstats"] = path
+
+        buf = io.StringIO()
+        pstats.Stats(str(path), stream=buf).sort_stats("cumulative").print_stats(self.top_n)
+        top = self.out_dir / "profile_top.txt"
+        top.write_text(buf.getvalue(), encoding="utf-8")
+        self.outputs["top"] = top
+
+    def _write_collapsed(self) -> None:
+        path = self.out_dir / "profile.collapsed"
+        with path.open("w", encoding="utf-8") as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+        self.outputs["collapsed"] = path
+
+    def _write_memory(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().statistics("lineno")
+        lines = [f"Traced memory: current {current / 2**20:.1f} MB (peak since last stage boundary {peak / 2**20:.1f} MB)", ""]
+        lines += [str(s) for s in stats[: self.top_n]]
+        path = self.out_dir / "memory_top.txt"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self.outputs["memory"] = path
@@ -0,0 +1,135 @@
+"""Structured progress events from a running audit to whoever is watching it.
+
+Open a :class:`ProgressBus` around a run; fetchers, the comparison and the
+report writers call :func:`emit` with a stage name and page/row counts. Like
+the tracer, the open bus lives in a ``ContextVar``: pools that submit through
+``contextvars.copy_context().run`` report into the same bus, and :func:`emit`
+is a no-op when no bus is open, so CLI runs pay nothing.
+
+The bus is a thread-safe queue. A consumer (the Streamlit UI, the daemon)
+calls :meth:`ProgressBus.wait` or :meth:`ProgressBus.drain` and receives only
+the events it has not seen yet. While open, the bus also forwards the run's
+log records as ``"log"`` events, so a UI never re-reads the log file.
+:class:`ProgressState` folds events into per-stage bars.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+_active: ContextVar[Optional["ProgressBus"]] = ContextVar("progress_bus", default=None)
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """``done`` of ``total`` units (pages, issues, rows) for ``stage``; ``total`` may be unknown."""
+
+    stage: str
+    status: str = "running"
+    done: int = 0
+    total: Optional[int] = None
+    message: str = ""
+    ts: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _LogForwarder(logging.Handler):
+    """Forwards records logged under the bus's context (its run and the run's pools)."""
+
+    def __init__(self, bus: "ProgressBus") -> None:
+        super().__init__(level=logging.INFO)
+        self.bus = bus
+        self.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s", "%H:%M:%S"))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if _active.get() is self.bus:
+            try:
+                self.bus.put(ProgressEvent(record.name, "log", message=self.format(record), ts=record.created))
+            except Exception:  # pragma: no cover - logging must never fail the run
+                self.handleError(record)
+
+
+class ProgressBus:
+    """Thread-safe event queue; ``with bus:`` makes it the target of :func:`emit`."""
+
+    def __init__(self, forward_logs: bool = True) -> None:
+        self._queue: "queue.SimpleQueue[ProgressEvent]" = queue.SimpleQueue()
+        self._forwarder = _LogForwarder(self) if forward_logs else None
+        self._tokens: List[Any] = []
+
+    def put(self, event: ProgressEvent) -> None:
+        self._queue.put(event)
+
+    def drain(self) -> List[ProgressEvent]:
+        """Every event queued since the last drain, oldest first (never blocks)."""
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def wait(self, timeout: Optional[float] = None) -> List[ProgressEvent]:
+        """Block until at least one event arrives (or ``timeout``), then drain."""
+        try:
+            first = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        return [first] + self.drain()
+
+    def __enter__(self) -> "ProgressBus":
+        self._tokens.append(_active.set(self))
+        if self._forwarder is not None and len(self._tokens) == 1:
+            logging.getLogger().addHandler(self._forwarder)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _active.reset(self._tokens.pop())
+        if self._forwarder is not None and not self._tokens:
+            logging.getLogger().removeHandler(self._forwarder)
+
+
+def current_bus() -> Optional[ProgressBus]:
+    return _active.get()
+
+
+def emit(stage: str, status: str = "running", done: int = 0, total: Optional[int] = None, message: str = "") -> None:
+    """Report progress of ``stage`` to the open bus, if any."""
+    bus = _active.get()
+    if bus is not None:
+        bus.put(ProgressEvent(stage, status, int(done), None if total is None else int(total), message))
+
+
+class ProgressState:
+    """Latest event per stage plus the most recent log lines, built from batches of events."""
+
+    def __init__(self, max_log_lines: int = 500) -> None:
+        self.stages: Dict[str, ProgressEvent] = {}
+        self.logs: Deque[str] = deque(maxlen=max_log_lines)
+
+    def apply(self, events: Iterable[ProgressEvent]) -> bool:
+        """Fold ``events`` in; returns whether anything changed."""
+        changed = False
+        for e in events:
+            changed = True
+            if e.status == "log":
+                self.logs.append(e.message)
+            else:
+                self.stages[e.stage] = e
+        return changed
+
+    def fraction(self, stage: str) -> Optional[float]:
+        """Completed share of ``stage`` in [0, 1], or ``None`` while its total is unknown."""
+        e = self.stages[stage]
+        if e.status == "done":
+            return 1.0
+        if not e.total:
+            return None
+        return min(1.0, e.done / e.total)
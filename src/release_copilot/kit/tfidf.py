@@ -0,0 +1,134 @@
+"""Local TF-IDF similarity between commit messages and Jira summaries.
+
+Fully offline: issues are tokenized into a vocabulary, weighted by smoothed
+IDF and L2-normalized into a sparse matrix; commit messages are projected on
+the same vocabulary, and all commit x issue cosine scores come out of a single
+sparse matrix product. The vocabulary, IDF vector and issue matrix are cached
+under ``data/.cache/tfidf/`` keyed by the issue texts, so reruns over the same
+release only vectorize the commits.
+
+Needs numpy and scipy (imported on first use).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from release_copilot.kit import caching
+from release_copilot.kit.jira_key import JIRA_KEY_RX
+from release_copilot.kit.tracing import span
+
+_TOKEN_RX = re.compile(r"[a-z][a-z0-9]+")
+_STOP = frozenset(
+    "a an and are as at be by for from has in into is it of on or the this to was were will with "
+    "add added adds fix fixed fixes update updated updates change changed changes merge merged "
+    "branch pull request feature bugfix hotfix release develop wip".split()
+)
+
+
+def tokens(text: str) -> List[str]:
+    """Lowercase word tokens without Jira keys, stop words and 1-char words."""
+    text = JIRA_KEY_RX.sub(" ", text or "").lower()
+    return [t for t in _TOKEN_RX.findall(text) if t not in _STOP]
+
+
+def _require():
+    try:
+        import numpy as np
+        from scipy import sparse
+    except Exception as e:
+        raise RuntimeError("numpy and scipy are required for issue suggestions (pip install numpy scipy)") from e
+    return np, sparse
+
+
+class IssueIndex:
+    """TF-IDF matrix over issue texts; ``keys[i]`` labels row ``i``."""
+
+    def __init__(self, keys: List[str], vocab: Dict[str, int], idf, matrix) -> None:
+        self.keys = keys
+        self.vocab = vocab
+        self.idf = idf
+        self.matrix = matrix
+
+    @classmethod
+    def build(cls, docs: Sequence[Tuple[str, str]]) -> "IssueIndex":
+        """Index ``(key, text)`` pairs."""
+        np, sparse = _require()
+        vocab: Dict[str, int] = {}
+        rows, cols, vals = [], [], []
+        for i, (_, text) in enumerate(docs):
+            counts: Dict[int, int] = {}
+            for t in tokens(text):
+                j = vocab.setdefault(t, len(vocab))
+                counts[j] = counts.get(j, 0) + 1
+            rows += [i] * len(counts)
+            cols += counts.keys()
+            vals += counts.values()
+        tf = sparse.csr_matrix((np.asarray(vals, dtype=np.float32), (rows, cols)), shape=(len(docs), len(vocab)))
+        df = np.bincount(tf.indices, minlength=len(vocab))
+        idf = (np.log((1 + len(docs)) / (1 + df)) + 1).astype(np.float32)
+        return cls([k for k, _ in docs], vocab, idf, _normalize(tf.multiply(idf).tocsr()))
+
+    @classmethod
+    def cached(cls, docs: Sequence[Tuple[str, str]]) -> "IssueIndex":
+        """``build`` through the on-disk cache (keyed by the exact ``docs``)."""
+        np, sparse = _require()
+        digest = hashlib.sha1(json.dumps(list(docs)).encode("utf-8")).hexdigest()
+        base = Path(caching.CACHE_DIR) / "tfidf" / digest
+        if base.with_suffix(".npz").exists() and base.with_suffix(".json").exists():
+            with span("tfidf.load", "cache"):
+                meta = json.loads(base.with_suffix(".json").read_text(encoding="utf-8"))
+                return cls(meta["keys"], meta["vocab"], np.asarray(meta["idf"], dtype=np.float32),
+                           sparse.load_npz(base.with_suffix(".npz")).tocsr())
+        with span("tfidf.build", "cpu", issues=len(docs)):
+            index = cls.build(docs)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        sparse.save_npz(base.with_suffix(".npz"), index.matrix)
+        base.with_suffix(".json").write_text(
+            json.dumps({"keys": index.keys, "vocab": index.vocab, "idf": index.idf.tolist()}), encoding="utf-8")
+        return index
+
+    def vectorize(self, texts: Sequence[str]):
+        """TF-IDF rows for ``texts`` on this index's vocabulary (unknown words dropped)."""
+        np, sparse = _require()
+        rows, cols, vals = [], [], []
+        for i, text in enumerate(texts):
+            counts: Dict[int, int] = {}
+            for t in tokens(text):
+                j = self.vocab.get(t)
+                if j is not None:
+                    counts[j] = counts.get(j, 0) + 1
+            rows += [i] * len(counts)
+            cols += counts.keys()
+            vals += counts.values()
+        tf = sparse.csr_matrix((np.asarray(vals, dtype=np.float32), (rows, cols)),
+                               shape=(len(texts), len(self.vocab)))
+        return _normalize(tf.multiply(self.idf).tocsr())
+
+    def top_k(self, texts: Sequence[str], k: int = 3, min_score: float = 0.1) -> List[List[Tuple[str, float]]]:
+        """Best ``k`` issues per text as ``(key, cosine)``, best first, above ``min_score``."""
+        np, _ = _require()
+        if not texts or not self.keys:
+            return [[] for _ in texts]
+        with span("tfidf.score", "cpu", texts=len(texts), issues=len(self.keys)):
+            scores = (self.vectorize(texts) @ self.matrix.T).tocsr()
+        out: List[List[Tuple[str, float]]] = []
+        for i in range(scores.shape[0]):
+            lo, hi = scores.indptr[i], scores.indptr[i + 1]
+            cols, vals = scores.indices[lo:hi], scores.data[lo:hi]
+            if len(vals) > k:
+                keep = np.argpartition(-vals, k)[:k]
+                cols, vals = cols[keep], vals[keep]
+            order = np.argsort(-vals)
+            out.append([(self.keys[cols[j]], round(float(vals[j]), 3)) for j in order if vals[j] >= min_score])
+        return out
+
+
+def _normalize(m: Any):
+    np, sparse = _require()
+    norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return (sparse.diags(1.0 / norms).astype(np.float32) @ m).tocsr()
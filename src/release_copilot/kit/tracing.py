@@ -0,0 +1,179 @@
+"""Lightweight tracing spans written as Chrome trace JSON.
+
+Open a :class:`Tracer` for a run, wrap work in :func:`span` (or decorate it with
+:func:`traced`), and write the result with :meth:`Tracer.write`. The file loads in
+``chrome://tracing`` and https://ui.perfetto.dev. Spans are no-ops when no tracer
+is active, so instrumented code costs nothing outside a traced run. The active
+tracer lives in a ``ContextVar``; thread pools that submit through
+``contextvars.copy_context().run`` record into the same trace.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_active: ContextVar[Optional["Tracer"]] = ContextVar("tracer", default=None)
+
+
+class Tracer:
+    """Collects complete ("X") trace events for one run.
+
+    With ``track_memory`` (and ``tracemalloc`` tracing), "stage" spans also record
+    the peak traced memory reached while they were open as ``mem_peak_mb``.
+    Stages that overlap in time share peaks, so concurrent steps are approximate.
+    """
+
+    def __init__(self, track_memory: bool = False) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self.track_memory = track_memory
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._token = None
+        self._open_peaks: List[Dict[str, int]] = []
+
+    def _fold_peak(self) -> None:
+        # tracemalloc has one global peak: fold it into every open stage, then reset.
+        _, peak = tracemalloc.get_traced_memory()
+        for slot in self._open_peaks:
+            slot["peak"] = max(slot["peak"], peak)
+        tracemalloc.reset_peak()
+
+    def open_stage(self) -> Optional[Dict[str, int]]:
+        if not (self.track_memory and tracemalloc.is_tracing()):
+            return None
+        with self._lock:
+            self._fold_peak()
+            slot = {"peak": tracemalloc.get_traced_memory()[0]}
+            self._open_peaks.append(slot)
+        return slot
+
+    def close_stage(self, slot: Dict[str, int]) -> float:
+        with self._lock:
+            self._fold_peak()
+            self._open_peaks.remove(slot)
+        return round(slot["peak"] / 2**20, 2)
+
+    def __enter__(self) -> "Tracer":
+        self._token = _active.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _active.reset(self._token)
+
+    def record(self, name: str, cat: str, start: float, end: float, args: Dict[str, Any]) -> None:
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            events = list(self.events)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return path
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Calls and total seconds per span name, in order of first appearance."""
+        rows: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            events = list(self.events)
+        for e in sorted(events, key=lambda e: e["ts"]):
+            row = rows.setdefault(e["name"], {"name": e["name"], "cat": e["cat"], "calls": 0, "total_s": 0.0})
+            row["calls"] += 1
+            row["total_s"] += e["dur"] / 1e6
+            if "mem_peak_mb" in e.get("args", {}):
+                row["mem_peak_mb"] = max(row.get("mem_peak_mb", 0.0), e["args"]["mem_peak_mb"])
+        return list(rows.values())
+
+
+def current_tracer() -> Optional[Tracer]:
+    """The :class:`Tracer` open in this context, if any."""
+    return _active.get()
+
+
+@contextmanager
+def span(name: str, cat: str = "stage", **args: Any) -> Iterator[Dict[str, Any]]:
+    """Time the enclosed block; the yielded dict lands in the event's ``args``."""
+    tracer = _active.get()
+    if tracer is None:
+        yield args
+        return
+    mem_slot = tracer.open_stage() if cat == "stage" else None
+    start = time.perf_counter()
+    try:
+        yield args
+    except BaseException as exc:
+        args["error"] = type(exc).__name__
+        raise
+    finally:
+        end = time.perf_counter()
+        if mem_slot is not None:
+            args["mem_peak_mb"] = tracer.close_stage(mem_slot)
+        tracer.record(name, cat, start, end, args)
+
+
+def traced(name: Optional[str] = None, cat: str = "stage") -> Callable:
+    """Decorator form of :func:`span` (defaults to the function's qualified name)."""
+
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*a, **kw):
+            with span(label, cat):
+                return func(*a, **kw)
+
+        return wrapper
+
+    return decorator
+
+
+def print_summary(rows: List[Dict[str, Any]], title: str = "Timing by stage") -> None:
+    """Per-stage table plus totals per category (network, decode, cache, ...)."""
+    if not rows:
+        return
+    from rich.console import Console
+    from rich.table import Table
+
+    with_mem = any("mem_peak_mb" in r for r in rows)
+    table = Table(title=title)
+    table.add_column("Span")
+    table.add_column("Category")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total s", justify="right")
+    if with_mem:
+        table.add_column("Peak MB", justify="right")
+    for r in rows:
+        cells = [r["name"], r["cat"], str(r["calls"]), f"{r['total_s']:.3f}"]
+        if with_mem:
+            cells.append(f"{r['mem_peak_mb']:.1f}" if "mem_peak_mb" in r else "")
+        table.add_row(*cells)
+    by_cat: Dict[str, float] = {}
+    for r in rows:
+        if r["cat"] != "stage":
+            by_cat[r["cat"]] = by_cat.get(r["cat"], 0.0) + r["total_s"]
+    if by_cat:
+        table.add_section()
+        for cat, total in sorted(by_cat.items(), key=lambda kv: -kv[1]):
+            table.add_row(f"(all {cat})", cat, "", f"{total:.3f}", *([""] if with_mem else []))
+    Console().print(table)
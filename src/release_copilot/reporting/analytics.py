@@ -0,0 +1,218 @@
+"""Columnar commit analytics: per-repo, per-author and per-day churn.
+
+Commit CSVs are loaded once into NumPy columns: int64 author timestamps (ms),
+int32 category codes for repo/branch, author and SHA, and a bool "has a Jira
+key" flag. Every aggregate is then a ``bincount`` or a sort over those
+arrays, so a million commits cost a CSV read plus a few vector passes.
+
+Repo rows count each branch separately (``project/repo@branch``); author and
+day figures count a change once even when it sits on several branches.
+Days and the weekday x hour histogram are UTC.
+
+Needs numpy (imported on first use).
+"""
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List
+
+from release_copilot.kit.jira_key import JIRA_KEY_RX
+from release_copilot.kit.tracing import span
+
+if TYPE_CHECKING:
+    import numpy as np
+    from openpyxl import Workbook
+
+_DAY_MS = 86_400_000
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def _np():
+    try:
+        import numpy
+    except Exception as e:
+        raise RuntimeError("numpy is required for commit analytics (pip install numpy)") from e
+    return numpy
+
+
+class _Codes(dict):
+    """Label -> dense int code, assigned in first-seen order."""
+
+    def code(self, label: str) -> int:
+        c = self.get(label)
+        if c is None:
+            c = self[label] = len(self)
+        return c
+
+    def labels(self) -> List[str]:
+        return list(self)
+
+
+@dataclass
+class CommitColumns:
+    ts: "np.ndarray"          # int64 author timestamp, ms since epoch (0 = unknown)
+    target: "np.ndarray"      # int32 code into target_labels (project/repo@branch)
+    author: "np.ndarray"      # int32 code into author_labels
+    sha: "np.ndarray"         # int32 code of project/repo:sha, for de-duplication across branches
+    keyed: "np.ndarray"       # bool, message or jira_keys carries a Jira key
+    target_labels: List[str]
+    author_labels: List[str]
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+def load_columns(csv_paths: Iterable[Path]) -> CommitColumns:
+    """Read commit CSVs (``audit_from_config`` layout) into columns."""
+    np = _np()
+    targets, authors, shas = _Codes(), _Codes(), _Codes()
+    ts: List[int] = []
+    tgt: List[int] = []
+    auth: List[int] = []
+    sha: List[int] = []
+    keyed: List[bool] = []
+    with span("analytics.load", "io"):
+        for path in dict.fromkeys(Path(p) for p in csv_paths):
+            if not path.exists():
+                continue
+            with path.open("r", encoding="utf-8", newline="") as f:
+                for r in csv.DictReader(f):
+                    repo = f"{r.get('project', '')}/{r.get('repo', '')}"
+                    tgt.append(targets.code(f"{repo}@{r.get('branch', '')}"))
+                    auth.append(authors.code(r.get("author") or r.get("authorEmail") or "(unknown)"))
+                    sha.append(shas.code(f"{repo}:{r.get('id') or r.get('displayId') or len(sha)}"))
+                    raw = r.get("authorTimestamp") or ""
+                    ts.append(int(raw) if raw.isdigit() else 0)
+                    keyed.append(bool(r.get("jira_keys")) or bool(JIRA_KEY_RX.search(r.get("message") or "")))
+    return CommitColumns(
+        ts=np.asarray(ts, dtype=np.int64),
+        target=np.asarray(tgt, dtype=np.int32),
+        author=np.asarray(auth, dtype=np.int32),
+        sha=np.asarray(sha, dtype=np.int32),
+        keyed=np.asarray(keyed, dtype=bool),
+        target_labels=targets.labels(),
+        author_labels=authors.labels(),
+    )
+
+
+def _rate(part, whole):
+    np = _np()
+    return np.round(np.divide(part, whole, out=np.zeros(len(whole)), where=whole > 0), 3)
+
+
+def _distinct(a):
+    """Sorted distinct values; a plain sort beats ``np.unique``'s hashing on dense int keys."""
+    np = _np()
+    a = np.sort(a)
+    return a[np.concatenate(([True], a[1:] != a[:-1]))] if len(a) else a
+
+
+def _day(ms: int) -> str:
+    return (datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(milliseconds=int(ms))).date().isoformat()
+
+
+def compute(cols: CommitColumns) -> Dict[str, List[Dict[str, Any]]]:
+    """Grouped aggregates as row lists: ``repos``, ``authors``, ``days`` and ``weekday_hour``."""
+    np = _np()
+    out: Dict[str, List[Dict[str, Any]]] = {"repos": [], "authors": [], "days": [], "weekday_hour": []}
+    if not len(cols):
+        return out
+    with span("analytics.compute", "cpu", commits=len(cols)):
+        unkeyed = ~cols.keyed
+        nt = len(cols.target_labels)
+        commits = np.bincount(cols.target, minlength=nt)
+        loose = np.bincount(cols.target, weights=unkeyed, minlength=nt).astype(np.int64)
+        pairs = _distinct(cols.target.astype(np.int64) * len(cols.author_labels) + cols.author)
+        distinct_authors = np.bincount(pairs // len(cols.author_labels), minlength=nt)
+        dated = cols.ts > 0
+        first = np.full(nt, np.iinfo(np.int64).max)
+        last = np.zeros(nt, dtype=np.int64)
+        np.minimum.at(first, cols.target[dated], cols.ts[dated])
+        np.maximum.at(last, cols.target[dated], cols.ts[dated])
+        rates = _rate(loose, commits)
+        for t in np.argsort(-commits, kind="stable"):
+            out["repos"].append({
+                "repo": cols.target_labels[t], "commits": int(commits[t]), "unkeyed": int(loose[t]),
+                "unkeyed_rate": float(rates[t]), "authors": int(distinct_authors[t]),
+                "first": _day(first[t]) if last[t] else "", "last": _day(last[t]) if last[t] else "",
+            })
+
+        # One row per change: the first occurrence of each SHA.
+        first_idx = np.full(int(cols.sha.max()) + 1, len(cols), dtype=np.int64)
+        np.minimum.at(first_idx, cols.sha, np.arange(len(cols)))
+        first_idx = first_idx[first_idx < len(cols)]
+        author, ts, loose_c = cols.author[first_idx], cols.ts[first_idx], unkeyed[first_idx]
+        na = len(cols.author_labels)
+        a_commits = np.bincount(author, minlength=na)
+        a_loose = np.bincount(author, weights=loose_c, minlength=na).astype(np.int64)
+        day = np.where(ts > 0, ts // _DAY_MS, -1)
+        active = np.bincount(_distinct(author[day >= 0].astype(np.int64) * (1 << 32) + day[day >= 0]) >> 32,
+                             minlength=na)
+        a_rates = _rate(a_loose, a_commits)
+        for a in np.argsort(-a_commits, kind="stable"):
+            if a_commits[a]:
+                out["authors"].append({
+                    "author": cols.author_labels[a], "commits": int(a_commits[a]), "unkeyed": int(a_loose[a]),
+                    "unkeyed_rate": float(a_rates[a]), "active_days": int(active[a]),
+                })
+
+        known = day >= 0
+        if known.any():
+            d0 = int(day[known].min())
+            per_day = np.bincount(day[known] - d0)
+            loose_day = np.bincount(day[known] - d0, weights=loose_c[known], minlength=len(per_day)).astype(np.int64)
+            authors_day = np.bincount(_distinct((day[known] - d0) * (1 << 32) + author[known]) >> 32,
+                                      minlength=len(per_day))
+            for i in np.flatnonzero(per_day):
+                out["days"].append({"day": _day((d0 + i) * _DAY_MS), "commits": int(per_day[i]),
+                                    "unkeyed": int(loose_day[i]), "authors": int(authors_day[i])})
+            # 1970-01-01 was a Thursday: weekday 0 = Monday.
+            weekday = (day[known] + 3) % 7
+            hour = (ts[known] % _DAY_MS) // 3_600_000
+            grid = np.bincount(weekday * 24 + hour, minlength=7 * 24).reshape(7, 24)
+            for w in range(7):
+                out["weekday_hour"].append({"weekday": WEEKDAYS[w], **{f"{h:02d}": int(grid[w, h]) for h in range(24)}})
+    return out
+
+
+def analyze(csv_paths: Iterable[Path]) -> Dict[str, List[Dict[str, Any]]]:
+    return compute(load_columns(csv_paths))
+
+
+def markdown_section(tables: Dict[str, List[Dict[str, Any]]], top: int = 10) -> List[str]:
+    """``## Commit analytics`` lines: repos, top authors, busiest days, commits per weekday."""
+    if not tables.get("repos"):
+        return []
+    lines = ["", "## Commit analytics", "",
+             "| Repo | Commits | Without key | Rate | Authors | First | Last |", "|---|---|---|---|---|---|---|"]
+    for r in tables["repos"]:
+        lines.append(f"| {r['repo']} | {r['commits']} | {r['unkeyed']} | {r['unkeyed_rate']:.0%} | {r['authors']} "
+                     f"| {r['first']} | {r['last']} |")
+    lines += ["", f"**Top authors** (of {len(tables['authors'])}; changes counted once across branches)", "",
+              "| Author | Commits | Without key | Rate | Active days |", "|---|---|---|---|---|"]
+    for a in tables["authors"][:top]:
+        lines.append(f"| {a['author']} | {a['commits']} | {a['unkeyed']} | {a['unkeyed_rate']:.0%} | {a['active_days']} |")
+    if tables["days"]:
+        busiest = sorted(tables["days"], key=lambda d: -d["commits"])[:5]
+        lines += ["", "**Busiest days:** " + ", ".join(f"{d['day']} ({d['commits']})" for d in busiest)]
+        per_weekday = {row["weekday"]: sum(v for k, v in row.items() if k != "weekday") for row in tables["weekday_hour"]}
+        lines += ["", "**Commits per weekday (UTC):** " + " · ".join(f"{w} {n}" for w, n in per_weekday.items())]
+    return lines
+
+
+def add_sheet(wb: "Workbook", tables: Dict[str, List[Dict[str, Any]]], title: str = "Analytics") -> None:
+    """One sheet with a block per table, separated by a blank row."""
+    ws = wb.create_sheet(title=title)
+    for name in ("repos", "authors", "days", "weekday_hour"):
+        rows = tables.get(name) or []
+        if not rows:
+            continue
+        if ws.max_row > 1:
+            ws.append([])
+        ws.append([name.replace("_", " x ").title()])
+        ws.append(list(rows[0]))
+        for r in rows:
+            ws.append(list(r.values()))
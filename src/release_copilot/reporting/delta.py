@@ -0,0 +1,184 @@
+"""Run-to-run delta: what changed in the Jira comparison since an earlier run.
+
+A run is reduced to a :class:`Snapshot` of dicts keyed by identity (issue key,
+``repo@branch:commit``, ``project/repo@branch``), so the diff
+is a handful of set operations on hashed keys and stays instant on large
+releases. Only changes are reported:
+
+``newly_missing``    issue missing now but not in the earlier run
+``newly_fixed``      issue missing earlier and no longer missing
+``new_orphan``       commit without a release key that was not orphaned before
+``resolved_orphan``  earlier orphan that is now matched or out of the window
+``status_change``    Jira status moved for an issue seen in both runs
+``count_change``     commit count per repo/branch moved
+"""
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from release_copilot.kit import checkpoint, history
+
+DELTA_FIELDS = ["change", "key", "commit", "project", "repo", "branch", "before", "after", "summary"]
+
+
+@dataclass
+class Snapshot:
+    """The comparison sets of one run, keyed for set arithmetic."""
+
+    run_id: str
+    missing: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    orphans: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    statuses: Dict[str, str] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(
+        cls,
+        run_id: str,
+        summary_rows: List[Mapping[str, Any]],
+        missing_rows: List[Mapping[str, Any]],
+        orphan_rows: List[Mapping[str, Any]],
+        matched_rows: List[Mapping[str, Any]],
+    ) -> "Snapshot":
+        snap = cls(run_id)
+        for r in summary_rows:
+            snap.counts[f"{r.get('project', '')}/{r.get('repo', '')}@{r.get('branch', '')}"] = int(r.get("count") or 0)
+        for m in matched_rows:
+            snap.statuses[m["key"]] = m.get("status", "")
+        for m in missing_rows:
+            snap.missing[m["key"]] = dict(m)
+            snap.statuses[m["key"]] = m.get("status", "")
+        for o in orphan_rows:
+            commit = o.get("id") or o.get("commit_id") or o.get("displayId", "")
+            snap.orphans[f"{o.get('repo', '')}@{o.get('branch', '')}:{commit}"] = dict(o, commit=commit)
+        return snap
+
+
+def load_snapshot(run_id: str, runs_dir: Optional[Path] = None, db: Optional[Path] = None) -> Snapshot:
+    """Snapshot of an earlier run from its checkpoint, or from the run history.
+
+    Raises ``FileNotFoundError`` when neither holds a Jira comparison for ``run_id``.
+    """
+    try:
+        cp = checkpoint.Checkpoint.resume(run_id, root=runs_dir)
+    except FileNotFoundError:
+        cp = None
+    if cp is not None and cp.done("compare"):
+        compared = cp.load("compare")
+        summary_rows = cp.load("collect")["summary_rows"] if cp.done("collect") else []
+        return Snapshot.from_rows(run_id, summary_rows, compared["missing_rows"], compared["orphan_commit_rows"],
+                                  compared.get("matched_rows", []))
+    rows = history.run_rows(run_id, db=db)
+    if rows is None:
+        raise FileNotFoundError(f"No Jira comparison recorded for run '{run_id}'")
+    return Snapshot.from_rows(run_id, rows["summary_rows"], rows["missing"], rows["orphans"], rows["matched"])
+
+
+def run_scope(params: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+    """What a diff needs to match between two checkpointed runs: kind, config (or targets), fix versions and JQL.
+
+    ``params`` are a checkpoint's params; ``None`` when they are not from a known run kind.
+    """
+    if "args" in params:  # audit_from_config
+        a = params["args"]
+        return {
+            "kind": "config",
+            "config": str(Path(a["config"]).resolve()) if a.get("config") else None,
+            "fix_versions": sorted(a.get("fix_version") or []),
+            "jql": a.get("jql"),
+        }
+    if "state" in params:  # app.run_release_audit
+        st = params["state"]
+        return {
+            "kind": "graph",
+            "targets": [st.get("project"), st.get("repo"), st.get("branch"), st.get("targets") or []],
+            "fix_versions": [st.get("fix_version")],
+            "jql": st.get("jql"),
+        }
+    return None
+
+
+def previous_run_id(params: Mapping[str, Any], current: Optional[str] = None,
+                    runs_dir: Optional[Path] = None) -> Optional[str]:
+    """Most recently created checkpointed run comparable to one with ``params`` (see :func:`run_scope`).
+
+    Only runs other than ``current`` that finished their Jira comparison count;
+    ``None`` when there is none.
+    """
+    root = Path(runs_dir or checkpoint.RUNS_DIR)
+    scope = run_scope(params)
+    if scope is None or not root.exists():
+        return None
+    candidates = []
+    for run_dir in root.iterdir():
+        if run_dir.name != current and (run_dir / "compare.json").exists():
+            cp = checkpoint.Checkpoint(run_dir.name, root=root)
+            if run_scope(cp.manifest.get("params") or {}) == scope:
+                candidates.append((cp.manifest.get("created", 0), run_dir.name))
+    return max(candidates)[1] if candidates else None
+
+
+def diff_snapshots(before: Snapshot, after: Snapshot) -> List[Dict[str, Any]]:
+    """Changed rows only (see the module docstring), in a stable order."""
+    rows: List[Dict[str, Any]] = []
+    for key in sorted(after.missing.keys() - before.missing.keys()):
+        m = after.missing[key]
+        rows.append({"change": "newly_missing", "key": key, "before": before.statuses.get(key, ""),
+                     "after": m.get("status", ""), "summary": m.get("summary", "")})
+    for key in sorted(before.missing.keys() - after.missing.keys()):
+        m = before.missing[key]
+        state = "matched" if key in after.statuses else "not in release"
+        rows.append({"change": "newly_fixed", "key": key, "before": m.get("status", ""),
+                     "after": after.statuses.get(key) or state, "summary": m.get("summary", "")})
+    for change, ids, snap in (("new_orphan", after.orphans.keys() - before.orphans.keys(), after),
+                              ("resolved_orphan", before.orphans.keys() - after.orphans.keys(), before)):
+        for ident in sorted(ids):
+            o = snap.orphans[ident]
+            rows.append({"change": change, "commit": o["commit"], "project": o.get("project", ""),
+                         "repo": o.get("repo", ""), "branch": o.get("branch", ""),
+                         "summary": (o.get("message", "") or "").split("\n", 1)[0]})
+    for key in sorted(before.statuses.keys() & after.statuses.keys()):
+        if before.statuses[key] != after.statuses[key]:
+            rows.append({"change": "status_change", "key": key, "before": before.statuses[key],
+                         "after": after.statuses[key],
+                         "summary": (after.missing.get(key) or before.missing.get(key) or {}).get("summary", "")})
+    for target in sorted(before.counts.keys() | after.counts.keys()):
+        old, new = before.counts.get(target), after.counts.get(target)
+        if old != new:
+            project, _, rest = target.partition("/")
+            repo, _, branch = rest.partition("@")
+            rows.append({"change": "count_change", "project": project, "repo": repo, "branch": branch,
+                         "before": "" if old is None else old, "after": "" if new is None else new})
+    return rows
+
+
+def write_delta(rows: List[Dict[str, Any]], output_dir: Path, before: str, after: str) -> Dict[str, Path]:
+    """Write ``delta.csv`` and ``delta.md``; returns both paths."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = output_dir / "delta.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=DELTA_FIELDS)
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({k: r.get(k, "") for k in DELTA_FIELDS})
+
+    lines = [f"# Changes since run {before}", "", f"Current run: {after}", ""]
+    if not rows:
+        lines.append("No changes.")
+    counts: Dict[str, int] = {}
+    for r in rows:
+        counts[r["change"]] = counts.get(r["change"], 0) + 1
+    if counts:
+        lines.append(" · ".join(f"**{n}** {change.replace('_', ' ')}" for change, n in counts.items()))
+        lines += ["", "| Change | Key / commit | Repo | Before | After | Summary |", "|---|---|---|---|---|---|"]
+        for r in rows:
+            where = f"{r.get('repo', '')}@{r.get('branch', '')}" if r.get("repo") else ""
+            summary = str(r.get("summary", "")).replace("|", "\\|")
+            lines.append(f"| {r['change']} | {r.get('key') or str(r.get('commit', ''))[:10]} | {where} "
+                         f"| {r.get('before', '')} | {r.get('after', '')} | {summary} |")
+    md_path = output_dir / "delta.md"
+    md_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return {"delta_csv": csv_path, "delta_markdown": md_path}
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Protocol
+
+from release_copilot.config.settings import get_settings  # loads .env once per process
+
+DeltaFn = Optional[Callable[[str], None]]
+
+
+@dataclass
+class LLMResult:
+    """Completion text plus the measured usage of the call that produced it."""
+
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_s: float
+    retries: int = 0
+
+
+class LLMProvider(Protocol):
+    name: str
+
+    def complete(self, model: str, system: str, user: str, max_tokens: int, on_delta: DeltaFn = None) -> LLMResult:
+        """Run one chat completion; with ``on_delta`` the reply is streamed chunk by chunk."""
+        ...
+
+
+def _count(text: str, model: str) -> int:
+    # Local import: llm_summary imports this module.
+    from release_copilot.reporting.llm_summary import count_tokens
+
+    return count_tokens(text, model)
+
+
+class OpenAIProvider:
+    """OpenAI chat completions with retries and usage taken from the API response."""
+
+    name = "openai"
+
+    def __init__(self, max_retries: int = 2) -> None:
+        self.max_retries = max_retries
+
+    def complete(self, model: str, system: str, user: str, max_tokens: int, on_delta: DeltaFn = None) -> LLMResult:
+        # Optional dependency – keep failure graceful.
+        try:
+            import openai
+        except Exception as e:
+            raise RuntimeError("openai package is not installed; cannot write LLM summary.") from e
+        from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+        cfg = get_settings()  # API key from .env via pydantic-settings
+        # Retries happen here so they can be counted; the client must not retry on its own.
+        client = openai.OpenAI(api_key=cfg.openai_api_key, max_retries=0)
+        kwargs = dict(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            temperature=0.2,
+            max_tokens=max_tokens,
+        )
+        if on_delta is not None:
+            kwargs.update(stream=True, stream_options={"include_usage": True})
+
+        started = time.perf_counter()
+        # Only the request is retried: a stream that fails midway has already emitted text.
+        retrying = Retrying(
+            stop=stop_after_attempt(self.max_retries + 1),
+            wait=wait_exponential(multiplier=1, max=10),
+            retry=retry_if_exception_type(
+                (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+            ),
+            reraise=True,
+        )
+        resp = retrying(client.chat.completions.create, **kwargs)
+        retries = retrying.statistics.get("attempt_number", 1) - 1
+
+        usage = None
+        if on_delta is None:
+            text = resp.choices[0].message.content or ""
+            usage = resp.usage
+        else:
+            parts = []
+            for chunk in resp:
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content or ""
+                if piece:
+                    parts.append(piece)
+                    on_delta(piece)
+            text = "".join(parts)
+        latency = time.perf_counter() - started
+
+        if usage is not None:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        else:  # pragma: no cover - older servers without stream usage
+            prompt_tokens, completion_tokens = _count(system, model) + _count(user, model), _count(text, model)
+        return LLMResult(text, prompt_tokens, completion_tokens, latency, retries)
+
+
+_LINE_RX = re.compile(r'"line":"((?:[^"\\]|\\.)*)"')
+
+
+class StubProvider:
+    """
+    Deterministic offline provider for tests and benchmarks.
+
+    Echoes a fixed-format narrative built from the prompt's highlight lines, so the
+    same prompt always yields the same text and token counts. ``delay_s`` is slept
+    per streamed chunk to mimic a remote model.
+    """
+
+    name = "stub"
+
+    def __init__(self, delay_s: float = 0.0) -> None:
+        self.delay_s = delay_s
+
+    def complete(self, model: str, system: str, user: str, max_tokens: int, on_delta: DeltaFn = None) -> LLMResult:
+        started = time.perf_counter()
+        digest = hashlib.sha256(f"{system}\n{user}".encode("utf-8")).hexdigest()[:12]
+        prompt_tokens = _count(system, model) + _count(user, model)
+        lines = [f"## Release narrative (stub {digest})", "", f"Prompt: {prompt_tokens} tokens.", ""]
+        lines += [f"- {m.group(1)}" for m in _LINE_RX.finditer(user)][:10]
+        text = "\n".join(lines)
+        # Respect max_tokens like a real model would (cut at a word boundary).
+        words = text.split(" ")
+        while len(words) > 1 and _count(" ".join(words), model) > max_tokens:
+            words = words[: max(1, len(words) * 3 // 4)]
+        text = " ".join(words)
+        if on_delta is not None:
+            for i, word in enumerate(words):
+                if self.delay_s:
+                    time.sleep(self.delay_s)
+                on_delta(word if i == 0 else " " + word)
+        return LLMResult(text, prompt_tokens, _count(text, model), time.perf_counter() - started)
+
+
+PROVIDERS: Dict[str, Callable[[], LLMProvider]] = {
+    "openai": OpenAIProvider,
+    "stub": StubProvider,
+}
+
+
+def get_provider(name: Optional[str] = None) -> LLMProvider:
+    """Provider by name; defaults to ``LLM_PROVIDER`` from ``.env`` (``openai``)."""
+    name = (name or get_settings().llm_provider or "openai").lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{name}'. Available: {', '.join(sorted(PROVIDERS))}")
+    return PROVIDERS[name]()
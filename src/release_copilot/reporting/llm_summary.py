@@ -3,20 +3,36 @@ from __future__ import annotations
 import csv
 import json
 import hashlib
+import heapq
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Mapping, Tuple, Optional, Union
 from datetime import datetime
 
 from release_copilot.kit.caching import load_cache_or_call  # existing helper
-from release_copilot.config.settings import Settings  # loads .env (no OS env reads)
+from release_copilot.kit.cancellation import check_cancelled, current_token
+from release_copilot.kit.cost_meter import context_window, current_session, price_per_1k
+from release_copilot.kit.near_dupes import NearDuplicateIndex
+from release_copilot.kit.tracing import span
+from release_copilot.reporting.llm_providers import LLMProvider, LLMResult, get_provider
+
+logger = logging.getLogger(__name__)
 
 # ------------------ CSV utilities ------------------
 
 def _read_csv_rows(path: Path) -> List[Dict[str, str]]:
+    return list(_iter_csv_rows(path))
+
+def _iter_csv_rows(path: Path) -> Iterator[Dict[str, str]]:
     if not path or not path.exists():
-        return []
+        return
     with path.open("r", encoding="utf-8", newline="") as f:
-        return list(csv.DictReader(f))
+        yield from csv.DictReader(f)
 
 def _first_line(msg: str) -> str:
     return (msg or "").splitlines()[0].strip()
@@ -41,11 +57,30 @@ def _truncate(s: str, limit: int = 160) -> str:
     s = s.strip()
     return s if len(s) <= limit else s[:limit - 1] + "…"
 
-def select_highlights(csv_path: Path, top_n: int = 15) -> List[Dict[str, str]]:
-    rows = _read_csv_rows(csv_path)
-    # De-dup by approximate jiraish key if present in message, else by displayId
-    seen_keys: set[str] = set()
-    scored: List[Tuple[int, Dict[str, str]]] = []
+CommitSource = Union[Path, Iterable[Mapping[str, Any]]]
+
+def select_highlights(source: CommitSource, top_n: int = 15) -> List[Dict[str, str]]:
+    """
+    Top ``top_n`` commits by score, one representative per near-duplicate cluster.
+
+    ``source`` is a commit CSV path or any iterable of commit rows; it is consumed
+    once as a stream while a bounded min-heap keeps the current top clusters, so
+    selection is O(n log k). Commits sharing a crude ``WORD-123`` hint collapse
+    into the highest-scoring member, as do key-less commits whose first lines are
+    near duplicates (merge PRs, cherry-picks, repeated "fix typo"); commits with
+    different hints never merge. ``count`` records how many commits it stands for.
+    """
+    if top_n <= 0:
+        return []
+    rows = _iter_csv_rows(source) if isinstance(source, Path) else source
+    index = NearDuplicateIndex()
+    # Cluster identity is the key hint when there is one, else the near-dup cluster.
+    cluster_ids: Dict[Tuple[str, Any], int] = {}
+    sizes: List[int] = []
+    # Heap entries are [score, -cluster_id, cluster_id, item]; -cluster_id keeps
+    # first-seen clusters on ties. Superseded entries are blanked (item=None).
+    heap: List[list] = []
+    live: Dict[int, list] = {}
     for r in rows:
         msg = _first_line(r.get("message", ""))
         key_hint = None
@@ -54,26 +89,46 @@ def select_highlights(csv_path: Path, top_n: int = 15) -> List[Dict[str, str]]:
             if "-" in part and part.split("-")[0].isalpha():
                 key_hint = part.strip(",.;:()[]{}")
                 break
-        dedup_key = key_hint or r.get("displayId") or r.get("id", "")[:10]
-        if dedup_key in seen_keys:
+        ident = ("key", key_hint) if key_hint else ("line", index.add(msg))
+        cid = cluster_ids.get(ident)
+        if cid is None:
+            cid = cluster_ids[ident] = len(sizes)
+            sizes.append(0)
+        sizes[cid] += 1
+        score = _score_commit(msg)
+        current = live.get(cid)
+        if current is not None and current[0] >= score:
             continue
-        seen_keys.add(dedup_key)
-        scored.append((_score_commit(msg), {
+        if current is None and len(live) >= top_n and (score, -cid) <= (heap[0][0], heap[0][1]):
+            continue
+        if current is not None:
+            current[3] = None
+        entry = [score, -cid, cid, {
             "repo": r.get("repo", ""),
-            "display": r.get("displayId") or r.get("id", "")[:10],
+            "display": r.get("displayId") or (r.get("id") or "")[:10],
             "author": r.get("author") or r.get("authorEmail", ""),
             "ts": r.get("authorTimestamp", ""),
             "key": key_hint or "",
             "line": _truncate(msg),
-        }))
-    scored.sort(key=lambda t: t[0], reverse=True)
-    return [s[1] for s in scored[:top_n]]
+        }]
+        live[cid] = entry
+        heapq.heappush(heap, entry)
+        while len(live) > top_n or (heap and heap[0][3] is None):
+            evicted = heapq.heappop(heap)
+            if evicted[3] is not None:
+                del live[evicted[2]]
+    out = []
+    for score, neg_cid, cid, item in sorted((e for e in heap if e[3] is not None), reverse=True):
+        if sizes[cid] > 1:
+            item["count"] = sizes[cid]
+        out.append(item)
+    return out
 
 # ------------------ Context, fingerprint, tokens ------------------
 
 def build_context(
     summary_rows: List[Dict[str, Any]],
-    repo_csv_map: Dict[str, Path],
+    repo_csv_map: Dict[str, CommitSource],
     window: Tuple[datetime, datetime],
     branches_label: str,
     fix_version: Optional[str],
@@ -83,10 +138,20 @@ def build_context(
 ) -> Dict[str, Any]:
     start_utc, end_utc = window
     repos_ctx = []
+    # Each commit source is streamed once; rows pointing at the same file share the result.
+    selected: Dict[Any, List[Dict[str, str]]] = {}
     for sr in summary_rows:
         repo = sr.get("repo", "")
-        csv_path = repo_csv_map.get(repo) or Path(sr.get("csv_path", ""))
-        highlights = select_highlights(csv_path, top_n=top_n_per_repo)
+        # Prefer the row's own CSV (or in-memory "commits"): repo_csv_map is keyed by repo
+        # only, so with several branches it holds just the last branch's source.
+        if sr.get("csv_path"):
+            source = Path(sr["csv_path"])
+        else:
+            source = sr["commits"] if sr.get("commits") is not None else repo_csv_map.get(repo)
+        source_id = source.resolve() if isinstance(source, Path) else id(source)
+        if source_id not in selected:
+            selected[source_id] = select_highlights(source, top_n=top_n_per_repo) if source is not None else []
+        highlights = [dict(h) for h in selected[source_id]]
         repos_ctx.append({
             "project": sr.get("project", ""),
             "repo": repo,
@@ -104,11 +169,20 @@ def build_context(
         "repos": repos_ctx,
     }
     if missing_preview:
-        ctx["missing"] = missing_preview[:20]
+        ctx["missing"] = _top_gaps(missing_preview, _score_missing)
     if orphan_preview:
-        ctx["orphans"] = orphan_preview[:20]
+        ctx["orphans"] = _top_gaps(orphan_preview, lambda o: _score_commit(o.get("line", "")))
     return ctx
 
+def _top_gaps(items: List[Dict[str, Any]], score: Callable[[Dict[str, Any]], int],
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """The ``limit`` best-scoring ``items`` in their original order (earlier items win ties)."""
+    limit = MAX_GAP_CANDIDATES if limit is None else limit
+    if len(items) <= limit:
+        return list(items)
+    best = heapq.nlargest(limit, range(len(items)), key=lambda i: (score(items[i]), -i))
+    return [items[i] for i in sorted(best)]
+
 def context_fingerprint(ctx: Dict[str, Any]) -> str:
     """Stable fingerprint for caching (order keys to make deterministic)."""
     payload = json.dumps(ctx, sort_keys=True, ensure_ascii=False)
@@ -118,6 +192,193 @@ def estimate_tokens_from_chars(chars: int) -> int:
     # crude but safe: ~4 chars/token
     return max(1, chars // 4)
 
+@lru_cache(maxsize=8)
+def _encoding_for(model: str):
+    # Optional dependency – fall back to the char estimate when unavailable.
+    try:
+        import tiktoken
+    except Exception:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception:
+            return None
+    except Exception:
+        return None
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Count tokens with the model's local tokenizer (tiktoken), else estimate."""
+    if not text:
+        return 0
+    enc = _encoding_for(model)
+    if enc is None:
+        return estimate_tokens_from_chars(len(text))
+    return len(enc.encode(text, disallowed_special=()))
+
+# ------------------ Budget-driven packing ------------------
+
+# Per-request chat framing (role markers, separators) not visible in the prompt text.
+_CHAT_OVERHEAD_TOKENS = 7
+_MISSING_SCORE = 6
+# Missing issues / orphan commits kept per list before packing. A prompt under the
+# default --llm-context-tokens holds far fewer, so a large release tokenizes a bounded set.
+MAX_GAP_CANDIDATES = 300
+# No candidate serializes to fewer tokens than this; below it the packer stops looking.
+_MIN_ITEM_TOKENS = 8
+# Prompt tokens per map call (and for the reduce call's gaps) in map-reduce mode.
+MAP_CONTEXT_TOKENS = 2_000
+
+def _dump_compact(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+def _score_missing(issue: Dict[str, Any]) -> int:
+    """Missing issues are the audit's main finding; open ones rank highest."""
+    status = str(issue.get("status") or "").lower()
+    return _MISSING_SCORE + (0 if status in {"done", "closed", "resolved"} else 1)
+
+def _candidates(ctx: Dict[str, Any]) -> List[Tuple[Tuple[int, int], str, int, Dict[str, Any]]]:
+    """Flatten highlights/missing/orphans/runbook into ``(rank, section, repo_idx, item)``.
+
+    Rank is ``(score, -position)`` so equal scores interleave across repos
+    instead of letting the first repo's list crowd out the rest.
+    """
+    out = []
+    for idx, repo in enumerate(ctx.get("repos", [])):
+        for pos, h in enumerate(repo.get("highlights", [])):
+            out.append(((_score_commit(h.get("line", "")), -pos), "highlights", idx, h))
+    for pos, m in enumerate(ctx.get("missing", []) or []):
+        out.append(((_score_missing(m), -pos), "missing", -1, m))
+    for pos, o in enumerate(ctx.get("orphans", []) or []):
+        out.append(((_score_commit(o.get("line", "")) + 1, -pos), "orphans", -1, o))
+    for pos, snippet in enumerate(ctx.get("runbook", []) or []):
+        out.append(((_MISSING_SCORE - 1, -pos), "runbook", -1, snippet))
+    out.sort(key=lambda c: c[0], reverse=True)
+    return out
+
+def _prompt_tokens(ctx: Dict[str, Any], model: str, make_prompt: Optional[Callable] = None) -> int:
+    system, user = (make_prompt or _make_prompt)(ctx)
+    return count_tokens(system, model) + count_tokens(user, model) + _CHAT_OVERHEAD_TOKENS
+
+def _cents(tokens: int, model: str) -> float:
+    return tokens / 1000.0 * price_per_1k(model) * 100
+
+def budget_to_prompt_tokens(budget_cents: int, max_tokens: int, model: str = "gpt-4o-mini") -> int:
+    """
+    Prompt tokens affordable under ``budget_cents`` at ``model``'s price after reserving the completion.
+
+    Never more than ``model``'s context window leaves next to ``max_tokens``: at
+    cheap models' prices even a small budget would otherwise allow prompts the API rejects.
+    """
+    affordable = int(budget_cents / 100 / price_per_1k(model) * 1000)
+    return min(affordable, context_window(model)) - max_tokens
+
+class _BudgetGuard:
+    """
+    Hard spend cap across the calls of one summary.
+
+    Each live call reserves its worst case (exact prompt tokens + ``max_tokens``)
+    before it starts and is settled with the usage the provider measured, so later
+    calls are checked against real spend rather than estimates.
+    """
+
+    def __init__(self, budget_cents: float, model: str) -> None:
+        self.budget_cents = budget_cents
+        self.model = model
+        self.spent_cents = 0.0
+        self._reserved = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, prompt_tokens: int, max_tokens: int) -> float:
+        est = _cents(prompt_tokens + max_tokens, self.model)
+        with self._lock:
+            if self.spent_cents + self._reserved + est > self.budget_cents:
+                raise RuntimeError(
+                    f"Estimated LLM cost ~{est:.2f}¢ (spent {self.spent_cents:.2f}¢) exceeds budget "
+                    f"({self.budget_cents}¢). Re-run with --llm-budget-cents higher."
+                )
+            self._reserved += est
+        return est
+
+    def settle(self, reserved: float, result: Optional[LLMResult]) -> None:
+        with self._lock:
+            self._reserved -= reserved
+            if result is not None:
+                self.spent_cents += _cents(result.prompt_tokens + result.completion_tokens, self.model)
+
+def pack_context(
+    ctx: Dict[str, Any],
+    budget_tokens: int,
+    model: str = "gpt-4o-mini",
+    make_prompt: Optional[Callable[[Dict[str, Any]], Tuple[str, str]]] = None,
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Greedily fill ``budget_tokens`` of prompt with the highest-scoring candidates.
+
+    Highlights, missing issues and orphans from ``ctx`` compete in one ranking
+    across all repos; each is costed with the real tokenizer and added while
+    it still fits. ``make_prompt`` renders the prompt being budgeted (defaults
+    to the single-shot narrative prompt). Returns the packed context and its
+    exact prompt token count.
+    """
+    cands = _candidates(ctx)
+    packed: Dict[str, Any] = {k: v for k, v in ctx.items() if k not in ("repos", "missing", "orphans", "runbook")}
+    packed["repos"] = [{**r, "highlights": []} for r in ctx.get("repos", [])]
+    skeleton = dict(packed)
+    # Keep the Jira gaps instructions in the base cost if any gap can be included.
+    if any(c[1] in ("missing", "orphans") for c in cands):
+        skeleton["missing"] = [{}]
+    if any(c[1] == "runbook" for c in cands):
+        skeleton["runbook"] = [""]
+    used = _prompt_tokens(skeleton, model, make_prompt)
+    if used > budget_tokens:
+        raise RuntimeError(
+            f"LLM prompt needs {used} tokens before any highlights; budget allows {budget_tokens}. "
+            "Re-run with --llm-budget-cents higher."
+        )
+
+    chosen = []
+    for cand in cands:
+        if budget_tokens - used < _MIN_ITEM_TOKENS:
+            break
+        cost = count_tokens(_dump_compact(cand[3]), model) + 1  # trailing comma
+        if used + cost > budget_tokens:
+            continue
+        used += cost
+        chosen.append(cand)
+
+    def _assemble(items) -> Dict[str, Any]:
+        out = dict(packed)
+        out["repos"] = [{**r, "highlights": []} for r in packed["repos"]]
+        missing, orphans, runbook = [], [], []
+        for _, section, idx, item in items:
+            if section == "highlights":
+                out["repos"][idx]["highlights"].append(item)
+            elif section == "missing":
+                missing.append(item)
+            elif section == "runbook":
+                runbook.append(item)
+            else:
+                orphans.append(item)
+        if missing:
+            out["missing"] = missing
+        if orphans:
+            out["orphans"] = orphans
+        if runbook:
+            out["runbook"] = runbook
+        return out
+
+    # Per-item costs are near-additive; verify the real prompt and trim the tail if needed.
+    result = _assemble(chosen)
+    total = _prompt_tokens(result, model, make_prompt)
+    while total > budget_tokens and chosen:
+        chosen.pop()
+        result = _assemble(chosen)
+        total = _prompt_tokens(result, model, make_prompt)
+    return result, total
+
 # ------------------ LLM call ------------------
 
 def _make_prompt(ctx: Dict[str, Any]) -> Tuple[str, str]:
@@ -128,7 +389,7 @@ def _make_prompt(ctx: Dict[str, Any]) -> Tuple[str, str]:
     )
     user = (
         "CONTEXT (JSON):\n"
-        f"{json.dumps(ctx, indent=2, ensure_ascii=False)}\n\n"
+        f"{_dump_compact(ctx)}\n\n"
         "Write a release narrative with the following sections:\n\n"
         "1) Executive Summary (5–8 bullets)\n"
         "   - Call out which repos saw the most change and why (based on commit text).\n"
@@ -142,6 +403,7 @@ def _make_prompt(ctx: Dict[str, Any]) -> Tuple[str, str]:
         "   - List stories/terms appearing across multiple repos, if any.\n\n"
         "Constraints:\n"
         "- Use only what’s in CONTEXT.\n"
+        "- A highlight's \"count\" is how many similar commits it stands for.\n"
         "- Don’t invent Jira details you don’t see.\n"
         "- Keep total length under ~700 words."
     )
@@ -150,43 +412,230 @@ def _make_prompt(ctx: Dict[str, Any]) -> Tuple[str, str]:
             "5) Jira Gaps\n"
             "   - Note issues missing in repos and commits without valid Jira keys.\n"
         )
+    if ctx.get("runbook"):
+        user += (
+            "\n\"runbook\" holds excerpts from team runbooks and earlier release reports; "
+            "use them to sharpen risks and test focus, citing the source file in brackets.\n"
+        )
     return system, user
 
-def _openai_chat(model: str, system: str, user: str, max_tokens: int) -> str:
-    # Optional dependency – keep failure graceful.
-    try:
-        from openai import OpenAI
-    except Exception as e:
-        raise RuntimeError("openai package is not installed; cannot write LLM summary.") from e
-    cfg = Settings()  # loads API key from .env via pydantic-settings
-    client = OpenAI(api_key=cfg.openai_api_key)
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-        temperature=0.2,
-        max_tokens=max_tokens,
+_SECTION_SYSTEM = (
+    "You are a release auditor summarizing one repository's changes. Be concise and factual; "
+    "use only the supplied context."
+)
+
+def _make_repo_prompt(ctx: Dict[str, Any]) -> Tuple[str, str]:
+    """Map step: one repo's highlights -> a short Markdown section."""
+    user = (
+        "CONTEXT (JSON):\n"
+        f"{_dump_compact(ctx)}\n\n"
+        "Write a Markdown section for this repo (max ~150 words):\n"
+        "- Heading: \"### <repo> (<branch>)\".\n"
+        "- One sentence on the main themes (features, fixes, refactors).\n"
+        "- 3–5 notable items: \"**<short id>** — <one-line summary>\" (\"count\" = similar commits it stands for).\n"
+        "- One line of risk/test focus if the commit text suggests any.\n"
+        "Don’t invent Jira details you don’t see."
+    )
+    return _SECTION_SYSTEM, user
+
+def _make_reduce_prompt(ctx: Dict[str, Any]) -> Tuple[str, str]:
+    """Reduce step: combine per-repo sections (plus Jira gaps) into the narrative."""
+    system, _ = _make_prompt({})
+    sections = "\n\n".join(ctx.get("sections", []))
+    meta = {k: v for k, v in ctx.items() if k != "sections"}
+    meta["repos"] = [{k: r.get(k) for k in ("project", "repo", "branch", "count")} for r in ctx.get("repos", [])]
+    user = (
+        "CONTEXT (JSON):\n"
+        f"{_dump_compact(meta)}\n\n"
+        "PER-REPO SECTIONS (Markdown):\n"
+        f"{sections}\n\n"
+        "Combine these into a release narrative with the following sections:\n\n"
+        "1) Executive Summary (5–8 bullets) — which repos saw the most change and the major themes.\n"
+        "2) Repo Highlights — keep each repo section, trimmed to its most notable items.\n"
+        "3) Potential Risks & Test Focus — consolidated across repos.\n"
+        "4) Notable Cross‑Repo Links (if detected).\n"
+    )
+    if ctx.get("missing") or ctx.get("orphans"):
+        user += "5) Jira Gaps — issues missing in repos and commits without valid Jira keys.\n"
+    user += (
+        "\nConstraints:\n"
+        "- Use only what’s in CONTEXT and the sections.\n"
+        "- Keep total length under ~700 words."
     )
-    return resp.choices[0].message.content or ""
+    return system, user
 
 # ------------------ Cache + writer ------------------
 
-def _cache_key(model: str, fp: str) -> str:
-    return f"llm:summary|model={model}|fp={fp}"
+def _cache_key(model: str, fp: str, kind: str = "summary", provider: str = "openai") -> str:
+    return f"llm:{kind}|provider={provider}|model={model}|fp={fp}"
+
+def _cached_chat(
+    key: str,
+    model: str,
+    system: str,
+    user: str,
+    max_tokens: int,
+    on_delta: Optional[Callable[[str], None]] = None,
+    provider: Optional[LLMProvider] = None,
+    guard: Optional[_BudgetGuard] = None,
+    step: str = "llm_summary",
+) -> Tuple[str, str]:
+    """Return ``(text, source)`` for a prompt, caching the completion for 30 days.
+
+    Live calls go through ``provider``, are checked against ``guard`` and have their
+    measured usage recorded in the active :class:`CostSession` under ``step``.
+    With ``on_delta`` a live completion is streamed as it arrives and a cached one is
+    replayed in one piece; either way only the final text is cached. Under a
+    cancellation token the completion is always streamed, so a cancel or deadline
+    stops it between chunks.
+    """
+    provider = provider or get_provider()
+
+    def _checked_delta(piece: str) -> None:
+        check_cancelled()
+        if on_delta is not None:
+            on_delta(piece)
+
+    def _fetch() -> Dict[str, Any]:
+        check_cancelled()
+        delta = _checked_delta if current_token() is not None else on_delta
+        reserved = guard.reserve(count_tokens(system, model) + count_tokens(user, model), max_tokens) if guard else 0.0
+        result = None
+        try:
+            with span("llm.complete", "llm", step=step, model=model, provider=getattr(provider, "name", "")) as sp:
+                result = provider.complete(model=model, system=system, user=user, max_tokens=max_tokens, on_delta=delta)
+                sp.update(prompt_tokens=result.prompt_tokens, completion_tokens=result.completion_tokens,
+                          retries=result.retries)
+        finally:
+            if guard:
+                guard.settle(reserved, result)
+        session = current_session()
+        if session is not None:
+            session.record(step, result.prompt_tokens, result.completion_tokens, model,
+                           latency_s=result.latency_s, retries=result.retries)
+        return {"text": result.text}
+
+    data, source = load_cache_or_call(
+        key=key,
+        ttl_hours=720,  # 30 days
+        fetch_fn=_fetch,
+        force_refresh=False,
+    )
+    text = (data.get("text", "") or "").strip()
+    if on_delta is not None and source == "cache" and text:
+        on_delta(text)
+    return text, source
 
 def write_markdown(text: str, output_dir: Path, base_name: str = "release_audit_llm") -> Path:
+    """Write ``<base_name>.md`` atomically, via the ``.part`` file a stream may have filled."""
     out = output_dir / f"{base_name}.md"
-    out.write_text(text, encoding="utf-8")
+    tmp = out.with_name(out.name + ".part")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, out)
     return out
 
+class MarkdownStream:
+    """Append streamed text to ``<base_name>.md.part`` as it arrives, then forward it to ``on_delta``.
+
+    The file is opened on the first chunk, so a run that fails before the LLM answers
+    leaves nothing behind; :func:`write_markdown` renames it into place on success and
+    :meth:`discard` removes it on failure. The previous narrative survives either way.
+    """
+
+    def __init__(self, output_dir: Path, base_name: str, on_delta: Optional[Callable[[str], None]] = None) -> None:
+        self.path = output_dir / f"{base_name}.md.part"
+        self._fh = None
+        self._on_delta = on_delta
+
+    def __call__(self, piece: str) -> None:
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = self.path.open("w", encoding="utf-8")
+        self._fh.write(piece)
+        self._fh.flush()
+        if self._on_delta is not None:
+            self._on_delta(piece)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def discard(self) -> None:
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+def _map_reduce_summary(
+    ctx: Dict[str, Any],
+    model: str,
+    max_tokens: int,
+    prompt_budget: int,
+    map_max_tokens: int,
+    max_workers: int,
+    on_delta: Optional[Callable[[str], None]] = None,
+    provider: Optional[LLMProvider] = None,
+    guard: Optional[_BudgetGuard] = None,
+) -> str:
+    """
+    Summarize each repo concurrently, then combine the sections in one reduce call.
+
+    Every repo gets the same fixed prompt-token share (``MAP_CONTEXT_TOKENS``) however
+    many repos there are, so a repo's packed context (and its cache key) only changes
+    when that repo's own highlights or count change. Only when ``prompt_budget`` cannot
+    cover that share for every repo plus the reduce call is it split evenly instead;
+    the shares (and cache keys) then move with the repo count.
+    """
+    repos = ctx.get("repos", [])
+    share = min(MAP_CONTEXT_TOKENS, prompt_budget // (len(repos) + 1))
+    meta = {"fix_version": ctx.get("fix_version", ""), "branches": ctx.get("branches", "")}
+
+    def _summarize_repo(repo_ctx: Dict[str, Any]) -> str:
+        packed, _ = pack_context({**meta, "repos": [repo_ctx]}, share, model=model, make_prompt=_make_repo_prompt)
+        system, user = _make_repo_prompt(packed)
+        key = _cache_key(model, context_fingerprint(packed), kind="repo", provider=provider.name)
+        text, _ = _cached_chat(key, model, system, user, map_max_tokens, provider=provider, guard=guard,
+                               step=f"llm_summary:{repo_ctx.get('repo', '')}")
+        return text
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        # copy_context() so workers record into the caller's CostSession.
+        futures = [pool.submit(copy_context().run, _summarize_repo, r) for r in repos]
+        sections = [t for t in (f.result() for f in futures) if t]
+
+    reduce_ctx = {k: v for k, v in ctx.items() if k != "repos"}
+    reduce_ctx["repos"] = [{**r, "highlights": []} for r in repos]
+    reduce_ctx["sections"] = sections
+    # Sections are already written; the reduce share plus their worst-case size bounds the gaps.
+    packed, _ = pack_context(
+        reduce_ctx, share + len(repos) * map_max_tokens, model=model, make_prompt=_make_reduce_prompt
+    )
+    system, user = _make_reduce_prompt(packed)
+    key = _cache_key(model, context_fingerprint(packed), kind="reduce", provider=provider.name)
+    text, _ = _cached_chat(key, model, system, user, max_tokens, on_delta=on_delta, provider=provider,
+                           guard=guard, step="llm_summary:reduce")
+    return text
+
+
+def _knowledge_for(ctx: Dict[str, Any]) -> List[str]:
+    """Runbook snippets for the release's themes; never fails the narrative."""
+    from release_copilot.indexes.query import query_knowledge
+
+    lines = [h.get("line", "") for r in ctx.get("repos", []) for h in r.get("highlights", [])[:5]]
+    lines += [m.get("summary", "") for m in (ctx.get("missing") or [])[:20]]
+    try:
+        return query_knowledge(" ".join([ctx.get("fix_version", "")] + lines))
+    except Exception as e:
+        logger.warning("Knowledge context skipped: %s", e)
+        return []
+
+
 def build_llm_summary(
     summary_rows: List[Dict[str, Any]],
     output_dir: Path,
     window: Tuple[datetime, datetime],
     branches_label: str,
-    repo_csv_map: Dict[str, Path],
+    repo_csv_map: Dict[str, CommitSource],
     model: str = "gpt-4o-mini",
     max_tokens: int = 1200,
     budget_cents: int = 10,
@@ -195,11 +644,43 @@ def build_llm_summary(
     fix_version: Optional[str] = None,
     missing_preview: Optional[List[Dict[str, Any]]] = None,
     orphan_preview: Optional[List[Dict[str, Any]]] = None,
+    max_context_tokens: Optional[int] = None,
+    mode: str = "single",
+    map_max_tokens: int = 300,
+    max_workers: int = 4,
+    stream: bool = False,
+    on_delta: Optional[Callable[[str], None]] = None,
+    provider: Optional[Union[str, LLMProvider]] = None,
+    knowledge: Optional[List[str]] = None,
 ) -> Path:
     """
-    Builds a compact context from CSVs, enforces budget, caches the LLM output, and writes a markdown narrative.
-    Returns the markdown path.
+    Builds a compact context from CSVs, packs it to the token budget, caches the LLM output,
+    and writes a markdown narrative. Returns the markdown path.
+
+    ``top_n_per_repo`` caps highlight candidates per repo; ``missing_preview`` and
+    ``orphan_preview`` are candidate lists, cut to their best ``MAX_GAP_CANDIDATES``
+    (open issues first, orphans by commit score) before anything is tokenized. Which candidates make it into the prompt is
+    decided once by :func:`pack_context` against ``budget_cents`` (and ``max_context_tokens``).
+
+    ``mode="map-reduce"`` summarizes each repo separately (up to ``max_workers`` at a time,
+    ``map_max_tokens`` each) and caches each section by that repo's own fingerprint, so a
+    rerun after a small change only pays for the changed repos plus the short reduce call.
+
+    With ``stream`` (implied by ``on_delta``) the narrative is requested as a streamed
+    completion: each chunk is appended to the Markdown file as it arrives and passed to
+    ``on_delta``. In map-reduce mode only the final reduce call is streamed.
+
+    ``provider`` is a provider name or instance (default ``LLM_PROVIDER``, i.e. OpenAI;
+    ``"stub"`` runs offline). Prices come from ``kit.cost_meter.MODEL_PRICES``; each live
+    call is checked against the budget using the usage measured for earlier calls and
+    recorded in the active ``CostSession``.
+
+    ``knowledge`` snippets (default: the top hits of :func:`query_knowledge` for the
+    release's highlights, when the local knowledge index is enabled) are added as
+    ``runbook`` context and compete for the token budget like everything else.
     """
+    if mode not in ("single", "map-reduce"):
+        raise ValueError(f"Unknown LLM summary mode '{mode}' (expected 'single' or 'map-reduce')")
     ctx = build_context(
         summary_rows,
         repo_csv_map,
@@ -210,41 +691,44 @@ def build_llm_summary(
         missing_preview=missing_preview,
         orphan_preview=orphan_preview,
     )
-    # crude token estimate
-    sys_prompt, user_prompt = _make_prompt(ctx)
-    approx_tokens = estimate_tokens_from_chars(len(sys_prompt) + len(user_prompt)) + max_tokens
-
-    # Budget guard: assume model≈$0.15 per 1k tokens (safe ceiling for minis); adjust if you track live prices
-    est_cents = int((approx_tokens / 1000.0) * 15)
-    if est_cents > budget_cents:
-        # Try to reduce by lowering highlights; if still too big, bail gracefully.
-        if top_n_per_repo > 8:
-            return build_llm_summary(
-                summary_rows, output_dir, window, branches_label, repo_csv_map,
-                model=model, max_tokens=max_tokens, budget_cents=budget_cents,
-                top_n_per_repo=8, base_name=base_name, fix_version=fix_version
-            )
+    if knowledge is None:
+        knowledge = _knowledge_for(ctx)
+    if knowledge:
+        ctx["runbook"] = list(knowledge)
+    if not hasattr(provider, "complete"):
+        provider = get_provider(provider)
+    guard = _BudgetGuard(budget_cents, model)
+    reserved = max_tokens + (len(ctx["repos"]) * map_max_tokens if mode == "map-reduce" else 0)
+    budget_tokens = budget_to_prompt_tokens(budget_cents, reserved, model)
+    if max_context_tokens is not None:
+        budget_tokens = min(budget_tokens, max_context_tokens)
+    if budget_tokens <= 0:
         raise RuntimeError(
-            f"Estimated LLM cost ~{est_cents}¢ exceeds budget ({budget_cents}¢). "
-            "Re-run with --llm-budget-cents higher or fewer highlights."
+            f"LLM budget ({budget_cents}¢) does not cover {reserved} completion tokens. "
+            "Re-run with --llm-budget-cents higher or --llm-max-tokens lower."
         )
 
-    # Cache: fingerprint the context (highlights, counts, window)
-    fp = context_fingerprint(ctx)
-    key = _cache_key(model, fp)
-
-    def _fetch() -> Dict[str, Any]:
-        text = _openai_chat(model=model, system=sys_prompt, user=user_prompt, max_tokens=max_tokens)
-        return {"text": text}
-
-    data, source = load_cache_or_call(
-        key=key,
-        ttl_hours=720,  # 30 days
-        fetch_fn=_fetch,
-        force_refresh=False,
-    )
-
-    text = data.get("text", "").strip()
-    if not text:
-        raise RuntimeError("LLM returned empty summary.")
+    if mode == "single":
+        ctx, _ = pack_context(ctx, budget_tokens, model=model)
+    sink = MarkdownStream(output_dir, base_name, on_delta) if (stream or on_delta is not None) else None
+    try:
+        if mode == "map-reduce":
+            text = _map_reduce_summary(
+                ctx, model, max_tokens, budget_tokens, map_max_tokens, max_workers, on_delta=sink,
+                provider=provider, guard=guard,
+            )
+        else:
+            sys_prompt, user_prompt = _make_prompt(ctx)
+            # Cache: fingerprint the packed context (highlights, counts, window)
+            key = _cache_key(model, context_fingerprint(ctx), provider=provider.name)
+            text, _ = _cached_chat(key, model, sys_prompt, user_prompt, max_tokens, on_delta=sink,
+                                   provider=provider, guard=guard)
+        if not text:
+            raise RuntimeError("LLM returned empty summary.")
+    except BaseException:
+        if sink is not None:
+            sink.discard()
+        raise
+    if sink is not None:
+        sink.close()
     return write_markdown(text, output_dir, base_name=base_name)
@@ -1,20 +1,31 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 import csv
+import logging
 
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.worksheet import Worksheet
+from release_copilot.kit.cancellation import check_cancelled
+from release_copilot.kit.progress import emit
+from release_copilot.kit.tracing import span, traced
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:  # openpyxl is imported when a workbook is built
+    from openpyxl import Workbook
+    from openpyxl.worksheet.worksheet import Worksheet
 
 
 def _freeze_and_filter(ws: Worksheet) -> None:
+    from openpyxl.utils import get_column_letter
+
     ws.freeze_panes = "A2"
     ws.auto_filter.ref = f"A1:{get_column_letter(ws.max_column)}{ws.max_row}"
 
 
 def _auto_fit(ws: Worksheet) -> None:
+    from openpyxl.utils import get_column_letter
+
     for column_cells in ws.columns:
         length = max(len(str(cell.value or "")) for cell in column_cells)
         ws.column_dimensions[get_column_letter(column_cells[0].column)].width = length + 2
@@ -24,19 +35,35 @@ def _add_csv_sheet(wb: Workbook, sheet_title: str, csv_path: Path):
     ws = wb.create_sheet(title=sheet_title[:31])
     rows = []
     if csv_path.exists():
-        with csv_path.open("r", encoding="utf-8", newline="") as f:
+        with span("report.csv_read", "report", sheet=sheet_title), csv_path.open("r", encoding="utf-8", newline="") as f:
             reader = csv.reader(f)
             for row in reader:
                 rows.append(row)
-    if rows:
-        for row in rows:
-            ws.append(row)
-    else:
-        ws.append(["No data"])
+    with span("report.sheet_fill", "report", sheet=sheet_title, rows=len(rows)):
+        if rows:
+            for row in rows:
+                ws.append(row)
+        else:
+            ws.append(["No data"])
     _freeze_and_filter(ws)
-    _auto_fit(ws)
+    with span("report.auto_fit", "report", sheet=sheet_title):
+        _auto_fit(ws)
+
 
+def _analytics(summary_rows: List[Dict], repo_csv_map: Dict[str, Path]) -> Dict[str, List[Dict[str, Any]]]:
+    """Commit analytics over every commit CSV of the run; empty when unavailable."""
+    paths = [Path(r["csv_path"]) for r in summary_rows if r.get("csv_path")] + list(repo_csv_map.values())
+    try:
+        from release_copilot.reporting import analytics
 
+        with span("report.analytics", "report"):
+            return analytics.analyze(paths)
+    except Exception as e:
+        logger.warning("Commit analytics skipped: %s", e)
+        return {}
+
+
+@traced("report.build", "report")
 def build_reports(summary_rows: List[Dict], output_dir: Path, repo_csv_map: Dict[str, Path], base_name: str = "release_audit") -> None:
     # Markdown
     md_lines = ["| Project | Repo | Branch | Count | Source |", "|---|---|---|---|---|"]
@@ -53,10 +80,22 @@ def build_reports(summary_rows: List[Dict], output_dir: Path, repo_csv_map: Dict
         md_lines.append(f"- [Missing in repo CSV]({miss_p.as_posix()})")
     if orph_p.exists():
         md_lines.append(f"- [Orphan commits CSV]({orph_p.as_posix()})")
+    stats = _analytics(summary_rows, repo_csv_map)
+    if stats.get("repos"):
+        from release_copilot.reporting import analytics
+
+        md_lines += analytics.markdown_section(stats)
     md_path = output_dir / f"{base_name}.md"
     md_path.write_text("\n".join(md_lines), encoding="utf-8")
+    # Markdown, Summary, one sheet per CSV, save.
+    sheets = [(f"{repo[:31]}", p) for repo, p in repo_csv_map.items()]
+    sheets += [(title, p) for title, p in (("MissingInRepo", miss_p), ("OrphanCommits", orph_p)) if p.exists()]
+    steps = len(sheets) + 3
+    emit("report", done=1, total=steps, message=md_path.name)
 
     # Excel
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Summary"
@@ -72,12 +111,17 @@ def build_reports(summary_rows: List[Dict], output_dir: Path, repo_csv_map: Dict
         ])
     _freeze_and_filter(ws)
     _auto_fit(ws)
-    # per-repo sheets
-    for repo, csv_path in repo_csv_map.items():
-        _add_csv_sheet(wb, repo[:31], csv_path)
-    if miss_p.exists():
-        _add_csv_sheet(wb, "MissingInRepo", miss_p)
-    if orph_p.exists():
-        _add_csv_sheet(wb, "OrphanCommits", orph_p)
+    emit("report", done=2, total=steps, message="Summary")
+    # per-repo sheets, then the Jira comparison
+    for i, (title, csv_path) in enumerate(sheets, start=3):
+        check_cancelled()
+        _add_csv_sheet(wb, title, csv_path)
+        emit("report", done=i, total=steps, message=title)
+    if stats.get("repos"):
+        analytics.add_sheet(wb, stats)
+        _auto_fit(wb["Analytics"])
     xlsx_path = output_dir / f"{base_name}.xlsx"
-    wb.save(xlsx_path)
+    check_cancelled()
+    with span("report.xlsx_save", "report"):
+        wb.save(xlsx_path)
+    emit("report", "done", done=steps, total=steps, message=xlsx_path.name)
@@ -1,7 +1,7 @@
 from __future__ import annotations
-import requests
 from typing import Tuple
-from release_copilot.config.settings import Settings
+from release_copilot.config.settings import get_settings
+from release_copilot.kit.http import get_session
 
 def bitbucket_ping(project_key: str) -> Tuple[bool, str]:
     """
@@ -9,13 +9,13 @@ def bitbucket_ping(project_key: str) -> Tuple[bool, str]:
     - GET /rest/api/1.0/projects/{project}/repos?limit=1
     Returns (ok, message).
     """
-    s = Settings()
+    s = get_settings()
     base = s.bitbucket_base_url.rstrip("/")
     email = s.bitbucket_email
     token = s.bitbucket_app_password
     try:
         url = f"{base}/projects/{project_key}/repos"
-        r = requests.get(url, params={"limit": 1}, auth=(email, token), timeout=15)
+        r = get_session("bitbucket").get(url, params={"limit": 1}, auth=(email, token), timeout=15)
         if r.status_code in (401, 403):
             return False, f"Bitbucket auth failed ({r.status_code})."
         r.raise_for_status()
@@ -1,31 +1,38 @@
 from datetime import datetime
 from typing import Dict, List, Optional
 
-import requests
-from langchain.tools import tool
 from tenacity import retry, wait_fixed, stop_after_attempt
 
-from release_copilot.config.settings import settings
+from release_copilot.config.settings import get_settings
 from release_copilot.kit.caching import cache_json
+from release_copilot.kit.cancellation import check_cancelled, request_timeout
 from release_copilot.kit.errors import ApiError
+from release_copilot.kit import key_index
+from release_copilot.kit.http import get_session
 from release_copilot.kit.jira_key import extract_keys
+from release_copilot.kit.progress import emit
+from release_copilot.kit.tracing import span
 
 
-@tool
 def get_commits_by_branch(project: str, repo: str, branch: str, since: Optional[str] = None) -> List[Dict]:
-    """Fetch commits for a branch and tag with Jira keys."""
-    return _get_commits(project, repo, branch, since)
+    """Fetch commits for a branch and tag with Jira keys (and add them to the key index)."""
+    check_cancelled()
+    commits = _get_commits(project, repo, branch, since)
+    emit(f"commits {repo}@{branch}", "done", done=len(commits))
+    key_index.record(project, repo, branch, commits)
+    return commits
 
 
 @cache_json('bitbucket', ttl_hours=12)
 @retry(wait_fixed(2), stop=stop_after_attempt(3))
 def _get_commits(project: str, repo: str, branch: str, since: Optional[str] = None) -> List[Dict]:
+    settings = get_settings()
     base = settings.bitbucket_base_url.rstrip("/")
     url = f"{base}/projects/{project}/repos/{repo}/commits"
     params = {'until': branch}
     if since:
         params['since'] = since
-    resp = requests.get(url, params=params, auth=(settings.bitbucket_email, settings.bitbucket_app_password), timeout=10)
+    resp = get_session("bitbucket").get(url, params=params, auth=(settings.bitbucket_email, settings.bitbucket_app_password), timeout=10)
     if not resp.ok:
         raise ApiError(f"Bitbucket API error: {resp.status_code}")
     data = resp.json().get('values', [])
@@ -49,27 +56,37 @@ def fetch_commits_window(
         Bitbucket identifiers.
     since_utc, until_utc:
         Inclusive UTC datetime window.
+
+    Checks for cancellation before every page and caps each request at the
+    run's remaining deadline.
     """
 
+    settings = get_settings()
     base = settings.bitbucket_base_url.rstrip("/")
     url = f"{base}/projects/{project}/repos/{repo}/commits"
     start = 0
     commits: List[Dict] = []
     since_ms = int(since_utc.timestamp() * 1000)
     until_ms = int(until_utc.timestamp() * 1000)
+    stage = f"commits {repo}@{branch}"
+    pages = 0
 
     while True:
+        check_cancelled()
         params = {"until": branch, "start": start, "limit": 100}
-        resp = requests.get(
-            url,
-            params=params,
-            auth=(settings.bitbucket_email, settings.bitbucket_app_password),
-            timeout=10,
-        )
+        with span("bitbucket.page", "network", repo=repo, start=start) as sp:
+            resp = get_session("bitbucket").get(
+                url,
+                params=params,
+                auth=(settings.bitbucket_email, settings.bitbucket_app_password),
+                timeout=request_timeout(10),
+            )
+            sp["status"] = resp.status_code
         if not resp.ok:
             raise ApiError(f"Bitbucket API error: {resp.status_code}")
 
-        payload = resp.json()
+        with span("bitbucket.json", "decode", bytes=len(resp.content)):
+            payload = resp.json()
         values = payload.get("values", [])
         stop = False
         for commit in values:
@@ -82,8 +99,28 @@ def fetch_commits_window(
                 commit["message"] = (commit.get("message", "") or "")[:1000]
                 commits.append(commit)
 
+        pages += 1
         if stop or payload.get("isLastPage"):
             break
+        emit(stage, done=len(commits), message=f"page {pages}")
         start = payload.get("nextPageStart")
 
+    emit(stage, "done", done=len(commits), message=f"{pages} page(s)")
     return commits
+
+
+def fetch_commit_patch(project: str, repo: str, sha: str) -> str:
+    """Plain-text patch of one commit against its first parent (``/patch?until=<sha>``)."""
+    settings = get_settings()
+    url = f"{settings.bitbucket_base_url.rstrip('/')}/projects/{project}/repos/{repo}/patch"
+    with span("bitbucket.patch", "network", repo=repo) as sp:
+        resp = get_session("bitbucket").get(
+            url,
+            params={"until": sha},
+            auth=(settings.bitbucket_email, settings.bitbucket_app_password),
+            timeout=30,
+        )
+        sp["status"] = resp.status_code
+    if not resp.ok:
+        raise ApiError(f"Bitbucket API error: {resp.status_code}")
+    return resp.text
@@ -1,14 +1,13 @@
 from typing import Dict
 import requests
-from langchain.tools import tool
 
-from release_copilot.config.settings import settings
+from release_copilot.config.settings import get_settings
 from release_copilot.kit.errors import ApiError, ConfigError
 
 
-@tool
 def publish_confluence(title: str, body_markdown: str) -> str:
     """Publish a markdown page to Confluence. Returns page URL."""
+    settings = get_settings()
     if not settings.confluence_enabled:
         raise ConfigError('Confluence disabled')
     url = f"{settings.confluence_base_url}/rest/api/content"
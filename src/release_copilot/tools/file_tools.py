@@ -1,11 +1,15 @@
+from __future__ import annotations
+
 from pathlib import Path
-from typing import List, Dict
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.worksheet import Worksheet
+from typing import TYPE_CHECKING, List, Dict
+
+if TYPE_CHECKING:  # openpyxl is imported when a workbook is written
+    from openpyxl.worksheet.worksheet import Worksheet
 
 
 def _autowidth(ws: Worksheet) -> None:
+    from openpyxl.utils import get_column_letter
+
     for column_cells in ws.columns:
         length = max(len(str(cell.value or '')) for cell in column_cells)
         ws.column_dimensions[get_column_letter(column_cells[0].column)].width = length + 2
@@ -13,14 +17,16 @@ def _autowidth(ws: Worksheet) -> None:
 
 def write_excel_audit(jira_list: List[Dict], commit_list: List[Dict], matches: List[Dict],
                        missing_in_git: List[Dict], commits_without_story: List[Dict], path: Path) -> None:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = 'Matches'
-    headers = ['Jira Key', 'Summary', 'Commit', 'Author']
+    headers = ['Jira Key', 'Summary', 'Commit', 'Author', 'Repo']
     ws.append(headers)
     for m in matches:
-        ws.append([m.get('key'), m.get('summary'), m.get('commit'), m.get('author')])
-    ws.auto_filter.ref = f"A1:D{ws.max_row}"
+        ws.append([m.get('key'), m.get('summary'), m.get('commit'), m.get('author'), m.get('repo')])
+    ws.auto_filter.ref = f"A1:E{ws.max_row}"
     ws.freeze_panes = 'A2'
     _autowidth(ws)
 
@@ -33,10 +39,10 @@ def write_excel_audit(jira_list: List[Dict], commit_list: List[Dict], matches: L
     _autowidth(ws2)
 
     ws3 = wb.create_sheet('CommitsWithoutStory')
-    ws3.append(['Commit', 'Author'])
+    ws3.append(['Commit', 'Author', 'Repo'])
     for c in commits_without_story:
-        ws3.append([c.get('id'), c.get('author')])
-    ws3.auto_filter.ref = f"A1:B{ws3.max_row}"
+        ws3.append([c.get('id'), c.get('author'), c.get('repo')])
+    ws3.auto_filter.ref = f"A1:C{ws3.max_row}"
     ws3.freeze_panes = 'A2'
     _autowidth(ws3)
 
@@ -1,22 +1,24 @@
 from __future__ import annotations
-import json, time
+import json, threading, time
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
 import requests
 
-from release_copilot.config.settings import Settings
-from release_copilot.kit.caching import load_cache_or_call
-
-settings = Settings()
+from release_copilot.config.settings import get_settings
+from release_copilot.kit.cancellation import check_cancelled, request_timeout
+from release_copilot.kit.caching import load_cache_or_call, read_cache, write_cache
+from release_copilot.kit.http import new_session
+from release_copilot.kit.progress import emit
+from release_copilot.kit.tracing import span
 
 AUTH_BASE = "https://auth.atlassian.com"
 API_BASE = "https://api.atlassian.com"
 
-TOKEN_FILE = Path(settings.JIRA_TOKEN_FILE)
-
 FIELDS = "key,summary,status,issuetype,assignee,fixVersions,updated"
+KEY_FIELDS = FIELDS + ",parent"
 PAGE_SIZE = 100
+KEY_CHUNK = 100  # keys per ``key in (...)`` search
 
 
 class JiraOAuth:
@@ -25,6 +27,9 @@ class JiraOAuth:
         self.client_secret = client_secret
         self.token_path = token_path
         self._data = self._load()
+        self._session: Optional[requests.Session] = None
+        self._session_token: Optional[str] = None
+        self._session_lock = threading.Lock()
 
     def _load(self) -> dict:
         if not self.token_path.exists():
@@ -103,24 +108,53 @@ class JiraOAuth:
         return self._data["cloudid"]
 
     def session(self) -> requests.Session:
+        """Pooled session for the current bearer token (refreshed when near expiry).
+
+        Each token gets its own session whose headers never change afterwards,
+        so threads holding the previous one are unaffected by a refresh.
+        """
         tok = self._ensure_access_token()
-        s = requests.Session()
-        s.headers.update({
-            "Accept": "application/json",
-            "Authorization": f"Bearer {tok}",
-        })
-        return s
+        with self._session_lock:
+            if self._session is None or self._session_token != tok:
+                self._session = new_session(headers={
+                    "Accept": "application/json",
+                    "Authorization": f"Bearer {tok}",
+                })
+                self._session_token = tok
+            return self._session
 
     def base_v3(self) -> str:
         cid = self._ensure_cloudid()
         return f"{API_BASE}/ex/jira/{cid}/rest/api/3"
 
 
+_oauth: Optional[JiraOAuth] = None
+_oauth_lock = threading.Lock()
+
+
+def _get_oauth() -> Optional[JiraOAuth]:
+    """OAuth client built from settings on first use; ``None`` when not configured."""
+    global _oauth
+    with _oauth_lock:
+        if _oauth is None:
+            settings = get_settings()
+            try:
+                _oauth = JiraOAuth(
+                    settings.ATLASSIAN_OAUTH_CLIENT_ID,
+                    settings.ATLASSIAN_OAUTH_CLIENT_SECRET,
+                    Path(settings.JIRA_TOKEN_FILE),
+                )
+            except Exception:
+                return None
+        return _oauth
+
+
 def validate_jql_or_raise(jql: str) -> None:
-    if _oauth is None:
+    oauth = _get_oauth()
+    if oauth is None:
         raise RuntimeError("Jira OAuth not configured")
-    s = _oauth.session()
-    url = f"{_oauth.base_v3()}/search"
+    s = oauth.session()
+    url = f"{oauth.base_v3()}/search"
     params = {"jql": jql, "startAt": 0, "maxResults": 0, "fields": "key"}
     r = s.get(url, params=params, timeout=20)
     try:
@@ -136,55 +170,129 @@ def validate_jql_or_raise(jql: str) -> None:
         ) from e
 
 
-def _search_once(s: requests.Session, jql: str, start_at: int = 0, max_results: int = PAGE_SIZE) -> Dict[str, Any]:
-    url = f"{_oauth.base_v3()}/search"
-    params = {"jql": jql, "startAt": start_at, "maxResults": max_results, "fields": FIELDS}
-    r = s.get(url, params=params, timeout=30)
+def _search_once(s: requests.Session, jql: str, start_at: int = 0, max_results: int = PAGE_SIZE,
+                 fields: str = FIELDS, **extra: str) -> Dict[str, Any]:
+    check_cancelled()  # once per page, for every paginated search
+    url = f"{_get_oauth().base_v3()}/search"
+    params = {"jql": jql, "startAt": start_at, "maxResults": max_results, "fields": fields, **extra}
+    with span("jira.search", "network", start_at=start_at) as sp:
+        r = s.get(url, params=params, timeout=request_timeout(30))
+        sp["status"] = r.status_code
     r.raise_for_status()
-    return r.json()
+    with span("jira.json", "decode", bytes=len(r.content)):
+        return r.json()
+
+
+def _issue_row(i: Dict[str, Any]) -> Dict[str, Any]:
+    f = i.get("fields", {}) or {}
+    row = {
+        "key": i.get("key"),
+        "summary": f.get("summary"),
+        "status": (f.get("status") or {}).get("name"),
+        "issuetype": (f.get("issuetype") or {}).get("name"),
+        "assignee": ((f.get("assignee") or {}).get("displayName") or ""),
+        "fixVersions": [v.get("name") for v in (f.get("fixVersions") or [])],
+        "updated": f.get("updated"),
+        "self": i.get("self"),
+    }
+    if "parent" in f:
+        row["parent"] = (f.get("parent") or {}).get("key") or ""
+    return row
 
 
 def search_issues_cached(jql: str, ttl_hours: int = 12, force_refresh: bool = False) -> List[Dict[str, Any]]:
-    if _oauth is None:
+    oauth = _get_oauth()
+    if oauth is None:
         raise RuntimeError("Jira OAuth not configured")
     key = f"jira:search|v3|jql={jql}|fields={FIELDS}"
 
     def fetch():
-        s = _oauth.session()
+        s = oauth.session()
         data = _search_once(s, jql, start_at=0)
         total = int(data.get("total", 0))
         issues = data.get("issues", [])
         start = len(issues)
+        emit("jira", done=start, total=total)
         while start < total:
             page = _search_once(s, jql, start_at=start)
             issues.extend(page.get("issues", []))
             start = len(issues)
-        out = []
-        for i in issues:
-            f = i.get("fields", {}) or {}
-            out.append({
-                "key": i.get("key"),
-                "summary": f.get("summary"),
-                "status": (f.get("status") or {}).get("name"),
-                "issuetype": (f.get("issuetype") or {}).get("name"),
-                "assignee": ((f.get("assignee") or {}).get("displayName") or ""),
-                "fixVersions": [v.get("name") for v in (f.get("fixVersions") or [])],
-                "updated": f.get("updated"),
-                "self": i.get("self"),
-            })
-        return {"issues": out}
+            emit("jira", done=start, total=total)
+        return {"issues": [_issue_row(i) for i in issues]}
 
     data, _ = load_cache_or_call(key, ttl_hours=ttl_hours, fetch_fn=fetch, force_refresh=force_refresh)
+    emit("jira", "done", done=len(data.get("issues", [])))
     return data.get("issues", [])
 
 
+def fetch_issues_by_keys(keys: List[str], ttl_hours: int = 12, force_refresh: bool = False,
+                         chunk_size: int = KEY_CHUNK) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Resolve issue keys in chunked ``key in (...)`` searches, with a per-key cache.
+
+    Returns key -> issue (with ``parent``), or ``None`` for keys Jira does not
+    know. Unknown keys are cached too, so a rerun only searches new keys.
+    ``validateQuery=warn`` keeps one unknown key from failing its whole chunk.
+    """
+    resolved: Dict[str, Optional[Dict[str, Any]]] = {}
+    todo: List[str] = []
+    for k in dict.fromkeys(keys):
+        hit, data = (False, None) if force_refresh else read_cache(_issue_cache_key(k), ttl_hours)
+        if hit:
+            resolved[k] = data
+        else:
+            todo.append(k)
+    if not todo:
+        return resolved
+    oauth = _get_oauth()
+    if oauth is None:
+        raise RuntimeError("Jira OAuth not configured")
+    s = oauth.session()
+    for start in range(0, len(todo), chunk_size):
+        chunk = todo[start:start + chunk_size]
+        jql = f"key in ({', '.join(chunk)})"
+        found: Dict[str, Dict[str, Any]] = {}
+        page_start = 0
+        while True:
+            page = _search_once(s, jql, start_at=page_start, fields=KEY_FIELDS, validateQuery="warn")
+            for i in page.get("issues", []):
+                row = _issue_row(i)
+                found[row["key"]] = row
+            page_start += len(page.get("issues", []))
+            if not page.get("issues") or page_start >= int(page.get("total", 0)):
+                break
+        for k in chunk:
+            resolved[k] = found.get(k)
+            write_cache(_issue_cache_key(k), resolved[k])
+        emit("jira.keys", done=start + len(chunk), total=len(todo))
+    return resolved
+
+
+def _issue_cache_key(key: str) -> str:
+    return f"jira:issue|v3|key={key}|fields={KEY_FIELDS}"
+
+
+def get_jira_issues(jql: Optional[str] = None, fix_version: Optional[str] = None,
+                    ttl_hours: int = 12) -> List[Dict[str, Any]]:
+    """Issues for the graph path: explicit ``jql``, else ``DEFAULT_JQL``/fixVersion."""
+    if not jql:
+        tmpl = get_settings().DEFAULT_JQL
+        if tmpl:
+            jql = tmpl.format(fix_version=fix_version) if "{fix_version}" in tmpl else tmpl
+        elif fix_version:
+            jql = f'fixVersion = "{fix_version}"'
+        else:
+            raise ValueError("No JQL: provide jql, a fix version, or DEFAULT_JQL in .env")
+    return search_issues_cached(jql, ttl_hours=ttl_hours)
+
+
 def _self_test() -> int:
-    if _oauth is None:
+    oauth = _get_oauth()
+    if oauth is None:
         print("Jira OAuth self-test failed: OAuth not configured")
         return 1
     try:
-        s = _oauth.session()
-        cid = _oauth._ensure_cloudid()
+        s = oauth.session()
+        cid = oauth._ensure_cloudid()
         validate_jql_or_raise("ORDER BY updated DESC")
         print(f"Jira OAuth self-test: OK (cloudid={cid})")
         return 0
@@ -193,15 +301,6 @@ def _self_test() -> int:
         return 1
 
 
-try:
-    _oauth = JiraOAuth(
-        settings.ATLASSIAN_OAUTH_CLIENT_ID,
-        settings.ATLASSIAN_OAUTH_CLIENT_SECRET,
-        TOKEN_FILE,
-    )
-except Exception:
-    _oauth = None
-
 if __name__ == "__main__":
     import sys
     if "--self-test" in sys.argv:
@@ -0,0 +1,18 @@
+"""LangChain tool wrappers, built on demand.
+
+The tool functions themselves are plain callables; wrapping them here keeps
+``langchain`` (slow to import) out of CLI startup.
+"""
+from typing import List
+
+
+def build_tools() -> List:
+    """``@tool``-wrapped Bitbucket and Confluence helpers for agent frameworks."""
+    try:
+        from langchain.tools import tool
+    except Exception as e:
+        raise RuntimeError("langchain is not installed; agent tools are unavailable.") from e
+    from release_copilot.tools.bitbucket_tools import get_commits_by_branch
+    from release_copilot.tools.confluence_tools import publish_confluence
+
+    return [tool(get_commits_by_branch), tool(publish_confluence)]
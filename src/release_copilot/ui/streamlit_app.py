@@ -3,11 +3,13 @@ import streamlit as st
 from dotenv import load_dotenv
 from datetime import date
 from typing import Optional
-from .ui_backend import RunThread, tail_file
+from .ui_backend import RunThread, TextStream, run_via_daemon
 
 # Import the callable pipeline
 from release_copilot.app import run_release_audit  # relies on your refactor above
 from release_copilot.config.settings import load_query_presets
+from release_copilot.kit.daemon_client import DaemonClient
+from release_copilot.kit.progress import ProgressBus, ProgressState
 
 load_dotenv()
 
@@ -42,6 +44,10 @@ with col2:
     branch = st.text_input("Branch", value="release/r-55.1")
     since_date: Optional[date] = st.date_input("Changes since (optional)", value=None)
     since = since_date.isoformat() if since_date else None
+extra_targets = st.text_area(
+    "More repos (optional, one PROJECT/REPO@BRANCH per line; @BRANCH defaults to Branch)",
+    value="", height=80, placeholder="STARSYSONE/policycenter@release/r-55.1",
+)
 
 presets = load_query_presets()
 st.subheader("JQL")
@@ -54,24 +60,52 @@ with c2:
 adv = st.expander("Advanced", expanded=False)
 with adv:
     enable_confluence = st.checkbox("Publish to Confluence (optional)", value=False)
-    enable_llamaindex = st.checkbox("Enable LlamaIndex context (optional)", value=False)
+    enable_llamaindex = st.checkbox("Add runbook context from the local knowledge index (optional)", value=False)
     dry_run = st.checkbox("Dry run (skip LLM; validate plumbing)", value=False)
+    write_llm = st.checkbox("LLM narrative (streams in while it is written)", value=False)
+    llm_model = st.text_input("LLM model", value="gpt-4o-mini")
+    llm_budget_cents = st.number_input("LLM budget (cents)", min_value=1, value=10, step=1)
+    use_daemon = st.checkbox("Use local daemon if running here (release-copilot serve)", value=False)
+    deadline_min = st.number_input("Deadline (minutes, 0 = none; partial results after it)", min_value=0, value=0, step=1)
 
-run_clicked = st.button("▶️ Run audit", type="primary")
+if "runner" not in st.session_state:
+    st.session_state.runner = None
+
+b1, b2 = st.columns([1, 6])
+with b1:
+    run_clicked = st.button("▶️ Run audit", type="primary")
+with b2:
+    # Clicking reruns the script; the run itself stops at its next page and keeps what it has.
+    if st.button("⏹ Cancel", disabled=st.session_state.runner is None) and st.session_state.runner:
+        st.session_state.runner.cancel.cancel("cancelled in the UI")
 
 status = st.empty()
+progress_box = st.empty()
+narrative_box = st.empty()
 log_box = st.empty()
 result_box = st.container()
 
-if "runner" not in st.session_state:
-    st.session_state.runner = None
-
-def render_logs(log_path: str):
-    content = tail_file(log_path) if log_path else ""
-    if not content:
+def render_progress(state: ProgressState):
+    with progress_box.container():
+        # Overall step count first, then each stage in the order it started.
+        for stage in sorted(state.stages, key=lambda s: s != "pipeline"):
+            e = state.stages[stage]
+            frac = state.fraction(stage)
+            count = f"{e.done}/{e.total}" if e.total else str(e.done)
+            label = f"{stage} · {e.status} · {count}" + (f" · {e.message}" if e.message else "")
+            st.progress(frac if frac is not None else 0.0, text=label)
+
+def render_logs(state: ProgressState):
+    if not state.logs:
         log_box.info("Waiting for logs...")
     else:
-        log_box.text_area("Live logs (tail)", content, height=300)
+        log_box.code("\n".join(state.logs), language=None)
+
+def render_narrative():
+    stream = st.session_state.get("narrative")
+    text = stream.text() if stream else ""
+    if text:
+        narrative_box.markdown("### LLM narrative\n\n" + text)
 
 if run_clicked:
     # Kick off background run
@@ -86,31 +120,54 @@ if run_clicked:
         enable_confluence=enable_confluence,
         enable_llamaindex=enable_llamaindex,
         dry_run=dry_run,
+        llm_model=llm_model if write_llm else None,
+        llm_budget_cents=int(llm_budget_cents),
+        targets=[line.strip() for line in extra_targets.splitlines() if line.strip()],
+        deadline_s=deadline_min * 60 or None,
     )
-    runner = RunThread(target=run_release_audit, kwargs=kwargs)
+    st.session_state.narrative = TextStream()
+    kwargs["on_llm_delta"] = st.session_state.narrative.append
+    st.session_state.progress = ProgressState()
+    bus = ProgressBus()
+    client = DaemonClient.discover(cwd=os.getcwd()) if use_daemon else None
+    st.session_state.daemon = client
+    if client is not None:
+        runner = RunThread(target=run_via_daemon, kwargs={"client": client, **kwargs}, progress=bus)
+    else:
+        runner = RunThread(target=run_release_audit, kwargs=kwargs, progress=bus)
     st.session_state.runner = runner
     runner.start()
-    status.info("Running… this usually takes a few minutes.")
+    status.info("Running on the local daemon…" if client else "Running… this usually takes a few minutes.")
 
-# Poll while running
+# Render progress events as they arrive; the wait wakes on the first new event.
 runner = st.session_state.runner
 if runner:
+    progress = st.session_state.progress
+    render_progress(progress)
+    render_logs(progress)
     while runner.is_alive():
-        # try to render logs if the pipeline already created a log file
-        # assume logs path is logs/release-copilot.log
-        render_logs("logs/release-copilot.log")
-        st.sleep(0.5)
-    # one last log render
-    render_logs("logs/release-copilot.log")
+        # The timeout only bounds how stale the streamed narrative can get.
+        if progress.apply(runner.progress.wait(timeout=0.5)):
+            render_progress(progress)
+            render_logs(progress)
+        render_narrative()
+    progress.apply(runner.progress.drain())
+    render_progress(progress)
+    render_logs(progress)
+    render_narrative()
 
     if runner.error:
         status.error(f"Run failed: {runner.error}")
     else:
         res = runner.result or {}
-        if not res.get("ok", False):
+        if not res.get("ok", False) and not res.get("incomplete"):
             status.error(f"Run finished with errors: {res.get('error')}")
         else:
-            status.success("Run complete!")
+            if res.get("incomplete"):
+                resume = f" Resume with --resume {res['run_id']}." if res.get("run_id") else ""
+                status.warning(f"Stopped early ({res['incomplete']}): partial results below.{resume}")
+            else:
+                status.success("Run complete!")
             artifacts = res.get("artifacts", {})
             counts = res.get("counts", {})
             cost = res.get("cost", {})
@@ -122,16 +179,33 @@ if runner:
                 c3.metric("Missing in Git", counts.get("missing_in_git", 0))
                 c4.metric("Commits w/o Story", counts.get("commits_without_story", 0))
 
+                by_repo = counts.get("by_repo", {})
+                if len(by_repo) > 1:
+                    st.markdown("### Per repo")
+                    st.table([{"Target": label, **c} for label, c in by_repo.items()])
+
                 st.markdown("### Artifacts")
                 excel_path = artifacts.get("excel")
                 md_path = artifacts.get("markdown")
-
-                if excel_path and os.path.exists(excel_path):
-                    with open(excel_path, "rb") as f:
-                        st.download_button("⬇️ Download Excel", f, file_name=os.path.basename(excel_path))
-                if md_path and os.path.exists(md_path):
-                    with open(md_path, "rb") as f:
-                        st.download_button("⬇️ Download Markdown", f, file_name=os.path.basename(md_path))
+                llm_md_path = artifacts.get("llm_markdown")
+
+                def artifact_bytes(name: str, path: Optional[str]) -> Optional[bytes]:
+                    if path and os.path.exists(path):
+                        with open(path, "rb") as f:
+                            return f.read()
+                    client = st.session_state.get("daemon")
+                    if path and client and res.get("daemon_job"):
+                        return client.artifact(res["daemon_job"], name)
+                    return None
+
+                for name, path, label in [
+                    ("excel", excel_path, "⬇️ Download Excel"),
+                    ("markdown", md_path, "⬇️ Download Markdown"),
+                    ("llm_markdown", llm_md_path, "⬇️ Download LLM narrative"),
+                ]:
+                    data = artifact_bytes(name, path)
+                    if data is not None:
+                        st.download_button(label, data, file_name=os.path.basename(path))
 
                 if cost:
                     st.markdown("### Cost Summary")
@@ -1,10 +1,18 @@
-import threading, time, os
+import threading
+from contextlib import nullcontext
 from typing import Callable, Dict, Any, Optional
 
+from release_copilot.kit.cancellation import CancelToken, current_token
+from release_copilot.kit.errors import Cancelled
+from release_copilot.kit.progress import ProgressBus, ProgressEvent, current_bus
+
 class RunThread:
-    def __init__(self, target: Callable[..., Dict[str, Any]], kwargs: dict):
+    """Runs ``target(**kwargs)`` in the background, inside ``progress`` and the ``cancel`` token."""
+    def __init__(self, target: Callable[..., Dict[str, Any]], kwargs: dict, progress: Optional[ProgressBus] = None):
         self._target = target
         self._kwargs = kwargs
+        self.progress = progress
+        self.cancel = CancelToken()
         self.result: Optional[Dict[str, Any]] = None
         self.error: Optional[str] = None
         self._thread = threading.Thread(target=self._run, daemon=True)
@@ -13,19 +21,41 @@ class RunThread:
     def is_alive(self): return self._thread.is_alive()
     def _run(self):
         try:
-            self.result = self._target(**self._kwargs)
+            with self.progress or nullcontext(), self.cancel:
+                self.result = self._target(**self._kwargs)
+        except Cancelled as e:  # a target that does not keep partial results
+            self.result = {"ok": False, "error": str(e), "incomplete": str(e)}
         except Exception as e:  # pragma: no cover - defensive
             self.error = str(e)
 
-def tail_file(path: str, max_bytes: int = 50_000) -> str:
-    if not os.path.exists(path):
-        return ""
-    size = os.path.getsize(path)
-    with open(path, "rb") as f:
-        if size > max_bytes:
-            f.seek(-max_bytes, os.SEEK_END)
-        data = f.read()
-    try:
-        return data.decode("utf-8", errors="replace")
-    except Exception:
-        return ""
+class TextStream:
+    """Thread-safe text buffer: the pipeline appends streamed chunks, the UI renders the text."""
+    def __init__(self):
+        self._parts = []
+        self._lock = threading.Lock()
+
+    def append(self, piece: str) -> None:
+        with self._lock:
+            self._parts.append(piece)
+
+    def text(self) -> str:
+        with self._lock:
+            return "".join(self._parts)
+
+def run_via_daemon(client, on_llm_delta: Optional[Callable[[str], None]] = None, **kwargs) -> Dict[str, Any]:
+    """Run ``run_release_audit(**kwargs)`` on a ``release-copilot serve`` daemon.
+
+    The daemon's progress events are replayed into the caller's open bus, if any,
+    and cancelling the caller's token cancels the daemon job.
+    """
+    bus = current_bus()
+    token = current_token()
+    job_id = client.submit("graph", kwargs=kwargs)
+    st = client.wait(job_id, on_narrative=on_llm_delta,
+                     on_progress=(lambda e: bus.put(ProgressEvent(**e))) if bus is not None else None,
+                     cancelled=(lambda: token.cancelled) if token is not None else None)
+    if st["status"] == "cancelled":
+        return {"ok": False, "error": st.get("error"), "incomplete": st.get("error")}
+    if st["status"] == "failed":
+        return {"ok": False, "error": st.get("error")}
+    return {**(st.get("result") or {}), "daemon_job": job_id}
@@ -4,3 +4,16 @@ from pathlib import Path
 root = Path(__file__).resolve().parents[1]
 if str(root) not in sys.path:
     sys.path.append(str(root))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_stores(tmp_path, monkeypatch):
+    """Audits run by tests keep their SQLite stores (and daemon tokens) under tmp_path, not ./data."""
+    from release_copilot.kit import daemon_client, history, key_index, patch_id
+
+    monkeypatch.setattr(history, "HISTORY_DB", tmp_path / "history.sqlite")
+    monkeypatch.setattr(key_index, "INDEX_DB", tmp_path / "key_index.sqlite")
+    monkeypatch.setattr(patch_id, "PATCH_ID_DB", tmp_path / "patch_ids.sqlite")
+    monkeypatch.setattr(daemon_client, "TOKEN_DIR", tmp_path / "daemon")
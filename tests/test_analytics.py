@@ -0,0 +1,57 @@
+import csv
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from release_copilot.reporting import analytics  # noqa: E402
+from release_copilot.reporting.report_builder import build_reports  # noqa: E402
+
+FIELDS = ["project", "repo", "branch", "id", "displayId", "author", "authorEmail", "authorTimestamp", "message",
+          "jira_keys", "link"]
+DAY = 86_400_000
+MON = 1_704_067_200_000  # 2024-01-01 00:00 UTC, a Monday
+
+
+def _csv(path, branch, commits):
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=FIELDS)
+        w.writeheader()
+        for sha, author, ts, msg in commits:
+            w.writerow({"project": "P", "repo": "app", "branch": branch, "id": sha, "displayId": sha[:7],
+                        "author": author, "authorTimestamp": ts, "message": msg})
+    return path
+
+
+def test_grouped_aggregates(tmp_path):
+    develop = _csv(tmp_path / "develop.csv", "develop", [
+        ("a1", "ann", MON + 9 * 3_600_000, "MOBI-1 claim page"),
+        ("a2", "ann", MON + DAY + 10 * 3_600_000, "bump deps"),
+        ("b1", "bob", MON + DAY + 11 * 3_600_000, "MOBI-2 renewals"),
+    ])
+    release = _csv(tmp_path / "release.csv", "release/r-1", [("a1", "ann", MON + 9 * 3_600_000, "MOBI-1 claim page")])
+    cols = analytics.load_columns([develop, release, develop])
+    assert len(cols) == 4 and cols.ts.dtype.name == "int64"
+
+    stats = analytics.compute(cols)
+    repos = {r["repo"]: r for r in stats["repos"]}
+    assert repos["P/app@develop"] == {"repo": "P/app@develop", "commits": 3, "unkeyed": 1, "unkeyed_rate": 0.333,
+                                      "authors": 2, "first": "2024-01-01", "last": "2024-01-02"}
+    # a1 sits on both branches but is one change.
+    assert stats["authors"][0] == {"author": "ann", "commits": 2, "unkeyed": 1, "unkeyed_rate": 0.5, "active_days": 2}
+    assert stats["days"] == [{"day": "2024-01-01", "commits": 1, "unkeyed": 0, "authors": 1},
+                             {"day": "2024-01-02", "commits": 2, "unkeyed": 1, "authors": 2}]
+    grid = {row["weekday"]: row for row in stats["weekday_hour"]}
+    assert grid["Mon"]["09"] == 1 and grid["Tue"]["10"] == 1 and grid["Tue"]["11"] == 1
+
+    section = "\n".join(analytics.markdown_section(stats))
+    assert "## Commit analytics" in section and "| ann | 2 | 1 | 50% | 2 |" in section
+
+
+def test_report_gets_analytics_sheet_and_section(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = _csv(tmp_path / "develop.csv", "develop", [("a1", "ann", MON, "MOBI-1 x")])
+    rows = [{"project": "P", "repo": "app", "branch": "develop", "count": 1, "csv_path": str(path), "source": "live"}]
+    build_reports(rows, tmp_path, {"app": path}, base_name="r")
+    assert "## Commit analytics" in (tmp_path / "r.md").read_text(encoding="utf-8")
+    assert "Analytics" in openpyxl.load_workbook(tmp_path / "r.xlsx").sheetnames
@@ -0,0 +1,43 @@
+import csv
+import json
+
+from release_copilot.commands import audit_batch, audit_from_config
+from release_copilot.kit import caching
+
+
+def test_batch_shares_commit_fetches_and_writes_per_audit_folders(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+    a = tmp_path / "a.json"
+    a.write_text(json.dumps({"repos": {"P/r": "R", "P/s": "S"}, "develop_branch": "develop"}))
+    b = tmp_path / "b.json"
+    b.write_text(json.dumps({"repos": {"P/r": "R"}, "develop_branch": "develop"}))
+
+    fetched, searched = [], []
+
+    def fetch(project, repo, branch, since, until):
+        fetched.append((project, repo, branch))
+        return [{"id": f"{repo}1", "message": "ABC-1 fix", "authorTimestamp": 1},
+                {"id": f"{repo}2", "message": "chore", "authorTimestamp": 1}]
+
+    def search(jql, ttl_hours, force_refresh):
+        searched.append(jql)
+        return [{"key": "ABC-1", "fixVersions": ["1.0"]}, {"key": "ABC-2", "fixVersions": ["1.0"]},
+                {"key": "ABC-9", "fixVersions": ["2.0"]}]
+
+    monkeypatch.setattr(audit_from_config, "fetch_commits_window", fetch)
+    monkeypatch.setattr(audit_from_config, "validate_jql_or_raise", lambda jql: None)
+    monkeypatch.setattr(audit_from_config, "search_issues_cached", search)
+
+    out = tmp_path / "out"
+    audit_batch.main(["--config", str(a), "--config", str(b), "--fix-version", "1.0", "--fix-version", "2.0",
+                      "--develop-only", "--since", "2025-01-01", "--until", "2025-02-01",
+                      "--jql", 'fixVersion = "{fix_version}"', "--output-dir", str(out)])
+
+    assert sorted(fetched) == [("P", "r", "develop"), ("P", "s", "develop")]
+    assert searched == ['fixVersion in ("1.0", "2.0")']
+    with (out / "batch_summary.csv").open(encoding="utf-8") as f:
+        rows = {r["audit"]: r for r in csv.DictReader(f)}
+    assert set(rows) == {"a_1.0", "a_2.0", "b_1.0", "b_2.0"}
+    assert rows["a_1.0"]["commits"] == "4" and rows["a_1.0"]["missing_in_repo"] == "1"
+    assert rows["b_2.0"]["orphan_commits"] == "2"
+    assert (out / "b_2.0" / "missing_in_repo.csv").exists()
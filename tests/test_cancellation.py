@@ -0,0 +1,110 @@
+import json
+import sys
+import time
+
+import pytest
+
+from release_copilot.commands import audit_from_config
+from release_copilot.kit import caching, checkpoint
+from release_copilot.kit.cancellation import CancelToken, check_cancelled, current_token, request_timeout
+from release_copilot.kit.checkpoint import Checkpoint
+from release_copilot.kit.errors import Cancelled
+from release_copilot.tools import bitbucket_tools
+
+
+def test_token_cancel_deadline_and_parent():
+    check_cancelled()  # no token: no-op
+    assert request_timeout(10) == 10
+    parent = CancelToken()
+    with CancelToken(deadline_s=60, parent=parent) as token:
+        check_cancelled()
+        assert 0 < token.remaining() <= 60 and request_timeout(10) == 10
+        parent.cancel("stop button")
+        with pytest.raises(Cancelled, match="stop button"):
+            try:
+                check_cancelled()
+            except Exception:  # a best-effort handler must not swallow a cancel
+                pass
+    assert current_token() is None
+    short = CancelToken(deadline_s=0.01)
+    time.sleep(0.02)
+    assert short.reason == "deadline exceeded" and short.remaining() == 0.0
+
+
+def test_commit_pagination_stops_within_one_page(monkeypatch):
+    requests_made = []
+
+    class Resp:
+        ok, status_code, content = True, 200, b"{}"
+
+        def json(self):
+            return {"values": [{"id": "a", "authorTimestamp": 2_000_000_000_000}], "isLastPage": False,
+                    "nextPageStart": len(requests_made)}
+
+    class Session:
+        def get(self, url, **kw):
+            requests_made.append(kw["params"]["start"])
+            current_token().cancel("user")
+            return Resp()
+
+    monkeypatch.setattr(bitbucket_tools, "get_session", lambda name: Session())
+    from datetime import datetime, timezone
+
+    with CancelToken(), pytest.raises(Cancelled):
+        bitbucket_tools.fetch_commits_window("P", "r", "develop", datetime(2020, 1, 1, tzinfo=timezone.utc),
+                                             datetime(2040, 1, 1, tzinfo=timezone.utc))
+    assert requests_made == [0]
+
+
+def test_cancelled_audit_keeps_partial_results_and_resumes(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+    cfg = tmp_path / "cfg.json"
+    cfg.write_text(json.dumps({"repos": {"P/a": "A", "P/b": "B"}, "develop_branch": "develop"}))
+    fetched = []
+
+    def fetch(project, repo, *a):
+        check_cancelled()  # what the real paginator does before every page
+        fetched.append(repo)
+        if len(fetched) == 1:
+            current_token().cancel("stop button")
+        return [{"id": repo, "displayId": repo, "message": "ABC-1 fix"}]
+
+    monkeypatch.setattr(audit_from_config, "fetch_commits_window", fetch)
+    monkeypatch.setattr(audit_from_config, "validate_jql_or_raise", lambda jql: None)
+    monkeypatch.setattr(audit_from_config, "search_issues_cached", lambda jql, **kw: [{"key": "ABC-1"}])
+    out = tmp_path / "out"
+    monkeypatch.setattr(sys, "argv", ["audit", "--config", str(cfg), "--develop-only", "--output-dir", str(out),
+                                      "--jql", "project = ABC", "--no-daemon"])
+    res = audit_from_config.main()
+    assert res["incomplete"] == "stop button" and fetched == ["a"]
+    assert (out / "summary.csv").read_text(encoding="utf-8").count("\n") == 2  # header + repo a
+    cp = Checkpoint.resume(res["run_id"])
+    assert cp.completed == [] and cp.manifest["incomplete"] == "stop button"
+
+    monkeypatch.setattr(sys, "argv", ["audit", "--resume", res["run_id"], "--no-daemon"])
+    res = audit_from_config.main()
+    assert "incomplete" not in res and fetched == ["a", "b"]  # repo a comes from the cache
+    cp = Checkpoint.resume(res["run_id"])
+    assert cp.completed == ["collect", "compare"] and cp.manifest["incomplete"] is None
+
+
+def test_graph_run_past_deadline_returns_finished_steps(tmp_path, monkeypatch):
+    from release_copilot import app
+    from release_copilot.agents import git_historian, jira_analyst, report_writer
+
+    monkeypatch.setattr(checkpoint, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.setattr(jira_analyst, "collect_jira",
+                        lambda jql, fv: jira_analyst.JiraIssues(issues=[{"key": "ABC-1", "summary": "s", "status": "Done"}]))
+
+    def collect(project, repo, branch, since):
+        time.sleep(0.2)
+        check_cancelled()  # the next page
+        return git_historian.Commits(commits=[])
+
+    monkeypatch.setattr(git_historian, "collect_commits", collect)
+    monkeypatch.setattr(report_writer, "write_report", lambda *a: pytest.fail("report after the deadline"))
+    res = app.run_release_audit("1.0", "P", "a", "develop", deadline_s=0.1)
+    assert not res["ok"] and res["incomplete"] == "deadline exceeded"
+    assert res["counts"]["jira_total"] == 1 and res["counts"]["commits_total"] == 0
+    assert Checkpoint.resume(res["run_id"]).manifest["incomplete"] == "deadline exceeded"
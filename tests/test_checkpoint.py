@@ -0,0 +1,69 @@
+import json
+import sys
+
+import pytest
+
+from release_copilot.commands import audit_from_config
+from release_copilot.graph.scheduler import run_dag
+from release_copilot.graph.states import RunState
+from release_copilot.kit import caching, checkpoint
+from release_copilot.kit.checkpoint import Checkpoint
+from release_copilot.reporting import llm_summary
+
+
+def test_run_dag_replays_checkpointed_steps(tmp_path):
+    cp = Checkpoint(root=tmp_path)
+    calls = []
+
+    def step(field):
+        def run(state):
+            calls.append(field)
+            return {field: [{"key": field}]}
+        return run
+
+    handlers = {"a": step("jira_issues"), "b": step("commits")}
+    state = RunState(fix_version="1.0", project="P", repo="r", branch="develop")
+    cp.save("a", {"jira_issues": [{"key": "ABC-1"}]})
+
+    run_dag(state, ["a", "b"], {"b": ["a"]}, handlers, checkpoint=Checkpoint.resume(cp.run_id, root=tmp_path))
+    assert calls == ["commits"]
+    assert state.jira_issues == [{"key": "ABC-1"}]
+    assert Checkpoint.resume(cp.run_id, root=tmp_path).completed == ["a", "b"]
+
+
+def test_resume_unknown_run_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Checkpoint.resume("nope", root=tmp_path)
+
+
+def test_audit_resume_skips_completed_stages(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+    cfg = tmp_path / "cfg.json"
+    cfg.write_text(json.dumps({"repos": {"P/r": "R"}, "develop_branch": "develop"}))
+    fetches, searches = [], []
+    monkeypatch.setattr(audit_from_config, "fetch_commits_window",
+                        lambda *a: fetches.append(a) or [{"id": "abc", "displayId": "abc", "message": "ABC-1 fix"}])
+    monkeypatch.setattr(audit_from_config, "validate_jql_or_raise", lambda jql: None)
+    monkeypatch.setattr(audit_from_config, "search_issues_cached",
+                        lambda jql, **kw: searches.append(jql) or [{"key": "ABC-1"}, {"key": "ABC-2"}])
+
+    def boom(**kwargs):
+        raise RuntimeError("network down")
+
+    monkeypatch.setattr(llm_summary, "build_llm_summary", boom)
+    out = tmp_path / "out"
+    monkeypatch.setattr(sys, "argv", ["audit", "--config", str(cfg), "--develop-only", "--output-dir", str(out),
+                                      "--jql", "project = ABC", "--write-llm-summary"])
+    audit_from_config.main()
+    (run_id,) = [p.name for p in (tmp_path / "runs").iterdir()]
+    assert Checkpoint.resume(run_id).completed == ["collect", "compare"]
+
+    written = []
+    monkeypatch.setattr(llm_summary, "build_llm_summary",
+                        lambda **kw: written.append(kw["missing_preview"]) or out / "llm.md")
+    monkeypatch.setattr(sys, "argv", ["audit", "--resume", run_id])
+    audit_from_config.main()
+    assert len(fetches) == 1 and len(searches) == 1
+    assert [r["key"] for r in written[0]] == ["ABC-2"]
+    assert Checkpoint.resume(run_id).completed == ["collect", "compare", "llm_summary"]
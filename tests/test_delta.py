@@ -0,0 +1,69 @@
+import csv
+import json
+
+import pytest
+
+from release_copilot.commands import audit_from_config
+from release_copilot.kit import caching, checkpoint, history
+from release_copilot.reporting.delta import Snapshot, diff_snapshots, load_snapshot
+
+
+def _snap(run_id, missing, orphans, statuses, count):
+    return Snapshot.from_rows(
+        run_id,
+        [{"project": "P", "repo": "r", "branch": "develop", "count": count}],
+        [{"key": k, "summary": f"story {k}", "status": statuses[k]} for k in missing],
+        [{"project": "P", "repo": "r", "branch": "develop", "id": c, "message": f"{c} msg"} for c in orphans],
+        [{"key": k, "status": s, "commit": "c0"} for k, s in statuses.items() if k not in missing],
+    )
+
+
+def test_diff_reports_only_changes():
+    before = _snap("a", ["X-1", "X-2"], ["c1", "c2"], {"X-1": "Open", "X-2": "Open", "X-3": "Done"}, 5)
+    after = _snap("b", ["X-1", "X-4"], ["c2", "c3"], {"X-1": "In Review", "X-2": "Done", "X-3": "Done", "X-4": "Open"}, 7)
+    changes = {(r["change"], r.get("key") or r.get("commit") or r.get("repo")) for r in diff_snapshots(before, after)}
+    assert changes == {
+        ("newly_missing", "X-4"), ("newly_fixed", "X-2"), ("new_orphan", "c3"), ("resolved_orphan", "c1"),
+        ("status_change", "X-1"), ("status_change", "X-2"), ("count_change", "r"),
+    }
+    assert diff_snapshots(after, after) == []
+
+
+def test_load_snapshot_falls_back_to_history(tmp_path):
+    history.record_run("h1", "batch", ["1.0"], [{"project": "P", "repo": "r", "branch": "develop", "count": 3}],
+                       [{"key": "X-1", "summary": "s", "status": "Open"}],
+                       [{"project": "P", "repo": "r", "branch": "develop", "id": "c1", "message": "m"}],
+                       [{"key": "X-2", "status": "Done", "commit": "c2"}])
+    snap = load_snapshot("h1", runs_dir=tmp_path / "runs")
+    assert list(snap.missing) == ["X-1"] and list(snap.orphans) == ["r@develop:c1"]
+    assert snap.statuses == {"X-1": "Open", "X-2": "Done"} and snap.counts == {"P/r@develop": 3}
+
+
+def test_audit_diff_against_last_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+    cfg = tmp_path / "cfg.json"
+    cfg.write_text(json.dumps({"repos": {"P/r": "R"}, "develop_branch": "develop"}))
+    commits = [{"id": "c1", "displayId": "c1", "message": "ABC-1 fix"}]
+    monkeypatch.setattr(audit_from_config, "fetch_commits_window", lambda *a: list(commits))
+    monkeypatch.setattr(audit_from_config, "validate_jql_or_raise", lambda jql: None)
+    monkeypatch.setattr(audit_from_config, "search_issues_cached",
+                        lambda jql, **kw: [{"key": "ABC-1", "status": "Done"}, {"key": "ABC-2", "status": "Open"}])
+    out = tmp_path / "out"
+    argv = ["--config", str(cfg), "--develop-only", "--output-dir", str(out), "--jql", "project = ABC",
+            "--no-daemon", "--force-refresh"]
+    # Nothing comparable yet: a clear error before any work is done.
+    with pytest.raises(SystemExit, match="no earlier run"):
+        audit_from_config.main(argv + ["--diff-against", "last"])
+    first = audit_from_config.main(argv)
+    assert "delta_csv" not in first["artifacts"]
+    # A run with other fix versions is not a baseline for this one.
+    audit_from_config.main(argv + ["--fix-version", "2.0"])
+
+    commits.append({"id": "c2", "displayId": "c2", "message": "ABC-2 done"})
+    second = audit_from_config.main(argv + ["--diff-against", "last"])
+    assert f"Changes since run {first['run_id']}" in (out / "delta.md").read_text(encoding="utf-8")
+    with open(second["artifacts"]["delta_csv"], encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["change"], r["key"], r["after"]) for r in rows] == [("newly_fixed", "ABC-2", "Open"),
+                                                                     ("count_change", "", "2")]
@@ -0,0 +1,35 @@
+import json
+
+from release_copilot.commands import history as history_cli
+from release_copilot.kit import history
+
+
+def _record(run_id, fv, created, missing, orphans=0, db=None):
+    history.record_run(
+        run_id, "config", [fv],
+        [{"project": "P", "repo": "r", "branch": "develop", "count": 10}],
+        [{"key": k, "summary": f"story {k}", "status": "Open", "fixVersions": fv} for k in missing],
+        [{"project": "P", "repo": "r", "branch": "develop", "id": f"c{i}", "message": "chore"} for i in range(orphans)],
+        [{"key": "X-9", "project": "P", "repo": "r", "branch": "develop", "commit": "c9", "status": "Done"}],
+        created=created, db=db,
+    )
+
+
+def test_trend_queries(tmp_path, capsys):
+    db = tmp_path / "h.sqlite"
+    _record("r1", "1.0", "2025-01-01T00:00:00", ["X-1", "X-2"], orphans=1, db=db)
+    _record("r2", "2.0", "2025-02-01T00:00:00", ["X-1", "X-3"], orphans=2, db=db)
+    _record("r3", "3.0", "2025-03-01T00:00:00", ["X-1", "X-3"], orphans=5, db=db)
+    _record("r3b", "3.0", "2025-03-02T00:00:00", ["X-1"], orphans=4, db=db)  # rerun of 3.0 wins
+
+    assert [(r["key"], r["releases"]) for r in history.missing_across(last=3, db=db)] == [("X-1", 3)]
+    assert [r["key"] for r in history.missing_across(last=3, min_releases=2, db=db)] == ["X-1"]
+    assert [r["orphan_rate"] for r in history.orphan_rate("r", db=db)] == [0.1, 0.2, 0.5, 0.4]
+    assert {r["state"] for r in history.key_history("X-9", db=db)} == {"matched"}
+
+    # Re-recording a run id replaces it.
+    _record("r1", "1.0", "2025-01-01T00:00:00", [], db=db)
+    assert next(r for r in history.list_runs(db=db) if r["run_id"] == "r1")["missing"] == 0
+
+    history_cli.main(["--db", str(db), "--json", "missing", "--last", "2"])
+    assert [r["key"] for r in json.loads(capsys.readouterr().out)] == ["X-1"]
@@ -0,0 +1,35 @@
+"""Cold-start guard: CLI entry points must not import heavy optional deps or touch disk."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+HEAVY = ("langchain", "openpyxl", "openai", "streamlit", "yaml", "tiktoken")
+# Generous: a cold import is ~0.5 s here; langchain alone used to add ~0.9 s.
+BUDGET_MS = int(os.environ.get("IMPORT_BUDGET_MS", "1000"))
+
+
+def _importtime(module: str, cwd: Path) -> dict:
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = (p.strip() for p in line[len("import time:"):].split("|"))
+        if cum.isdigit():
+            cumulative[name] = int(cum)
+    return cumulative
+
+
+@pytest.mark.parametrize("module", ["release_copilot.commands.audit_from_config", "release_copilot.app"])
+def test_cli_import_is_light(module, tmp_path):
+    times = _importtime(module, tmp_path)
+    heavy = sorted(n for n in times if n.split(".")[0] in HEAVY)
+    assert heavy == [], f"{module} imports {heavy} at startup"
+    assert times[module] / 1000 < BUDGET_MS
+    assert list(tmp_path.iterdir()) == []  # no data/ or logs/ created on import
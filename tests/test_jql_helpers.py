@@ -1,6 +1,11 @@
 from types import SimpleNamespace
 
-from release_copilot.commands.audit_from_config import _clean_fix_version, resolve_jql
+from release_copilot.commands.audit_from_config import (
+    _clean_fix_version,
+    multi_fix_version_jql,
+    partition_by_fix_version,
+    resolve_jql,
+)
 
 
 def test_clean_fix_version_trims_quotes_and_space():
@@ -22,3 +27,18 @@ def test_resolve_jql_passthrough_jql():
     settings = SimpleNamespace(DEFAULT_JQL=None)
     jql = resolve_jql(args, settings)
     assert jql == 'project = ABC'
+
+
+def test_resolve_jql_widens_fix_version_clause_for_several_versions():
+    args = SimpleNamespace(jql=None, fix_version=["A 1", ' "B 2" ', "A 1"])
+    settings = SimpleNamespace(DEFAULT_JQL='fixVersion = "{fix_version}" AND issuetype != Epic')
+    assert resolve_jql(args, settings) == 'fixVersion in ("A 1", "B 2") AND issuetype != Epic'
+    assert multi_fix_version_jql('summary ~ "{fix_version}"', ["A", "B"]) is None
+
+
+def test_partition_by_fix_version_is_case_insensitive_and_allows_overlap():
+    issues = [{"key": "X-1", "fixVersions": ["r-1"]}, {"key": "X-2", "fixVersions": ["R-1", "r-2"]},
+              {"key": "X-3", "fixVersions": []}]
+    parts = partition_by_fix_version(issues, ["r-1", "r-2"])
+    assert [i["key"] for i in parts["r-1"]] == ["X-1", "X-2"]
+    assert [i["key"] for i in parts["r-2"]] == ["X-2"]
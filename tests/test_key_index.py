@@ -0,0 +1,35 @@
+from release_copilot.commands import check
+from release_copilot.kit import key_index
+from release_copilot.tools import bitbucket_tools
+
+
+def test_index_lookup_and_check(capsys):
+    key_index.index_commits("P", "r", "release/1", [
+        {"id": "a" * 40, "authorTimestamp": 1_700_000_000_000, "message": "ABC-1 fix"},
+        {"id": "b" * 40, "authorTimestamp": 1_700_000_100_000, "jira_keys": ["ABC-2", "ABC-1"]},
+    ])
+    key_index.index_commits("P", "r", "release/1", [{"id": "b" * 40, "jira_keys": ["ABC-2"]}])  # idempotent
+    key_index.index_commits("P", "r", "develop", [{"id": "c" * 40, "message": "ABC-3"}])
+
+    found = key_index.lookup(["ABC-1", "ABC-2", "ABC-9"])
+    assert [h["sha"][0] for h in found["ABC-1"]] == ["b", "a"]
+    assert len(found["ABC-2"]) == 1 and found["ABC-9"] == []
+    assert key_index.indexed_branches()[("P", "r", "release/1")] == 1_700_000_100_000
+
+    assert check.main(["abc-1", "--branch", "release/1"]) == 0
+    assert check.main(["ABC-3", "--branch", "release/1"]) == 1
+    assert "ABC-3: not found" in capsys.readouterr().out
+
+
+def test_refresh_fetches_only_affected_branches_since_indexed_head(monkeypatch):
+    key_index.index_commits("P", "r", "release/1", [{"id": "a", "authorTimestamp": 1_700_000_000_000, "message": "XY-1"}])
+    key_index.index_commits("P", "r", "develop", [{"id": "b", "authorTimestamp": 1_700_000_000_000, "message": "XY-2"}])
+    calls = []
+
+    def fetch(project, repo, branch, since, until):
+        calls.append((branch, int(since.timestamp() * 1000)))
+        return [{"id": "n", "authorTimestamp": 1_700_000_500_000, "message": "XY-3"}]
+
+    monkeypatch.setattr(bitbucket_tools, "fetch_commits_window", fetch)
+    assert check.main(["XY-3", "--branch", "release/1", "--refresh"]) == 0
+    assert calls == [("release/1", 1_700_000_000_000)]
@@ -0,0 +1,50 @@
+import time
+
+from release_copilot.indexes import bm25
+from release_copilot.indexes.build_knowledge_index import build_index
+
+
+def _docs(root):
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "payments.md").write_text(
+        "# Payments runbook\n\nAfter any gateway change, smoke-test refunds and partial captures.\n\n"
+        "Rollback: disable the new gateway flag.\n", encoding="utf-8")
+    (root / "claims.md").write_text("# Claims\n\nClaim intake depends on the policy search service.\n",
+                                    encoding="utf-8")
+    for i in range(5):  # enough files for the process pool
+        (root / f"note{i}.txt").write_text(f"release note {i} about dashboards and reports\n", encoding="utf-8")
+
+
+def test_bm25_ranks_and_builds_incrementally(tmp_path):
+    src, idx = tmp_path / "knowledge", tmp_path / "index"
+    _docs(src)
+    first = build_index(src, include_outputs=False, index_dir=idx)
+    assert first["files"] == 7 and first["analyzed"] == 7
+
+    hits = bm25.search("gateway refunds", index_dir=idx)
+    assert hits[0]["source"].endswith("payments.md") and "refunds" in hits[0]["text"]
+    assert len(bm25.search("release dashboards", index_dir=idx)) == 3
+    assert bm25.search("nothing matches zzz", index_dir=idx) == []
+
+    assert build_index(src, include_outputs=False, index_dir=idx)["analyzed"] == 0
+    time.sleep(0.01)
+    (src / "claims.md").write_text("# Claims\n\nClaim intake now calls the fraud scoring service.\n", encoding="utf-8")
+    (src / "note0.txt").unlink()
+    again = build_index(src, include_outputs=False, index_dir=idx)
+    assert again["analyzed"] == 1 and again["files"] == 6
+    assert bm25.search("fraud scoring", index_dir=idx)[0]["source"].endswith("claims.md")
+    assert not any(h["source"].endswith("note0.txt") for h in bm25.search("release note", k=10, index_dir=idx))
+
+
+def test_file_overwritten_with_known_content_is_reindexed(tmp_path):
+    src, idx = tmp_path / "knowledge", tmp_path / "index"
+    src.mkdir()
+    (src / "a.md").write_text("# A\n\nalpha rollback steps for the ledger\n", encoding="utf-8")
+    (src / "b.md").write_text("# B\n\nbeta smoke tests for claims\n", encoding="utf-8")
+    build_index(src, include_outputs=False, index_dir=idx)
+    time.sleep(0.01)
+    # a.md now holds b.md's text: its analysis exists, but a.md's postings must change.
+    (src / "a.md").write_text((src / "b.md").read_text(encoding="utf-8"), encoding="utf-8")
+    assert build_index(src, include_outputs=False, index_dir=idx)["analyzed"] == 0
+    assert bm25.search("alpha rollback", index_dir=idx) == []
+    assert {h["source"].rsplit("/", 1)[-1] for h in bm25.search("beta smoke", k=5, index_dir=idx)} == {"a.md", "b.md"}
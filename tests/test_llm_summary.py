@@ -0,0 +1,244 @@
+import csv
+from datetime import datetime, timezone
+
+from release_copilot.kit import caching
+from release_copilot.kit.cost_meter import MODEL_PRICES, CostSession, context_window
+from release_copilot.reporting import llm_summary
+from release_copilot.reporting.llm_providers import LLMResult, StubProvider
+from release_copilot.reporting.llm_summary import _make_prompt, count_tokens, pack_context
+
+
+def _ctx():
+    return {
+        "fix_version": "1.0",
+        "window": {"start": "2025-01-01", "end": "2025-02-01"},
+        "branches": "release/r-1",
+        "repos": [
+            {"project": "P", "repo": "a", "branch": "b", "count": 3, "highlights": [
+                {"display": f"a{i}", "line": f"feat: thing {i} " + "x" * 40} for i in range(10)
+            ]},
+            {"project": "P", "repo": "b", "branch": "b", "count": 3, "highlights": [
+                {"display": f"b{i}", "line": f"feat: other {i} " + "y" * 40} for i in range(10)
+            ]},
+        ],
+        "missing": [{"key": "ABC-1", "summary": "Open story", "status": "In Progress"}],
+    }
+
+
+def test_pack_context_respects_budget():
+    ctx = _ctx()
+    packed, tokens = pack_context(ctx, budget_tokens=500)
+    system, user = _make_prompt(packed)
+    assert tokens <= 500
+    assert count_tokens(system) + count_tokens(user) <= tokens
+    kept = sum(len(r["highlights"]) for r in packed["repos"])
+    assert 0 < kept < 20
+
+
+def test_pack_context_interleaves_repos_and_keeps_missing():
+    packed, _ = pack_context(_ctx(), budget_tokens=500)
+    a, b = (len(r["highlights"]) for r in packed["repos"])
+    assert abs(a - b) <= 1
+    assert packed["missing"][0]["key"] == "ABC-1"
+
+
+
+def test_large_gap_lists_are_cut_before_packing(monkeypatch):
+    missing = [{"key": f"ABC-{i}", "summary": "Story", "status": "Done" if i % 2 else "Open"} for i in range(5000)]
+    orphans = [{"repo": "a", "displayId": f"{i:010x}", "line": f"chore: tidy {i}"} for i in range(5000)]
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    ctx = llm_summary.build_context([], {}, (now, now), "develop", "1.0",
+                                    missing_preview=missing, orphan_preview=orphans)
+    assert len(ctx["missing"]) == len(ctx["orphans"]) == llm_summary.MAX_GAP_CANDIDATES
+    # Open issues outrank done ones; ties keep the original order.
+    assert [m["key"] for m in ctx["missing"][:2]] == ["ABC-0", "ABC-2"]
+
+    calls = []
+    monkeypatch.setattr(llm_summary, "count_tokens", lambda text, model="": calls.append(1) or len(text) // 4 + 1)
+    packed, tokens = pack_context(ctx, budget_tokens=2000)
+    assert tokens <= 2000 and len(calls) <= 2 * llm_summary.MAX_GAP_CANDIDATES + 10
+
+def _write_commits(path, lines):
+    with path.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=["repo", "displayId", "message"])
+        w.writeheader()
+        for i, line in enumerate(lines):
+            w.writerow({"repo": path.stem, "displayId": f"{path.stem}{i}", "message": line})
+
+
+def test_map_reduce_only_resummarizes_changed_repo(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+    calls = []
+
+    class CountingProvider(StubProvider):
+        def complete(self, model, system, user, max_tokens, on_delta=None):
+            calls.append(user)
+            return super().complete(model, system, user, max_tokens, on_delta)
+
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    _write_commits(a, ["feat: add quotes", "fix: rounding"])
+    _write_commits(b, ["feat: claims export"])
+    rows = [{"project": "P", "repo": "a", "branch": "develop", "count": 2, "csv_path": str(a)},
+            {"project": "P", "repo": "b", "branch": "develop", "count": 1, "csv_path": str(b)}]
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def run():
+        return llm_summary.build_llm_summary(rows, tmp_path, (now, now), "develop", {}, mode="map-reduce",
+                                             provider=CountingProvider())
+
+    run()
+    assert len(calls) == 3  # two repos + reduce
+    _write_commits(b, ["feat: claims export", "fix: claims totals"])
+    rows[1]["count"] = 2
+    run()
+    assert len(calls) == 5  # only repo b + reduce
+
+
+
+def test_map_reduce_share_does_not_move_with_repo_count(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(llm_summary, "MAP_CONTEXT_TOKENS", 250)
+    calls = []
+
+    class CountingProvider(StubProvider):
+        def complete(self, model, system, user, max_tokens, on_delta=None):
+            calls.append(user)
+            return super().complete(model, system, user, max_tokens, on_delta)
+
+    words = ["quotes", "claims", "billing", "ledger", "refunds", "payouts", "tax", "export",
+             "import", "audit", "search", "alerts", "reports", "users", "roles"]
+    rows = []
+    for repo in ("a", "b", "c"):
+        p = tmp_path / f"{repo}.csv"
+        # More highlights than a 250-token share holds, so the share decides what is packed.
+        _write_commits(p, [f"feat({w}): " + " ".join(f"{w}{repo}{k}" for k in range(6)) for w in words])
+        rows.append({"project": "P", "repo": repo, "branch": "develop", "count": 15, "csv_path": str(p)})
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def run(n):
+        return llm_summary.build_llm_summary(rows[:n], tmp_path, (now, now), "develop", {}, mode="map-reduce",
+                                             max_context_tokens=1500, provider=CountingProvider())
+
+    run(2)
+    assert len(calls) == 3
+    run(3)
+    assert len(calls) == 5  # only the new repo + reduce
+
+def test_select_highlights_collapses_near_duplicates(tmp_path):
+    p = tmp_path / "r.csv"
+    _write_commits(p, ["Merge pull request #1 in P/r from a to develop"] * 5 + ["feat: add export", "fix: rounding"])
+    hl = llm_summary.select_highlights(p, top_n=10)
+    assert len(hl) == 3
+    merge = [h for h in hl if h["line"].startswith("Merge")][0]
+    assert merge["count"] == 5
+
+
+def test_select_highlights_keeps_distinct_keys_apart():
+    rows = [{"message": "MOBI-101 Add premium rounding to quote"},
+            {"message": "MOBI-202 Add premium rounding to quote"},
+            {"message": "MOBI-101 follow-up"}]
+    hl = llm_summary.select_highlights(rows, top_n=10)
+    by_key = {h["key"]: h for h in hl}
+    assert set(by_key) == {"MOBI-101", "MOBI-202"}
+    assert by_key["MOBI-101"]["count"] == 2 and "count" not in by_key["MOBI-202"]
+
+
+def test_build_context_reads_each_branch_csv_once(tmp_path, monkeypatch):
+    rel, dev = tmp_path / "rel.csv", tmp_path / "dev.csv"
+    _write_commits(rel, ["feat: release only"])
+    _write_commits(dev, ["feat: develop only"])
+    reads = []
+    real_iter = llm_summary._iter_csv_rows
+    monkeypatch.setattr(llm_summary, "_iter_csv_rows", lambda p: reads.append(p) or real_iter(p))
+    rows = [{"repo": "r", "branch": "release", "csv_path": str(rel)},
+            {"repo": "r", "branch": "develop", "csv_path": str(dev)},
+            {"repo": "r", "branch": "develop", "csv_path": str(dev)}]
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    ctx = llm_summary.build_context(rows, {"r": dev}, (now, now), "both", None)
+    assert [r["highlights"][0]["line"] for r in ctx["repos"]] == ["feat: release only", "feat: develop only", "feat: develop only"]
+    assert len(reads) == 2
+
+
+def test_streamed_summary_reaches_callback_file_and_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+
+    class ChunkProvider(StubProvider):
+        def complete(self, model, system, user, max_tokens, on_delta=None):
+            for piece in ["## Release", " narrative"]:
+                on_delta(piece)
+            return LLMResult("## Release narrative", 10, 3, 0.0)
+    p = tmp_path / "r.csv"
+    _write_commits(p, ["feat: add export"])
+    rows = [{"project": "P", "repo": "r", "branch": "develop", "count": 1, "csv_path": str(p)}]
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    seen = []
+    md = llm_summary.build_llm_summary(rows, tmp_path, (now, now), "develop", {}, on_delta=seen.append, provider=ChunkProvider())
+    assert seen == ["## Release", " narrative"]
+    assert md.read_text(encoding="utf-8") == "## Release narrative"
+
+    # Cached rerun replays the final text once.
+    seen.clear()
+    llm_summary.build_llm_summary(rows, tmp_path, (now, now), "develop", {}, on_delta=seen.append, provider=ChunkProvider())
+    assert seen == ["## Release narrative"]
+
+
+def test_failed_streamed_run_keeps_previous_narrative(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+
+    class FailingProvider(StubProvider):
+        def complete(self, model, system, user, max_tokens, on_delta=None):
+            on_delta("## Half a narr")
+            raise RuntimeError("connection reset")
+    p = tmp_path / "r.csv"
+    _write_commits(p, ["feat: add export"])
+    rows = [{"project": "P", "repo": "r", "branch": "develop", "count": 1, "csv_path": str(p)}]
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    md = tmp_path / "release_audit_llm.md"
+    md.write_text("previous good narrative", encoding="utf-8")
+    for kwargs in ({"provider": FailingProvider()}, {"provider": "stub", "budget_cents": 0}):
+        try:
+            llm_summary.build_llm_summary(rows, tmp_path, (now, now), "develop", {}, stream=True, **kwargs)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("expected the run to fail")
+        assert md.read_text(encoding="utf-8") == "previous good narrative"
+        assert not (tmp_path / "release_audit_llm.md.part").exists()
+
+
+def test_stub_provider_usage_is_recorded_and_budget_enforced(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+    p = tmp_path / "r.csv"
+    _write_commits(p, ["feat: add export", "fix: rounding"])
+    rows = [{"project": "P", "repo": "r", "branch": "develop", "count": 2, "csv_path": str(p)}]
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with CostSession() as cost:
+        md = llm_summary.build_llm_summary(rows, tmp_path, (now, now), "develop", {}, provider="stub")
+    assert "feat: add export" in md.read_text(encoding="utf-8")
+    assert len(cost.steps) == 1
+    assert cost.steps[0].prompt_tokens > 0 and cost.steps[0].completion_tokens > 0
+
+    # gpt-4o at $0.01/1K: a 1¢ budget cannot cover the 1200-token completion.
+    try:
+        llm_summary.build_llm_summary(rows, tmp_path, (now, now), "develop", {}, model="gpt-4o",
+                                      budget_cents=1, provider="stub")
+    except RuntimeError as e:
+        assert "budget" in str(e)
+    else:
+        raise AssertionError("expected budget error")
+
+
+
+def test_default_budget_never_exceeds_the_context_window():
+    for model in MODEL_PRICES:
+        prompt = llm_summary.budget_to_prompt_tokens(10, 1200, model)
+        assert 0 < prompt and prompt + 1200 <= context_window(model)
+    assert llm_summary.budget_to_prompt_tokens(10_000, 1200, "some-unknown-model") + 1200 <= context_window("some-unknown-model")
+    # At gpt-4o-mini's price 10¢ would buy ~665k tokens; the window is the binding limit.
+    assert llm_summary.budget_to_prompt_tokens(10, 1200) == context_window("gpt-4o-mini") - 1200
+
+def test_pack_context_includes_runbook_snippets_within_budget():
+    ctx = {**_ctx(), "runbook": ["[runbooks/payments.md] Always smoke-test refunds after a gateway change."]}
+    packed, tokens = pack_context(ctx, budget_tokens=500)
+    assert packed["runbook"] == ctx["runbook"] and tokens <= 500
+    assert "runbook" in _make_prompt(packed)[1]
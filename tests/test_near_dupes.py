@@ -0,0 +1,19 @@
+from release_copilot.kit.near_dupes import NearDuplicateIndex
+
+
+def test_near_duplicates_share_cluster():
+    idx = NearDuplicateIndex()
+    a = idx.add("Merge pull request #123 in STAR/pc from feature/MOBI-1 to develop")
+    b = idx.add("Merge pull request #456 in STAR/pc from feature/MOBI-22 to develop")
+    c = idx.add("fix typo")
+    d = idx.add("Fix  typo")
+    assert a == b
+    assert c == d
+    assert a != c
+    assert idx.sizes[a] == 2 and len(idx) == 2
+
+
+def test_distinct_lines_stay_apart():
+    idx = NearDuplicateIndex()
+    ids = {idx.add(t) for t in ["Add premium rounding", "Refactor claims export", "Bump log4j"]}
+    assert len(ids) == 3
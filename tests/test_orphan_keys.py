@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from release_copilot.commands.audit_from_config import _orphan_class, classify_orphan_keys
+from release_copilot.kit import caching
+from release_copilot.tools import jira_tools
+
+
+def test_classify_orphan_keys_batches_key_and_parent_lookups():
+    jira = {
+        "MOBI-2": {"key": "MOBI-2", "parent": "MOBI-1", "fixVersions": []},
+        "MOBI-3": {"key": "MOBI-3", "parent": "MOBI-9", "fixVersions": []},
+        "MOBI-4": {"key": "MOBI-4", "fixVersions": ["R 2"]},
+        "MOBI-5": {"key": "MOBI-5", "issuetype": "Tech Story", "status": "Done", "fixVersions": ["r 1"]},
+        "MOBI-9": {"key": "MOBI-9", "fixVersions": ["R 0"]},
+    }
+    calls = []
+
+    def resolve(keys):
+        calls.append(keys)
+        return {k: jira.get(k) for k in keys}
+
+    classes = classify_orphan_keys({"MOBI-2", "MOBI-3", "MOBI-4", "MOBI-5", "NOPE-1"},
+                                   [{"key": "MOBI-1"}], ["R 1"], resolve)
+    assert calls == [["MOBI-2", "MOBI-3", "MOBI-4", "MOBI-5", "NOPE-1"], ["MOBI-9"]]
+    assert classes == {
+        "MOBI-2": ("sub-task of in-scope story", "MOBI-1"),
+        "MOBI-3": ("different fixVersion", "R 0"),
+        "MOBI-4": ("different fixVersion", "R 2"),
+        "MOBI-5": ("excluded by JQL", "Tech Story, Done"),
+        "NOPE-1": ("nonexistent", ""),
+    }
+    assert _orphan_class("NOPE-1;MOBI-2", classes) == ("sub-task of in-scope story", "MOBI-2: MOBI-1")
+    assert _orphan_class("", classes) == ("no key", "")
+
+
+def test_fetch_issues_by_keys_chunks_and_caches_per_key(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(jira_tools, "_get_oauth", lambda: SimpleNamespace(session=lambda: None))
+    searches = []
+
+    def search(s, jql, start_at=0, fields=jira_tools.FIELDS, **extra):
+        searches.append((jql, extra))
+        keys = jql[len("key in ("):-1].split(", ")
+        issues = [{"key": k, "fields": {"parent": {"key": "P-1"}}} for k in keys if not k.startswith("NOPE")]
+        return {"issues": issues, "total": len(issues)}
+
+    monkeypatch.setattr(jira_tools, "_search_once", search)
+    out = jira_tools.fetch_issues_by_keys(["A-1", "A-2", "NOPE-1", "A-1"], chunk_size=2)
+    assert searches == [("key in (A-1, A-2)", {"validateQuery": "warn"}), ("key in (NOPE-1)", {"validateQuery": "warn"})]
+    assert out["A-2"]["parent"] == "P-1" and out["NOPE-1"] is None
+
+    again = jira_tools.fetch_issues_by_keys(["A-2", "NOPE-1", "A-3"])
+    assert searches[-1][0] == "key in (A-3)" and len(searches) == 3
+    assert again["NOPE-1"] is None and again["A-3"]["key"] == "A-3"
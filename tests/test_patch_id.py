@@ -0,0 +1,106 @@
+import csv
+import subprocess
+from types import SimpleNamespace
+
+from release_copilot.commands import audit_from_config
+from release_copilot.kit import patch_id
+
+DIFF_A = """diff --git a/app.py b/app.py
+index 111..222 100644
+--- a/app.py
++++ b/app.py
+@@ -10,3 +10,4 @@ def main():
+     run()
++    log("done")
+-    exit(1)
+"""
+DIFF_B = """diff --git a/README b/README
+--- a/README
++++ b/README
+@@ -1 +1 @@
+-old
++new
+"""
+
+
+def test_patch_id_ignores_position_whitespace_and_file_order():
+    moved = DIFF_A.replace("@@ -10,3 +10,4 @@", "@@ -42,3 +42,4 @@").replace('log("done")', 'log( "done" )')
+    assert patch_id.patch_id(DIFF_A) == patch_id.patch_id(moved)
+    assert patch_id.patch_id(DIFF_A + DIFF_B) == patch_id.patch_id(DIFF_B + DIFF_A)
+    assert patch_id.patch_id(DIFF_A) != patch_id.patch_id(DIFF_A.replace("done", "finished"))
+    assert patch_id.patch_id("") is None
+
+
+
+def test_patch_id_counts_hunk_lines_that_look_like_file_headers():
+    sql = """diff --git a/q.sql b/q.sql
+--- a/q.sql
++++ b/q.sql
+@@ -1,2 +1,1 @@
+--- drop the legacy view
+ SELECT 1;
+"""
+    other = sql.replace("--- drop the legacy view", "--- keep the legacy view")
+    assert patch_id.patch_id(sql) is not None
+    assert patch_id.patch_id(sql) != patch_id.patch_id(other)
+    added = sql.replace("--- drop", "+++ drop").replace("-1,2 +1,1", "-1,1 +1,2")
+    assert patch_id.patch_id(added) not in (None, patch_id.patch_id(sql))
+
+def test_patch_ids_cached_by_sha(tmp_path):
+    calls = []
+    fetch = lambda sha: calls.append(sha) or DIFF_A  # noqa: E731
+    first = patch_id.patch_ids(["a", "b", "a"], fetch, db=tmp_path / "p.sqlite")
+    again = patch_id.patch_ids(["a", "b"], fetch, db=tmp_path / "p.sqlite")
+    assert sorted(calls) == ["a", "b"] and first == again
+
+
+def _git(repo, *args):
+    return subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True, text=True).stdout.strip()
+
+
+def _commit_row(repo, branch, sha):
+    return {"project": "P", "repo": "r", "branch": branch, "id": sha, "displayId": sha[:7],
+            "message": _git(repo, "log", "-1", "--format=%s", sha), "authorTimestamp": "0"}
+
+
+def test_cherry_picks_grouped_across_branches_from_mirror(tmp_path, monkeypatch):
+    repo = tmp_path / "mirrors" / "P" / "r"
+    repo.mkdir(parents=True)
+    _git(repo, "init", "-q", "-b", "develop")
+    _git(repo, "config", "user.email", "dev@example.com")
+    _git(repo, "config", "user.name", "dev")
+    (repo / "a.txt").write_text("one\n")
+    _git(repo, "add", "a.txt")
+    _git(repo, "commit", "-qm", "base")
+    _git(repo, "checkout", "-qb", "release")
+    _git(repo, "checkout", "-q", "develop")
+    (repo / "b.txt").write_text("fix\n")
+    _git(repo, "add", "b.txt")
+    _git(repo, "commit", "-qm", "MOBI-1 fix")
+    fix = _git(repo, "rev-parse", "HEAD")
+    (repo / "c.txt").write_text("other\n")
+    _git(repo, "add", "c.txt")
+    _git(repo, "commit", "-qm", "develop only")
+    other = _git(repo, "rev-parse", "HEAD")
+    _git(repo, "checkout", "-q", "release")
+    (repo / "a.txt").write_text("one\ntwo\n")
+    _git(repo, "commit", "-qam", "release prep")
+    _git(repo, "cherry-pick", fix)
+    picked = _git(repo, "rev-parse", "HEAD")
+
+    out = tmp_path / "out"
+    summary_rows = []
+    for branch, shas in (("develop", [other, fix]), ("release", [picked])):
+        path = out / f"commits_{branch}.csv"
+        audit_from_config._write_commits_csv(path, [], "P", "r", branch)
+        fields = open(path, encoding="utf-8").readline().strip().split(",")
+        audit_from_config._write_csv(path, fields, [_commit_row(repo, branch, s) for s in shas])
+        summary_rows.append({"project": "P", "repo": "r", "branch": branch, "csv_path": str(path)})
+    monkeypatch.setattr(audit_from_config, "get_settings", lambda: SimpleNamespace(git_mirror_root=str(tmp_path / "mirrors")))
+
+    path = audit_from_config._detect_equivalents(SimpleNamespace(patch_id_workers=2), summary_rows, out)
+    groups = list(csv.DictReader(open(path, encoding="utf-8")))
+    assert {(g["branch"], g["id"]) for g in groups} == {("develop", fix), ("release", picked)}
+    assert {g["cherry_pick"] for g in groups} == {"yes"}
+    develop = {r["id"]: r for r in csv.DictReader(open(out / "commits_develop.csv", encoding="utf-8"))}
+    assert develop[fix]["equivalent_to"] == f"release@{picked[:7]}" and develop[other]["equivalent_to"] == ""
@@ -0,0 +1,29 @@
+import pstats
+import threading
+
+from release_copilot.kit.profiling import Profiler
+from release_copilot.kit.tracing import Tracer, span
+
+
+def _busy_in_worker():
+    total = 0
+    for i in range(100_000):
+        total += i * i
+    return total
+
+
+def test_profiler_covers_threads_and_stage_memory(tmp_path):
+    with Profiler(tmp_path, interval_s=0.001, memory=True) as prof, Tracer(track_memory=True) as tracer:
+        with span("stage.alloc"):
+            blob = [bytearray(1024) for _ in range(4096)]  # ~4 MB
+            del blob
+        t = threading.Thread(target=_busy_in_worker)
+        t.start()
+        t.join()
+
+    assert set(prof.outputs) == {"pstats", "top", "collapsed", "memory"}
+    funcs = {name for (_, _, name) in pstats.Stats(str(prof.outputs["pstats"])).stats}
+    assert "_busy_in_worker" in funcs
+    assert "_busy_in_worker" in prof.outputs["collapsed"].read_text()
+    (stage,) = [r for r in tracer.summary() if r["name"] == "stage.alloc"]
+    assert stage["mem_peak_mb"] >= 4
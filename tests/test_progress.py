@@ -0,0 +1,38 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from release_copilot.graph.scheduler import run_dag
+from release_copilot.graph.states import RunState
+from release_copilot.kit.progress import ProgressBus, ProgressState, emit
+
+
+def test_events_reach_open_bus_from_pools_and_logs_are_forwarded():
+    emit("ignored", done=1)  # no bus: no-op
+    log = logging.getLogger("release_copilot.test")
+    log.setLevel(logging.INFO)
+    with ProgressBus() as bus:
+        with ThreadPoolExecutor(2) as pool:
+            for f in [pool.submit(copy_context().run, emit, "jira", done=i, total=2) for i in (1, 2)]:
+                f.result()
+        log.info("page fetched")
+    log.info("after the run")  # bus closed: not forwarded
+    events = bus.drain()
+    assert sorted(e.done for e in events if e.stage == "jira") == [1, 2]
+    assert [e.message for e in events if e.status == "log"][0].endswith("page fetched")
+    assert len(events) == 3 and bus.drain() == [] and bus.wait(timeout=0.01) == []
+
+    state = ProgressState()
+    assert state.apply(events) and not state.apply([])
+    assert state.fraction("jira") in (0.5, 1.0) and list(state.logs)[0].endswith("page fetched")
+
+
+def test_run_dag_reports_steps():
+    state = RunState(fix_version="r1", project="P", repo="app", branch="develop")
+    handlers = {"a": lambda s: None, "b": lambda s: None}
+    with ProgressBus(forward_logs=False) as bus:
+        run_dag(state, ["a", "b"], {"b": ["a"]}, handlers)
+    progress = ProgressState()
+    progress.apply(bus.drain())
+    assert progress.stages["step.a"].status == "done" and progress.stages["step.b"].status == "done"
+    assert progress.fraction("pipeline") == 1.0
@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+from release_copilot.graph.scheduler import run_dag
+from release_copilot.graph.states import RunState
+
+
+def _state():
+    return RunState(fix_version="1.0", project="P", repo="r", branch="develop")
+
+
+def test_independent_steps_overlap_and_dependents_wait():
+    def slow(field):
+        def step(state):
+            time.sleep(0.3)
+            return {field: [{"key": field}]}
+        return step
+
+    def compare(state):
+        return {"matches": state.jira_issues + state.commits}
+
+    handlers = {"a": slow("jira_issues"), "b": slow("commits"), "compare": compare}
+    started = time.time()
+    state = run_dag(_state(), ["a", "b", "compare"], {"compare": ["a", "b"]}, handlers)
+    assert time.time() - started < 0.55
+    assert len(state.matches) == 2
+    assert state.step_timings["compare"]["start"] >= max(state.step_timings[s]["end"] for s in ("a", "b"))
+
+
+def test_failed_step_stops_dependents():
+    ran = []
+
+    def boom(state):
+        raise RuntimeError("boom")
+
+    handlers = {"a": boom, "b": lambda s: ran.append("b")}
+    with pytest.raises(RuntimeError, match="boom"):
+        run_dag(_state(), ["a", "b"], {"b": ["a"]}, handlers)
+    assert ran == []
@@ -0,0 +1,141 @@
+import json
+import os
+import stat
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from release_copilot.commands.serve import AuditServer, _Buffer
+from release_copilot.kit import caching
+from release_copilot.kit.daemon_client import DaemonClient, DaemonError
+from release_copilot.kit.cancellation import check_cancelled
+from release_copilot.kit.errors import Cancelled
+from release_copilot.kit.progress import emit
+
+
+@pytest.fixture
+def server(tmp_path):
+    report = tmp_path / "report.md"
+
+    def fake_config(job):
+        print("collecting", " ".join(job.payload["argv"]))
+        emit("collect", done=1, total=2)
+        # Output from unrelated threads must not leak into the job's console.
+        other = threading.Thread(target=print, args=("daemon chatter",))
+        other.start()
+        other.join()
+        report.write_text("# audit\n")
+        return {"run_id": "r1", "artifacts": {"markdown": str(report)}}
+
+    def fake_graph(job):
+        for piece in ("Hello ", "world"):
+            job.narrative.write(piece)
+        raise RuntimeError("jira down")
+
+    def fake_slow(job):
+        try:
+            while True:  # a paginator that checks between pages
+                check_cancelled()
+                time.sleep(0.01)
+        except Cancelled as e:
+            return {"incomplete": str(e)}
+
+    srv = AuditServer(port=0, runners={"config": fake_config, "graph": fake_graph, "slow": fake_slow})
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+
+
+def test_submit_poll_and_download(server):
+    client = DaemonClient.discover(server.url)
+    assert client is not None
+
+    out, events = [], []
+    st = client.wait(client.submit("config", argv=["--config", "c.json"]), on_output=out.append, poll_s=0.01,
+                     on_progress=events.append)
+    assert st["status"] == "done"
+    assert [(e["stage"], e["done"], e["total"]) for e in events] == [("collect", 1, 2)]
+    assert "collecting --config c.json" in "".join(out)
+    assert "daemon chatter" not in "".join(out)
+    assert st["result"]["run_id"] == "r1"
+    assert client.artifact(st["id"], "markdown") == b"# audit\n"
+    with pytest.raises(Exception):
+        client.artifact(st["id"], "excel")
+
+
+def test_failed_job_keeps_streamed_narrative(server):
+    client = DaemonClient(server.url)
+    narrative = []
+    st = client.wait(client.submit("graph", kwargs={}), on_narrative=narrative.append, poll_s=0.01)
+    assert st["status"] == "failed" and "jira down" in st["error"]
+    assert "".join(narrative) == "Hello world"
+    with pytest.raises(DaemonError):
+        client.submit("nope")
+
+
+def test_cancel_stops_running_job_with_partial_result(server):
+    client = DaemonClient(server.url)
+    st = client.wait(client.submit("slow"), poll_s=0.01, cancelled=lambda: True)
+    assert st["status"] == "done" and st["result"] == {"incomplete": "cancelled by client"}
+
+
+
+
+def test_requests_need_token_json_and_no_origin(server, tmp_path):
+    assert stat.S_IMODE(server.token_file.stat().st_mode) == 0o600
+
+    def post(headers):
+        req = urllib.request.Request(server.url + "/audits", data=b'{"kind": "config", "argv": []}',
+                                     method="POST", headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=5) as resp:
+                return resp.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    auth = {"Authorization": f"Bearer {server.token}"}
+    assert post({"Content-Type": "application/json"}) == 401
+    assert post({**auth, "Content-Type": "text/plain"}) == 415
+    assert post({**auth, "Content-Type": "application/json", "Origin": "https://example.com"}) == 403
+    assert post({**auth, "Content-Type": "application/json"}) == 202
+    # Only a daemon serving the caller's directory is used.
+    assert DaemonClient.discover(server.url, cwd=os.getcwd()) is not None
+    assert DaemonClient.discover(server.url, cwd=tmp_path) is None
+
+def test_buffer_reads_only_past_the_offset():
+    buf = _Buffer()
+    for piece in ("ab", "", "cde", "f"):
+        buf.write(piece)
+    assert buf.read_from(0) == ("abcdef", 6)
+    assert buf.read_from(3) == ("def", 6)
+    assert buf.read_from(5) == ("f", 6)
+    assert buf.read_from(6) == ("", 6)
+
+def test_discover_returns_none_without_daemon():
+    free = AuditServer(port=0, runners={})
+    url = free.url
+    free.shutdown()
+    assert DaemonClient.discover(url, probe_timeout=0.2) is None
+
+
+def test_memory_cache_skips_rereading(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path)
+    caching.enable_memory_cache()
+    try:
+        data, src = caching.load_cache_or_call("k", 1, lambda: {"v": 1})
+        assert src == "api"
+        path = caching._cache_path("k")
+        mtime = path.stat().st_mtime_ns
+        # Same mtime, different content on disk: the memo wins.
+        path.write_text(json.dumps({"ts": time.time(), "data": {"v": 2}}))
+        os.utime(path, ns=(mtime, mtime))
+        assert caching.load_cache_or_call("k", 1, lambda: None) == ({"v": 1}, "cache")
+        # A newer file is re-read.
+        os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+        assert caching.load_cache_or_call("k", 1, lambda: None) == ({"v": 2}, "cache")
+    finally:
+        caching.disable_memory_cache()
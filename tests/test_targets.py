@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from release_copilot import app
+from release_copilot.agents import git_historian, jira_analyst, report_writer
+from release_copilot.graph.states import Target
+from release_copilot.kit import checkpoint
+
+
+def test_target_parse():
+    assert Target.parse("P/r@release/1").label == "P/r@release/1"
+    assert Target.parse("P/r", default_branch="develop").branch == "develop"
+    with pytest.raises(ValueError):
+        Target.parse("P-r@develop")
+
+
+def test_multi_target_run_collects_concurrently_and_counts_by_repo(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.setattr(jira_analyst, "collect_jira",
+                        lambda jql, fv: jira_analyst.JiraIssues(issues=[{"key": "ABC-1", "summary": "s", "status": "Done"}]))
+
+    def collect(project, repo, branch, since):
+        time.sleep(0.3)
+        return git_historian.Commits(commits=[
+            {"id": f"{repo}1", "message": "ABC-1 fix", "author": "dev", "jira_keys": ["ABC-1"]},
+            {"id": f"{repo}2", "message": "chore", "author": "dev", "jira_keys": []},
+        ])
+
+    monkeypatch.setattr(git_historian, "collect_commits", collect)
+    monkeypatch.setattr(report_writer, "write_report", lambda *a: report_writer.Report(
+        matches=[], missing_in_git=[], commits_without_story=[], summary="", artifacts={}))
+
+    started = time.time()
+    res = app.run_release_audit("1.0", None, None, "develop", targets=["P/a", "P/b@release/1", "Q/c"])
+    assert res["ok"], res["error"]
+    assert time.time() - started < 0.8
+    by_repo = res["counts"]["by_repo"]
+    assert list(by_repo) == ["P/a@develop", "P/b@release/1", "Q/c@develop"]
+    assert by_repo["P/b@release/1"] == {"commits": 2, "matched_commits": 1, "commits_without_story": 1}
+    assert res["counts"]["commits_total"] == 6
+
+
+def test_llm_narrative_keeps_same_repo_name_in_different_projects_apart(tmp_path, monkeypatch):
+    from release_copilot.reporting import llm_summary
+
+    seen = {}
+    monkeypatch.setattr(llm_summary, "build_llm_summary",
+                        lambda summary_rows, **kw: seen.setdefault("rows", summary_rows) and tmp_path / "n.md")
+    targets = [{"project": "P", "repo": "a", "branch": "develop"}, {"project": "Q", "repo": "a", "branch": "develop"}]
+    commits = [{"id": "1", "message": "x", "project": "P", "repo": "a", "branch": "develop"},
+               {"id": "2", "message": "y", "project": "Q", "repo": "a", "branch": "develop"},
+               {"id": "3", "message": "z", "project": "Q", "repo": "a", "branch": "develop"}]
+    report_writer.write_llm_narrative([], commits, [], targets, tmp_path, "gpt-4o-mini")
+    assert [(r["project"], r["count"]) for r in seen["rows"]] == [("P", 1), ("Q", 2)]
@@ -0,0 +1,45 @@
+import csv
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("scipy")
+
+from release_copilot.commands import audit_from_config  # noqa: E402
+from release_copilot.kit import caching  # noqa: E402
+from release_copilot.kit.tfidf import IssueIndex, tokens  # noqa: E402
+
+ISSUES = [
+    ("MOBI-1", "Claim intake page crashes on empty policy number"),
+    ("MOBI-2", "Add premium breakdown to renewal letters"),
+    ("MOBI-3", "Policy search times out for large agencies"),
+]
+
+
+def test_tokens_drop_keys_and_stop_words():
+    assert tokens("MOBI-12 Fix the Policy search timeout") == ["policy", "search", "timeout"]
+
+
+def test_top_k_ranks_by_cosine_and_cache_roundtrips(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+    built = IssueIndex.cached(ISSUES)
+    loaded = IssueIndex.cached(ISSUES)
+    assert list((tmp_path / "cache" / "tfidf").iterdir()) and loaded.vocab == built.vocab
+    texts = ["guard empty policy number on claim intake", "renewal letters show premium breakdown", "bump deps"]
+    hits = loaded.top_k(texts, k=2)
+    assert hits[0][0][0] == "MOBI-1" and hits[1][0][0] == "MOBI-2" and hits[2] == []
+    assert hits == built.top_k(texts, k=2)
+    assert all(a[1] >= b[1] for h in hits for a, b in zip(h, h[1:]))
+
+
+def test_suggestions_written_for_keyless_orphans(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_DIR", tmp_path / "cache")
+    orphans = [
+        {"repo": "r", "displayId": "abc", "message": "policy search timeout for large agencies", "_extracted_keys": ""},
+        {"repo": "r", "displayId": "def", "message": "OTHER-9 policy search", "_extracted_keys": "OTHER-9"},
+    ]
+    issues = [{"key": k, "summary": s} for k, s in ISSUES]
+    args = SimpleNamespace(suggest_issues=True, suggest_top_k=1)
+    path = audit_from_config._suggest_issues(args, orphans, issues, [{"key": "MOBI-3"}], tmp_path)
+    rows = list(csv.DictReader(open(path, encoding="utf-8")))
+    assert [(r["displayId"], r["key"], r["missing_in_repo"]) for r in rows] == [("abc", "MOBI-3", "yes")]
@@ -0,0 +1,32 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from release_copilot.kit.tracing import Tracer, span, traced
+
+
+def test_spans_are_noops_without_tracer():
+    with span("x", n=1) as sp:
+        sp["more"] = 2
+    assert sp == {"n": 1, "more": 2}
+
+
+def test_trace_file_and_summary_cover_worker_threads(tmp_path):
+    @traced("work", "cpu")
+    def work(i):
+        with span("inner", "decode", i=i):
+            return i
+
+    with Tracer() as tracer:
+        with span("stage.all"):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [pool.submit(copy_context().run, work, i) for i in range(3)]
+                assert [f.result() for f in futures] == [0, 1, 2]
+
+    data = json.loads(tracer.write(tmp_path / "trace.json").read_text())
+    events = data["traceEvents"]
+    assert {e["ph"] for e in events} == {"X"}
+    assert sorted(e["args"]["i"] for e in events if e["name"] == "inner") == [0, 1, 2]
+    summary = {r["name"]: r for r in tracer.summary()}
+    assert summary["work"]["calls"] == 3 and summary["work"]["cat"] == "cpu"
+    assert summary["stage.all"]["calls"] == 1